@@ -95,12 +95,86 @@ MAX_SPONSOR_PAGES_PER_FESTIVAL = 5
 # Maximum PDFs to collect per festival
 MAX_PDFS_PER_FESTIVAL = 15
 
-# Rate limiting delay between scrapes (seconds)
-SCRAPE_DELAY = 2
+# Minimum delay between requests to the same host (seconds)
+# Requests to different hosts are not delayed; a larger robots.txt Crawl-delay or a
+# Retry-After from the host takes precedence
+SCRAPE_DELAY = 1
 
 # Maximum content size to extract (characters)
 MAX_MAIN_CONTENT_SIZE = 50000
-MAX_ABOUT_CONTENT_SIZE = 10000
+MAX_ABOUT_CONTENT_SIZE = 15000
+
+# Maximum bytes to download per page (responses are streamed and cut off here)
+# Non-HTML responses (PDFs, video, images) are never read into the HTML parser
+MAX_PAGE_BYTES = 2_000_000
+
+# Retries for transient failures (timeouts, refused connections, 429/5xx), with jittered
+# exponential backoff starting at RETRY_BACKOFF_BASE seconds
+FETCH_RETRIES = 2
+RETRY_BACKOFF_BASE = 1.0
+
+# Stop requesting a domain after this many failed requests in a row (DNS failures: immediately)
+BREAKER_THRESHOLD = 3
+
+# Companies that failed transiently are re-scraped on up to this many later runs
+MAX_RETRY_RUNS = 3
+
+# Pages fetched in parallel per company (about, team, investor and news pages)
+MAX_CONCURRENT_FETCHES = 4
+
+# Wall-clock budget per company (seconds, None = unlimited), shared by every fetch and render
+# Each request's timeout is capped by the time left; when it runs out the company keeps what it has
+COMPANY_BUDGET_SECONDS = 90
+# Playwright is not started with less than this much of the budget left
+MIN_RENDER_SECONDS = 5
+
+# Log resolve/connect/TTFB/download/parse/render times and bytes per request (outputs/stage_2_timing.jsonl)
+# `python stage_2.py --report` prints phase percentiles and the slowest hosts
+ENABLE_TIMING_LOG = True
+
+# Shared DNS cache: answers kept DNS_CACHE_TTL seconds, non-existent domains DNS_NEGATIVE_TTL seconds
+# The next DNS_PREFETCH_HOSTS companies' hosts are resolved in the background while pages download
+ENABLE_DNS_CACHE = True
+DNS_CACHE_TTL = 300
+DNS_NEGATIVE_TTL = 3600
+DNS_PREFETCH_HOSTS = 8
+
+# Press articles and off-site pages (investor portfolios) cited by several companies are fetched once:
+# their extracted text is reused for the run and kept on disk for this many days (0 = this run only)
+URL_CACHE_TTL_DAYS = 7
+
+# Rank subpage links with a scorer trained on which pages fed Stage 3 fields (outputs/link_yield.jsonl)
+# Once trained, only the PAGE_BUDGET best subpages per company are fetched
+ENABLE_LINK_SCORER = True
+PAGE_BUDGET = 6
+
+# stage_2.py --refresh: companies scraped longer ago than this are revalidated with conditional GETs
+REFRESH_TTL_DAYS = 30
+
+# Worker processes for HTML parsing and text extraction (None = one per CPU core)
+# Fetch threads only download; parsing runs in parallel outside the GIL
+PARSE_WORKERS = None
+
+# Strip lines that repeat across most of a company's own pages (menus, cookie banners, footers)
+# A line is template if it appears on at least this share of the pages (needs 3+ pages)
+ENABLE_TEMPLATE_FILTER = True
+TEMPLATE_LINE_THRESHOLD = 0.6
+
+# Discover team/about/press pages from robots.txt and sitemap.xml (cached per domain)
+ENABLE_SITEMAP_DISCOVERY = True
+MAX_SITEMAP_PAGES = 4
+SITE_CACHE_TTL_DAYS = 7
+
+# Store page text once per distinct body, compressed (zstd if installed, else zlib)
+# stage_2.jsonl then references blob IDs instead of embedding the text
+ENABLE_BLOB_STORE = True
+
+# Download high-priority pitch deck / investor PDFs and extract their text for Stage 3
+ENABLE_PDF_EXTRACTION = True
+MAX_PDFS_TO_EXTRACT = 3       # Per company
+MAX_PDF_BYTES = 15_000_000    # Larger PDFs are skipped
+MAX_PDF_PAGES = 10            # Only the first N pages are parsed
+PDF_WORKERS = None            # Worker processes for PDF parsing (None = one per CPU core)
 
 
 # STAGE 3: AI EXTRACTION SETTINGS
@@ -122,6 +196,30 @@ EXTRACTION_DELAY = 0.5
 # Maximum content to send to AI (characters)
 MAX_CONTENT_FOR_AI = 80000
 
+# Companies enriched at the same time (each runs its Perplexity searches concurrently)
+STAGE_3_CONCURRENCY = 8
+
+# Per-provider limits shared by all companies in flight
+# Requests per minute and requests in flight; set below your account's tier limits
+PERPLEXITY_RPM = 50
+PERPLEXITY_MAX_CONCURRENT = 5
+OPENAI_RPM = 500
+OPENAI_MAX_CONCURRENT = 10
+
+# Ask Perplexity one structured question covering all missing fields (JSON keyed by field)
+# instead of one free-text search per field; empty fields still get a per-field follow-up
+# CONSOLIDATED_MAX_TOKENS leaves room for several funding rounds; an answer cut off anyway
+# is passed on as text and only the fields it never reached are searched again
+PERPLEXITY_CONSOLIDATED = True
+CONSOLIDATED_MAX_TOKENS = 1200
+
+# Read location, founders and funding from the scraped main/about text with local rules first
+# Values at or above LOCAL_MIN_CONFIDENCE are not searched for; on a held-out share of companies
+# (LOCAL_HOLDOUT_RATE) they are searched anyway and compared with the LLM's answer
+ENABLE_LOCAL_EXTRACTION = True
+LOCAL_MIN_CONFIDENCE = 0.8
+LOCAL_HOLDOUT_RATE = 0.1
+
 
 # STAGE 4: ANALYSIS SETTINGS
 # ===========================
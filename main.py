@@ -97,7 +97,7 @@ def run_full_pipeline():
     print(f"Duration: {duration}")
     print("\nOutput Files Generated:")
     print("  • outputs/stage_1.json")
-    print("  • outputs/stage_2.json")
+    print("  • outputs/stage_2.jsonl (page text in outputs/stage_2_blobs.pack)")
     print("  • outputs/stage_3.json")
     print("  • outputs/FINAL_Investment_Intelligence.csv")
     print("  • outputs/FINAL_Investment_Intelligence.json")
@@ -0,0 +1,162 @@
+"""
+Stage 2 Benchmark: parse + link classification on saved pages, parse pool and PDF extraction throughput
+Usage: python bench_stage_2.py [<dir of saved .html files>] [--repeat N] [--parse-pool] [--pdfs <dir of .pdf files>]
+"""
+import os
+import sys
+import time
+import argparse
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from page_parser import parse_html, classify_links, INVESTOR_KEYWORDS, ABOUT_KEYWORDS, SOCIAL_PLATFORMS
+from parse_pool import ParsePool
+from pdf_extractor import PdfExtractor
+
+
+def load_corpus(directory: str) -> list:
+    """Load saved pages as (base_url, html bytes); the file name stands in for the host"""
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(('.html', '.htm')):
+            continue
+        with open(os.path.join(directory, name), 'rb') as f:
+            html = f.read()
+        corpus.append((f"https://{os.path.splitext(name)[0]}/", html))
+    return corpus
+
+
+def legacy_classify(html: bytes, base_url: str) -> dict:
+    """The original four find_all('a') walks on an html.parser tree"""
+    soup = BeautifulSoup(html, 'html.parser')
+    same_domain = lambda u: urlparse(u).netloc == urlparse(base_url).netloc
+
+    investor = []
+    for link in soup.find_all('a', href=True):
+        href, text = link.get('href', ''), link.get_text().lower().strip()
+        if any(kw in text or kw in href.lower() for kw in INVESTOR_KEYWORDS):
+            full_url = urljoin(base_url, href)
+            if same_domain(full_url):
+                investor.append(full_url)
+
+    pdfs = []
+    for link in soup.find_all('a', href=True):
+        href = link.get('href', '')
+        if '.pdf' in href.lower() or 'issuu.com' in href.lower():
+            pdfs.append(urljoin(base_url, href))
+
+    about = []
+    for link in soup.find_all('a', href=True):
+        href, text = link.get('href', '').lower(), link.get_text().lower().strip()
+        if any(kw in href or kw in text for kw in ABOUT_KEYWORDS):
+            about.append(urljoin(base_url, link.get('href')))
+
+    social = {}
+    for link in soup.find_all('a', href=True):
+        href = link.get('href', '')
+        for domain, platform in SOCIAL_PLATFORMS.items():
+            if domain in href:
+                social[platform] = href
+                break
+
+    return {'investor': investor, 'pdf': pdfs, 'about': about, 'social': social}
+
+
+def single_pass_classify(html: bytes, base_url: str) -> dict:
+    """The lxml parse + one-pass keyword automaton"""
+    return classify_links(parse_html(html), base_url)
+
+
+def time_corpus(func, corpus: list, repeat: int) -> float:
+    """Return seconds per page for func over the corpus"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for base_url, html in corpus:
+            func(html, base_url)
+    elapsed = time.perf_counter() - start
+    return elapsed / (len(corpus) * repeat)
+
+
+def bench_parse_pool(corpus: list, repeat: int):
+    """Full page extraction (text, links, metadata) through the parse pool at increasing worker counts"""
+    pages = [(base_url, html) for _ in range(repeat) for base_url, html in corpus]
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({n for n in (1, 2, 4, 8, 16) if n <= cores} | {cores})
+
+    print(f"Parse pool: {len(pages)} pages")
+    baseline = None
+    for workers in worker_counts:
+        pool = ParsePool(workers, max_chars=50000)
+        pool.parse_many(pages[:workers])  # start the workers outside the timed run
+        start = time.perf_counter()
+        pool.parse_many(pages)
+        wall = time.perf_counter() - start
+        pool.shutdown()
+
+        throughput = len(pages) / wall
+        baseline = baseline or throughput
+        print(f"  {workers:>2} workers: {throughput:8.1f} pages/s ({throughput / baseline:.2f}x, "
+              f"{throughput / baseline / workers:.0%} scaling efficiency)")
+
+
+def bench_pdfs(directory: str, max_pages: int):
+    """PDF text extraction: pages/second per core with one worker and with one worker per core"""
+    pdfs = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith('.pdf'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                pdfs.append(f.read())
+    if not pdfs:
+        print(f"No .pdf files found in {directory}")
+        return
+
+    print(f"PDF corpus: {len(pdfs)} files, {sum(len(p) for p in pdfs) / 1e6:.1f} MB, first {max_pages} pages each")
+    for workers in sorted({1, os.cpu_count() or 1}):
+        extractor = PdfExtractor(max_pages=max_pages, workers=workers)
+        start = time.perf_counter()
+        extractor.extract_many(pdfs)
+        wall = time.perf_counter() - start
+        extractor.shutdown()
+
+        stats = extractor.stats()
+        print(f"  {workers:>2} workers: {stats['pages'] / wall:8.1f} pages/s wall, "
+              f"{stats['pages_per_second_per_core']:8.1f} pages/s per core ({stats['failed']} failed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Stage 2 page parsing")
+    parser.add_argument('corpus_dir', nargs='?', help='Directory of saved homepage .html files')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over the corpus per variant')
+    parser.add_argument('--parse-pool', action='store_true',
+                        help='Also measure parse pool throughput from 1 worker up to one per core')
+    parser.add_argument('--pdfs', help='Directory of .pdf files for the PDF extraction benchmark')
+    parser.add_argument('--pdf-pages', type=int, default=10, help='Pages parsed per PDF')
+    args = parser.parse_args()
+
+    if args.pdfs:
+        bench_pdfs(args.pdfs, args.pdf_pages)
+    if not args.corpus_dir:
+        return
+
+    corpus = load_corpus(args.corpus_dir)
+    if not corpus:
+        print(f"No .html files found in {args.corpus_dir}")
+        sys.exit(1)
+
+    total_kb = sum(len(html) for _, html in corpus) / 1024
+    print(f"Corpus: {len(corpus)} pages, {total_kb:.0f} KB")
+
+    legacy = time_corpus(legacy_classify, corpus, args.repeat)
+    single = time_corpus(single_pass_classify, corpus, args.repeat)
+
+    print(f"  legacy (html.parser, 4 walks):  {legacy * 1000:8.2f} ms/page")
+    print(f"  single pass (lxml, automaton):  {single * 1000:8.2f} ms/page")
+    print(f"  speedup: {legacy / single:.1f}x")
+
+    if args.parse_pool:
+        bench_parse_pool(corpus, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Blob Store: content-addressed, compressed storage for scraped page text
+Identical bodies (news articles, press pages, boilerplate) are stored once and referenced by ID
+"""
+import os
+import json
+import mmap
+import zlib
+import hashlib
+from typing import Dict, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+BLOB_PACK_FILE = '../outputs/stage_2_blobs.pack'
+
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def blob_id(text: str) -> str:
+    """Content address of a text body"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class BlobStore:
+    """
+    Append-only pack file of compressed text bodies with a JSONL index.
+
+    Bodies are compressed with zstd when the zstandard package is installed and
+    zlib otherwise; the codec is recognized per blob, so packs may mix both.
+    Reads go through a read-only memory map of the pack file.
+    """
+
+    def __init__(self, path: str = BLOB_PACK_FILE):
+        self.path = path
+        self.index_path = path + '.index'
+        self.stats_path = path + '.stats.json'
+        self.index = {}
+        self.references = 0
+        self.logical_bytes = 0
+        self._pack_file = None
+        self._index_file = None
+        self._map = None
+        self._stats_changed = False
+        self._compressor = zstandard.ZstdCompressor(level=10) if zstandard else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard else None
+        self._load()
+
+    def _load(self):
+        pack_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    # Entries past the end of the pack belong to a write that never finished
+                    if entry['offset'] + entry['length'] <= pack_size:
+                        self.index[entry['id']] = entry
+
+        if os.path.exists(self.stats_path):
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+            self.references = stats.get('references', 0)
+            self.logical_bytes = stats.get('logical_bytes', 0)
+
+    def _compress(self, data: bytes) -> bytes:
+        if self._compressor:
+            return self._compressor.compress(data)
+        return zlib.compress(data, 6)
+
+    def _decompress(self, data: bytes) -> bytes:
+        if data[:4] == ZSTD_MAGIC:
+            if not self._decompressor:
+                raise RuntimeError("Blob was written with zstd; install the zstandard package to read it")
+            return self._decompressor.decompress(data)
+        return zlib.decompress(data)
+
+    def put(self, text: str, count: bool = True) -> str:
+        """
+        Store a text body (once per distinct content) and return its blob ID.
+        count=False stores without counting a reference: the record re-writes one already counted.
+        """
+        key = blob_id(text)
+        raw = text.encode('utf-8')
+        if count:
+            self.references += 1
+            self.logical_bytes += len(raw)
+            self._stats_changed = True
+
+        if key in self.index:
+            return key
+
+        if self._pack_file is None:
+            self._pack_file = open(self.path, 'ab')
+            self._index_file = open(self.index_path, 'a', encoding='utf-8')
+
+        compressed = self._compress(raw)
+        self._pack_file.seek(0, os.SEEK_END)
+        offset = self._pack_file.tell()
+        self._pack_file.write(compressed)
+        self._pack_file.flush()
+
+        entry = {'id': key, 'offset': offset, 'length': len(compressed), 'size': len(raw)}
+        self._index_file.write(json.dumps(entry) + '\n')
+        self._index_file.flush()
+        self.index[key] = entry
+        return key
+
+    def get(self, key: str) -> Optional[str]:
+        """Read a text body by blob ID (memory-mapped)"""
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+
+        end = entry['offset'] + entry['length']
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self._decompress(self._map[entry['offset']:end]).decode('utf-8')
+
+    def save_stats(self):
+        """Persist reference counters so the dedup ratio spans runs (only if they changed)"""
+        if not self._stats_changed:
+            return
+        self._stats_changed = False
+        with open(self.stats_path, 'w', encoding='utf-8') as f:
+            json.dump({'references': self.references, 'logical_bytes': self.logical_bytes}, f)
+
+    def stats(self) -> Dict:
+        unique_bytes = sum(e['size'] for e in self.index.values())
+        disk_bytes = sum(e['length'] for e in self.index.values())
+        return {
+            'unique_blobs': len(self.index),
+            'references': self.references,
+            'dedup_ratio': self.references / len(self.index) if self.index else 0.0,
+            'logical_bytes': self.logical_bytes,
+            'unique_bytes': unique_bytes,
+            'disk_bytes': disk_bytes,
+            'savings': 1 - disk_bytes / self.logical_bytes if self.logical_bytes else 0.0,
+        }
+
+    def close(self):
+        if self._pack_file is not None:
+            self._pack_file.close()
+            self._index_file.close()
+            self._pack_file = None
+            self._index_file = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self.save_stats()
+
+
+# Text fields moved into the blob store: top-level keys, then (list key, item key) pairs
+BLOB_FIELDS = ['main_content', 'about_content']
+BLOB_LIST_FIELDS = [
+    ('investor_page_content', 'content'),
+    ('investor_info_content', 'content'),
+    ('pdf_content', 'text'),
+]
+
+
+def externalize(record: Dict, blobs: BlobStore, count: bool = True) -> Dict:
+    """
+    Return a copy of a scrape result with its text bodies replaced by '<field>_blob' IDs.
+    count=False for records already counted once (see BlobStore.put)
+    """
+    record = dict(record)
+    for field in BLOB_FIELDS:
+        text = record.get(field)
+        if text:
+            record[f'{field}_blob'] = blobs.put(text, count)
+            del record[field]
+
+    for list_field, item_field in BLOB_LIST_FIELDS:
+        items = record.get(list_field)
+        if not items:
+            continue
+        new_items = []
+        for item in items:
+            item = dict(item)
+            text = item.get(item_field)
+            if text:
+                item[f'{item_field}_blob'] = blobs.put(text, count)
+                del item[item_field]
+            new_items.append(item)
+        record[list_field] = new_items
+
+    return record
+
+
+def internalize(record: Dict, blobs: Optional[BlobStore]) -> Dict:
+    """Resolve '<field>_blob' IDs back into text, so readers see the original record shape"""
+    if blobs is None:
+        return record
+
+    for field in BLOB_FIELDS:
+        key = record.pop(f'{field}_blob', None)
+        if key:
+            record[field] = blobs.get(key) or ''
+
+    for list_field, item_field in BLOB_LIST_FIELDS:
+        for item in record.get(list_field) or []:
+            key = item.pop(f'{item_field}_blob', None)
+            if key:
+                item[item_field] = blobs.get(key) or ''
+
+    return record
@@ -0,0 +1,48 @@
+"""
+Deadline: a per-company wall-clock budget shared by every Stage 2 fetch and render
+Each request gets min(its own timeout, the time left); nothing new starts once the budget is spent
+"""
+import time
+from typing import Dict, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting a request or render once the company's budget is spent"""
+
+
+class Deadline:
+    """Wall-clock budget started at construction; seconds=None means no limit"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.budget = seconds
+        self.started = time.monotonic()
+        self.expires_at = self.started + seconds if seconds else None
+        # Set once anything was skipped or cut short because the budget ran out
+        self.hit = False
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return float('inf')
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        if self.remaining() > 0:
+            return False
+        self.hit = True
+        return True
+
+    def check(self):
+        if self.expired:
+            raise DeadlineExceeded(f"Company budget of {self.budget:g}s spent")
+
+    def timeout(self, default: float) -> float:
+        """A request timeout capped by the time left; raises DeadlineExceeded when none is left"""
+        self.check()
+        return min(default, self.remaining())
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def stats(self) -> Dict:
+        return {'budget_s': self.budget, 'elapsed_s': round(self.elapsed(), 2), 'deadline_hit': self.hit}
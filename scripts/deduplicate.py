@@ -5,8 +5,18 @@ Removes duplicates and cleans up company names in existing data files
 import os
 import json
 import re
+import shutil
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from site_merges import load_site_merges, SITE_MERGES_FILE
+from stage_2_store import Stage2Store, load_stage_2_records, STAGE_2_JSONL
+from blob_store import BlobStore, BLOB_PACK_FILE
+
+try:
+    from config import ENABLE_BLOB_STORE
+except ImportError:
+    ENABLE_BLOB_STORE = True
 
 
 def normalize_url(url: str) -> str:
@@ -122,20 +132,24 @@ def are_likely_same_company(company1: Dict, company2: Dict) -> bool:
     return True
 
 
-def deduplicate_companies(companies: List[Dict]) -> List[Dict]:
+def deduplicate_companies(companies: List[Dict], site_merges: Optional[Dict[str, str]] = None) -> List[Dict]:
     """
     Deduplicate companies by normalized URL AND company name
     Keep the entry with the most complete information
     Priority: Real URL > URL_NEEDED
+    site_merges: {url: url it was merged into} from Stage 2 (companies redirecting to the same site)
     """
-    # First pass: deduplicate by exact URL (skip URL_NEEDED entries)
+    site_merges = site_merges or {}
+
+    # First pass: deduplicate by exact URL (skip URL_NEEDED entries);
+    # companies Stage 2 found on the same site count as the same URL
     url_map = {}
     for company in companies:
         url = company.get('url', '')
         if not url or url == 'URL_NEEDED':
             continue
 
-        normalized_url = normalize_url(url)
+        normalized_url = normalize_url(site_merges.get(url, url))
 
         if normalized_url not in url_map:
             url_map[normalized_url] = company
@@ -237,7 +251,7 @@ def backup_file(filepath: str):
     print(f"  ✓ Backup created: {os.path.basename(backup_path)}")
 
 
-def process_file(filepath: str, file_description: str):
+def process_file(filepath: str, file_description: str, site_merges: Optional[Dict[str, str]] = None):
     """Process a single JSON file - deduplicate and clean names"""
     if not os.path.exists(filepath):
         print(f"⚠️  {file_description} not found: {filepath}")
@@ -281,7 +295,7 @@ def process_file(filepath: str, file_description: str):
     # Deduplicate
     print("Deduplicating by URL and company name...")
     print("  Priority: Keeping entries with real URLs over URL_NEEDED")
-    companies = deduplicate_companies(companies)
+    companies = deduplicate_companies(companies, site_merges)
 
     new_count = len(companies)
     duplicates_removed = original_count - new_count
@@ -316,6 +330,62 @@ def process_file(filepath: str, file_description: str):
     }
 
 
+def process_stage_2_store(path: str = STAGE_2_JSONL, file_description: str = 'Stage 2: Scraping',
+                          site_merges: Optional[Dict[str, str]] = None):
+    """Deduplicate and clean the Stage 2 JSONL store (rewritten in place, page text stays in the blob store)"""
+    if not os.path.exists(path):
+        print(f"⚠️  {file_description} not found: {path}")
+        return
+
+    print(f"\n{'='*60}")
+    print(f"Processing: {file_description}")
+    print(f"{'='*60}")
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    backup_path = path.replace('.jsonl', f'_backup_{timestamp}.jsonl')
+    shutil.copyfile(path, backup_path)
+    if os.path.exists(path + '.index'):
+        shutil.copyfile(path + '.index', backup_path + '.index')
+    print(f"  ✓ Backup created: {os.path.basename(backup_path)}")
+
+    companies = clean_all_names(list(load_stage_2_records(path)))
+    original_count = len(companies)
+    print(f"Original count: {original_count} companies")
+
+    companies = deduplicate_companies(companies, site_merges)
+    new_count = len(companies)
+    if new_count < original_count:
+        print(f"  ✓ Removed {original_count - new_count} duplicates total")
+    else:
+        print(f"  ✓ No duplicates found")
+    print(f"Final count: {new_count} companies")
+
+    # Write a fresh store next to the old one, then swap it in
+    blobs = BlobStore(BLOB_PACK_FILE) if os.path.exists(BLOB_PACK_FILE) else None
+    temp_path = path + '.tmp'
+    for leftover in (temp_path, temp_path + '.index'):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    # Records already in the pack are counted there; text only goes into it with the blob store enabled
+    store = Stage2Store(temp_path, blobs, write_blobs=ENABLE_BLOB_STORE)
+    for company in companies:
+        store.append(company, new_references=False)
+    store.close()
+    if blobs:
+        blobs.close()
+    os.replace(temp_path, path)
+    os.replace(temp_path + '.index', path + '.index')
+
+    print(f"✓ Saved cleaned data to {os.path.basename(path)}")
+
+    return {
+        'file': file_description,
+        'original': original_count,
+        'final': new_count,
+        'removed': original_count - new_count
+    }
+
+
 def main():
     """Run deduplication on all stage files"""
     print("="*60)
@@ -323,7 +393,7 @@ def main():
     print("="*60)
     print("\nThis script will:")
     print("1. Create backups of all files")
-    print("2. Remove duplicate companies (by URL)")
+    print("2. Remove duplicate companies (by URL, including Stage 2 same-site merges)")
     print("3. Clean company names (remove ** and other markdown)")
     print("4. Save cleaned versions")
 
@@ -332,17 +402,25 @@ def main():
 
     results = []
 
+    # Companies Stage 2 found redirecting to (or declaring canonical) the same site
+    site_merges = load_site_merges(SITE_MERGES_FILE)
+    if site_merges:
+        print(f"\nLoaded {len(site_merges)} same-site merges from {os.path.basename(SITE_MERGES_FILE)}")
+
     # Process each stage file
     files_to_process = [
         ('stage_1.json', 'Stage 1: Discovery'),
-        ('stage_2.json', 'Stage 2: Scraping'),
+        (os.path.basename(STAGE_2_JSONL), 'Stage 2: Scraping'),
         ('stage_3.json', 'Stage 3: Enrichment'),
         ('FINAL_Investment_Intelligence.json', 'Final Report'),
     ]
 
     for filename, description in files_to_process:
         filepath = os.path.join(outputs_dir, filename)
-        result = process_file(filepath, description)
+        if filename.endswith('.jsonl'):
+            result = process_stage_2_store(filepath, description, site_merges)
+        else:
+            result = process_file(filepath, description, site_merges)
         if result:
             results.append(result)
 
@@ -0,0 +1,134 @@
+"""
+DNS Cache: shared resolver cache for Stage 2 with TTLs, negative caching and frontier prefetch
+Upcoming hosts are resolved in background threads while current pages download; dead domains fail instantly
+"""
+import time
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+from urllib.parse import urlparse
+
+
+# Resolver answers that mean the domain does not exist (cached for the negative TTL);
+# temporary failures (EAI_AGAIN) are not cached at all
+NEGATIVE_ERRNOS = {socket.EAI_NONAME} | ({socket.EAI_NODATA} if hasattr(socket, 'EAI_NODATA') else set())
+
+
+def _hostname(url_or_host: str) -> str:
+    if '//' in url_or_host:
+        return (urlparse(url_or_host).hostname or '').lower()
+    return url_or_host.strip('[]').lower()
+
+
+class DnsCache:
+    """
+    Host -> addresses, resolved with the system resolver off the fetch threads.
+    Positive answers live `ttl` seconds, NXDOMAIN answers `negative_ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 300, negative_ttl: float = 3600, workers: int = 4):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.workers = workers
+        self._entries = {}  # host -> (expires_at, [(family, address)] or socket.gaierror)
+        self._pending = {}  # host -> Future of a prefetch in progress
+        self._lock = threading.Lock()
+        self._pool = None
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.prefetched = 0
+        self.prefetch_waits = 0
+
+    def _lookup(self, host: str):
+        """Resolve one host; returns (addresses or gaierror, seconds to cache)"""
+        try:
+            infos = socket.getaddrinfo(host, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            return e, self.negative_ttl if e.errno in NEGATIVE_ERRNOS else 0
+        return list(dict.fromkeys((info[0], info[4][0]) for info in infos)), self.ttl
+
+    def _store(self, host: str, value, ttl: float):
+        with self._lock:
+            if ttl:
+                self._entries[host] = (time.monotonic() + ttl, value)
+            self._pending.pop(host, None)
+
+    def _cached(self, host: str):
+        entry = self._entries.get(host)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _prefetch_one(self, host: str):
+        value, ttl = self._lookup(host)
+        self._store(host, value, ttl)
+        return value
+
+    def prefetch(self, urls: Iterable[str]):
+        """Start resolving hosts (URLs or hostnames) that are not cached or already being resolved"""
+        with self._lock:
+            for url in urls:
+                host = _hostname(url)
+                if not host or host in self._pending or self._cached(host) is not None:
+                    continue
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='dns')
+                self._pending[host] = self._pool.submit(self._prefetch_one, host)
+                self.prefetched += 1
+
+    def addresses(self, host: str, family: int = socket.AF_UNSPEC) -> List[str]:
+        """
+        Addresses for a host (restricted to `family` unless AF_UNSPEC), from the cache,
+        a running prefetch or a fresh lookup. Raises socket.gaierror like getaddrinfo.
+        """
+        host = _hostname(host)
+        with self._lock:
+            value = self._cached(host)
+            future = self._pending.get(host) if value is None else None
+            if value is not None:
+                self.hits += 1
+            elif future is not None:
+                self.prefetch_waits += 1
+            else:
+                self.misses += 1
+
+        from_cache = value is not None or future is not None
+        if value is None:
+            if future is not None:
+                value = future.result()
+            else:
+                value, ttl = self._lookup(host)
+                self._store(host, value, ttl)
+
+        if isinstance(value, socket.gaierror):
+            if from_cache and value.errno in NEGATIVE_ERRNOS:
+                with self._lock:
+                    self.negative_hits += 1
+            # A fresh exception each time: raising one instance from many threads tangles tracebacks
+            raise socket.gaierror(value.errno, value.strerror)
+        return [address for fam, address in value if family == socket.AF_UNSPEC or fam == family]
+
+    def is_dead(self, url_or_host: str) -> bool:
+        """True if the host is cached as not existing (NXDOMAIN)"""
+        with self._lock:
+            value = self._cached(_hostname(url_or_host))
+        return isinstance(value, socket.gaierror)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.prefetch_waits + self.misses
+        with self._lock:
+            dead = sum(1 for _, value in self._entries.values() if isinstance(value, socket.gaierror))
+        return {
+            'lookups': lookups,
+            'hit_rate': (self.hits + self.prefetch_waits) / lookups if lookups else 0.0,
+            'prefetched': self.prefetched,
+            'dead_hosts': dead,
+            'negative_hits': self.negative_hits,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,198 @@
+"""
+Fetch Errors: failure classification, per-domain circuit breaker and retry queue for Stage 2
+Transient failures (timeouts, refused connections, 5xx) are retried; dead sites stop costing requests
+"""
+import os
+import json
+import socket
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import requests
+
+from deadline import DeadlineExceeded
+from host_scheduler import host_of
+
+
+RETRY_QUEUE_FILE = '../outputs/stage_2_retry_queue.json'
+
+# Error kinds worth trying again (same run with backoff, next run via the retry queue)
+TRANSIENT_KINDS = {'connect', 'timeout', 'http_5xx', 'http_429'}
+
+# Company outcomes retried on a later run; an open breaker or spent budget only means the domain
+# failed transiently earlier in this run
+RETRYABLE_KINDS = TRANSIENT_KINDS | {'circuit_open', 'deadline'}
+
+# Error kinds that count towards a domain's circuit breaker (a 404 says nothing about the site)
+BREAKER_KINDS = TRANSIENT_KINDS | {'dns', 'tls', 'blocked'}
+
+# Error kinds that open the breaker on the first failure: every other request would fail the same way
+IMMEDIATE_BREAKER_KINDS = {'dns', 'blocked'}
+
+DNS_ERROR_MARKERS = (
+    'name or service not known', 'nodename nor servname', 'getaddrinfo failed',
+    'failed to resolve', 'no address associated', 'temporary failure in name resolution',
+    'nameresolutionerror',
+)
+
+
+class SiteBlockedError(Exception):
+    """Raised when a site answers with a bot challenge (Cloudflare, DataDome, ...) instead of content"""
+
+    def __init__(self, url: str, reason: str):
+        super().__init__(f"Bot challenge at {url} ({reason})")
+        self.url = url
+        self.reason = reason
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a domain whose breaker is open"""
+
+    def __init__(self, host: str, kind: str):
+        super().__init__(f"Circuit open for {host} after repeated {kind} failures")
+        self.host = host
+        self.kind = kind
+
+
+def _is_dns_error(error: BaseException) -> bool:
+    """Walk the exception chain (requests -> urllib3 -> socket) looking for a resolver failure"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, socket.gaierror):
+            return True
+        if any(marker in str(error).lower() for marker in DNS_ERROR_MARKERS):
+            return True
+        error = getattr(error, 'reason', None) or error.__cause__ or error.__context__
+    return False
+
+
+def classify_error(error: BaseException) -> Dict:
+    """
+    Classify a fetch exception as dns, connect, tls, timeout, http_4xx, http_429, http_5xx,
+    blocked, circuit_open, deadline or other. Returns {'kind', 'status', 'transient'}.
+    """
+    status = None
+    if isinstance(error, CircuitOpenError):
+        kind = 'circuit_open'
+    elif isinstance(error, SiteBlockedError):
+        kind = 'blocked'
+    elif isinstance(error, DeadlineExceeded):
+        kind = 'deadline'
+    elif isinstance(error, requests.exceptions.SSLError):
+        kind = 'tls'
+    elif isinstance(error, requests.exceptions.Timeout):
+        kind = 'timeout'
+    elif isinstance(error, requests.exceptions.ConnectionError):
+        kind = 'dns' if _is_dns_error(error) else 'connect'
+    elif isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        if status == 429:
+            kind = 'http_429'
+        elif status >= 500:
+            kind = 'http_5xx'
+        else:
+            kind = 'http_4xx'
+    else:
+        kind = 'other'
+
+    return {'kind': kind, 'status': status, 'transient': kind in TRANSIENT_KINDS}
+
+
+class DomainBreaker:
+    """
+    Per-domain circuit breaker: after `threshold` consecutive failed requests
+    (retries already exhausted) the domain gets no more requests this run.
+    A DNS failure or bot challenge opens the breaker immediately; a success resets the count.
+    """
+
+    def __init__(self, threshold: int = 3):
+        self.threshold = threshold
+        self._failures = {}
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, url: str) -> bool:
+        with self._lock:
+            return host_of(url) in self._open
+
+    def check(self, url: str):
+        """Raise CircuitOpenError if the URL's domain is cut off"""
+        host = host_of(url)
+        with self._lock:
+            kind = self._open.get(host)
+        if kind:
+            raise CircuitOpenError(host, kind)
+
+    def record_success(self, url: str):
+        with self._lock:
+            self._failures.pop(host_of(url), None)
+
+    def record_failure(self, url: str, kind: str):
+        if kind not in BREAKER_KINDS:
+            return
+        host = host_of(url)
+        with self._lock:
+            if host in self._open:
+                return
+            count = self._failures.get(host, 0) + 1
+            self._failures[host] = count
+            if kind in IMMEDIATE_BREAKER_KINDS or count >= self.threshold:
+                self._open[host] = kind
+                print(f"    🔌 Circuit open for {host} ({count} {kind} failures), skipping its remaining pages")
+
+    def open_domains(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._open)
+
+
+class RetryQueue:
+    """
+    Companies whose homepage failed transiently, re-scraped on later runs.
+    Stored as {url: {'error_kind', 'attempts', 'last_attempt'}}; a URL leaves the queue
+    when it succeeds, fails permanently, or has used up its attempts.
+    """
+
+    def __init__(self, path: str = RETRY_QUEUE_FILE, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.entries = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"  Warning: Could not read retry queue {path}: {e}")
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def due(self) -> set:
+        """URLs that should be scraped again this run"""
+        return {url for url, entry in self.entries.items() if entry['attempts'] < self.max_attempts}
+
+    def record(self, url: str, success: bool, error_kind: Optional[str]):
+        """Update the queue with the outcome of a company scrape"""
+        if success or error_kind not in RETRYABLE_KINDS:
+            self.entries.pop(url, None)
+            return
+
+        entry = self.entries.setdefault(url, {'attempts': 0})
+        entry['attempts'] += 1
+        entry['error_kind'] = error_kind
+        entry['last_attempt'] = datetime.now(timezone.utc).isoformat()
+        if entry['attempts'] >= self.max_attempts:
+            print(f"  Giving up on {url} after {entry['attempts']} transient failures")
+            self.entries.pop(url)
+
+    def save(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2)
+        except OSError as e:
+            print(f"  Warning: Could not save retry queue: {e}")
@@ -0,0 +1,182 @@
+"""
+Fetch Timing: per-request phase timings for Stage 2 and the slow-site report
+Each fetch logs resolve, connect, TTFB, download, parse and render times (ms) and bytes as one JSON line
+"""
+import os
+import json
+import time
+import socket
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+
+TIMING_LOG_FILE = '../outputs/stage_2_timing.jsonl'
+
+PHASES = ('resolve', 'connect', 'ttfb', 'download', 'parse', 'render')
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = False
+_resolver = None
+
+
+def _phases() -> Dict[str, float]:
+    if not hasattr(_local, 'phases'):
+        _local.phases = {'resolve': 0.0, 'connect': 0.0}
+    return _local.phases
+
+
+def reset_connection_phases():
+    """Start timing a new request on this thread"""
+    _local.phases = {'resolve': 0.0, 'connect': 0.0}
+
+
+def connection_phases() -> Dict[str, float]:
+    """Seconds this thread spent resolving and connecting since the last reset (0 on a reused connection)"""
+    return dict(_phases())
+
+
+def install_connection_timing(resolver: Optional[Callable[[str, int], List[str]]] = None):
+    """
+    Wrap urllib3's create_connection so DNS resolution and the TCP connect are timed
+    separately (TLS handshakes fall into TTFB). Safe to call more than once.
+    resolver(host, family) -> addresses replaces getaddrinfo (e.g. DnsCache.addresses).
+    """
+    global _installed, _resolver
+    with _install_lock:
+        if resolver is not None:
+            _resolver = resolver
+        if _installed:
+            return
+        from urllib3.util import connection
+
+        original = connection.create_connection
+
+        def timed_create_connection(address, *args, **kwargs):
+            host, port = address
+            phases = _phases()
+            start = time.perf_counter()
+            family = connection.allowed_gai_family()
+            if _resolver is not None:
+                addresses = _resolver(host, family)
+            else:
+                infos = socket.getaddrinfo(host.strip('[]'), port, family, socket.SOCK_STREAM)
+                addresses = [info[4][0] for info in infos]
+            resolved = time.perf_counter()
+            phases['resolve'] += resolved - start
+
+            error = None
+            try:
+                # Connect to the resolved addresses in order; the numeric host skips a second lookup
+                for address in addresses:
+                    try:
+                        return original((address, port), *args, **kwargs)
+                    except OSError as e:
+                        error = e
+                raise error or OSError("getaddrinfo returns an empty list")
+            finally:
+                phases['connect'] += time.perf_counter() - resolved
+
+        connection.create_connection = timed_create_connection
+        _installed = True
+
+
+class TimingLog:
+    """Append-only JSONL log, one compact line per fetch: {'t', 'h', 'u', phase ms..., 'b', 's'}"""
+
+    def __init__(self, path: str = TIMING_LOG_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self.records = 0
+
+    def record(self, url: str, timing: Dict):
+        """timing: phase seconds (only the phases that happened), 'bytes' and 'status'"""
+        line = {'t': int(time.time()), 'h': urlparse(url).netloc.lower(), 'u': url}
+        for phase in PHASES:
+            if phase in timing:
+                line[phase] = round(timing[phase] * 1000)
+        line['b'] = timing.get('bytes', 0)
+        if timing.get('status'):
+            line['s'] = timing['status']
+
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._file = open(self.path, 'a', encoding='utf-8')
+                self._file.write(json.dumps(line, ensure_ascii=False) + '\n')
+                self.records += 1
+            except OSError as e:
+                print(f"  Warning: Could not write timing log: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def load_timing_log(path: str = TIMING_LOG_FILE) -> List[Dict]:
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0.0
+    index = min(int(round(q / 100 * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def _total_ms(record: Dict) -> int:
+    return sum(record.get(phase, 0) for phase in PHASES)
+
+
+def print_timing_report(path: str = TIMING_LOG_FILE, top_hosts: int = 15):
+    """Percentiles per phase and the hosts where Stage 2 spends the most time"""
+    records = load_timing_log(path)
+    if not records:
+        print(f"No timing records in {path} yet. Run stage_2.py first.")
+        return
+
+    print("=" * 70)
+    print(f"STAGE 2 TIMING REPORT ({len(records):,} requests, {path})")
+    print("=" * 70)
+
+    print(f"\n{'phase':<10}{'count':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'total':>10}   (ms, total in s)")
+    for phase in PHASES:
+        values = sorted(r[phase] for r in records if phase in r)
+        if not values:
+            continue
+        print(f"{phase:<10}{len(values):>8,}{percentile(values, 50):>9,}{percentile(values, 90):>9,}"
+              f"{percentile(values, 99):>9,}{values[-1]:>9,}{sum(values) / 1000:>10,.1f}")
+
+    sizes = sorted(r.get('b', 0) for r in records)
+    print(f"{'bytes':<10}{len(sizes):>8,}{percentile(sizes, 50):>9,}{percentile(sizes, 90):>9,}"
+          f"{percentile(sizes, 99):>9,}{sizes[-1]:>9,}{sum(sizes) / 1e6:>9,.1f}M")
+
+    hosts = defaultdict(list)
+    for record in records:
+        hosts[record.get('h', '')].append(record)
+
+    ranked = sorted(hosts.items(), key=lambda item: -sum(_total_ms(r) for r in item[1]))[:top_hosts]
+    print(f"\nSlowest hosts (by total time):")
+    print(f"{'host':<40}{'reqs':>6}{'total s':>9}{'p50 ms':>9}{'ttfb p50':>10}{'slowest phase':>16}")
+    for host, host_records in ranked:
+        totals = sorted(_total_ms(r) for r in host_records)
+        ttfbs = sorted(r['ttfb'] for r in host_records if 'ttfb' in r)
+        by_phase = {phase: sum(r.get(phase, 0) for r in host_records) for phase in PHASES}
+        worst = max(by_phase, key=by_phase.get)
+        print(f"{host[:39]:<40}{len(host_records):>6}{sum(totals) / 1000:>9,.1f}{percentile(totals, 50):>9,}"
+              f"{percentile(ttfbs, 50):>10,}{worst:>16}")
@@ -0,0 +1,106 @@
+"""
+Host Scheduler: per-host politeness for Stage 2 requests
+Only requests to the same host are spaced out; other hosts are fetched while one is cooling down
+"""
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds from now"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class HostScheduler:
+    """
+    Tracks when each host may next be requested.
+
+    The interval per host is the larger of the default delay and the host's
+    robots.txt Crawl-delay; a Retry-After from the host pushes its next slot
+    further out. Callers either block until their host is free (wait) or ask
+    without blocking (try_reserve) so a dispatcher can move on to other hosts.
+    """
+
+    def __init__(self, default_delay: float, crawl_delay: Optional[Callable[[str], float]] = None,
+                 max_delay: float = 30, max_retry_after: float = 120):
+        self.default_delay = default_delay
+        self.crawl_delay = crawl_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self._next_allowed = {}
+        self._lock = threading.Lock()
+
+    def _interval(self, url: str) -> float:
+        delay = self.default_delay
+        if self.crawl_delay:
+            delay = max(delay, self.crawl_delay(url))
+        return min(delay, self.max_delay)
+
+    def ready_at(self, url: str) -> float:
+        """Monotonic time at which the URL's host may next be requested"""
+        with self._lock:
+            return self._next_allowed.get(host_of(url), 0.0)
+
+    def next_ready(self, urls: Iterable[str]) -> float:
+        """Earliest time any of the URLs may be requested"""
+        with self._lock:
+            return min((self._next_allowed.get(host_of(url), 0.0) for url in urls), default=0.0)
+
+    def try_reserve(self, url: str) -> bool:
+        """Claim the host's next slot if it is free now; never blocks"""
+        host = host_of(url)
+        interval = self._interval(url)
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_allowed.get(host, 0.0):
+                return False
+            self._next_allowed[host] = now + interval
+            return True
+
+    def wait(self, url: str, deadline: Optional[float] = None) -> bool:
+        """
+        Block until the URL's host is free, then claim the slot.
+        With a deadline (time.monotonic() value) the slot is not waited for if it only
+        frees up later; returns False then, True once the slot is claimed.
+        """
+        host = host_of(url)
+        interval = self._interval(url)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                next_allowed = self._next_allowed.get(host, 0.0)
+                if now >= next_allowed:
+                    self._next_allowed[host] = now + interval
+                    return True
+            if deadline is not None and next_allowed > deadline:
+                return False
+            time.sleep(next_allowed - now)
+
+    def defer(self, url: str, seconds: Optional[float], reason: str = 'Retry-After'):
+        """Push back a host's next slot (Retry-After from a 429/503, or retry backoff)"""
+        if not seconds:
+            return
+        seconds = min(seconds, self.max_retry_after)
+        host = host_of(url)
+        with self._lock:
+            self._next_allowed[host] = max(self._next_allowed.get(host, 0.0), time.monotonic() + seconds)
+        print(f"    ⏸️  Pausing {host} for {seconds:.1f}s ({reason})")
@@ -0,0 +1,147 @@
+"""
+Link Scorer: learns which subpage links pay off in Stage 3 fields
+Stage 3 records which fetched pages held the founders, funding and location it extracted;
+Stage 2 trains on that log and spends its per-company page budget best-first
+"""
+import os
+import re
+import json
+import math
+from collections import Counter
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+
+LINK_YIELD_FILE = '../outputs/link_yield.jsonl'
+
+# Need at least this many logged pages (and positive pages) before the scorer replaces keyword ranking
+MIN_TRAINING_PAGES = 30
+MIN_POSITIVE_PAGES = 5
+
+YIELD_FIELDS = ('founders', 'funding', 'location')
+
+_WORD_PATTERN = re.compile(r'[a-z]+')
+_NAME_SPLIT = re.compile(r',|;|&|\band\b')
+NOT_FOUND = ('', 'not found', 'unknown', 'n/a')
+
+
+def link_features(url: str, link_text: str = '') -> set:
+    """URL path tokens ('p:team') and anchor text tokens ('a:leadership')"""
+    path = urlparse(url).path.lower()
+    features = {f"p:{word}" for word in _WORD_PATTERN.findall(path)}
+    features |= {f"a:{word}" for word in _WORD_PATTERN.findall((link_text or '').lower())}
+    return features
+
+
+def _clean(value) -> str:
+    value = str(value or '').strip()
+    return '' if value.lower() in NOT_FOUND else value
+
+
+def field_values(enriched: Dict) -> Dict[str, List[str]]:
+    """Strings that show a page contributed each field: founder names, investors/amount, city"""
+    founders = [name.strip() for name in _NAME_SPLIT.split(_clean(enriched.get('founders')))]
+
+    investors = enriched.get('key_investors', '')
+    if isinstance(investors, list):
+        investors = ', '.join(investors)
+    funding = [name.strip() for name in _clean(investors).split(',')]
+    funding.append(_clean(enriched.get('total_funding')))
+
+    city = _clean(enriched.get('location')).split(',')[0].strip()
+
+    values = {'founders': founders, 'funding': funding, 'location': [city]}
+    return {field: [v.lower() for v in vals if len(v) > 2] for field, vals in values.items()}
+
+
+def attribute_pages(enriched: Dict, scraped: Dict) -> List[Dict]:
+    """
+    Label every subpage Stage 2 fetched and kept for a company with the Stage 3 fields its text contains.
+    Plan entries that were never fetched (deadline, breaker, errors) or whose text was not kept
+    (near-duplicates, about candidates passed over) are left out: they say nothing about the link.
+    Returns [{'url', 'link_text', 'roles', 'fields'}] for site pages (home and news excluded).
+    """
+    texts = {}
+    if scraped.get('about_page_url'):
+        texts[scraped['about_page_url']] = scraped.get('about_content', '')
+    for page in scraped.get('investor_page_content', []):
+        texts[page.get('url')] = texts.get(page.get('url'), '') + '\n' + (page.get('content') or '')
+
+    values = field_values(enriched)
+    labelled = []
+    for entry in scraped.get('fetch_plan', []):
+        roles = entry.get('roles', [])
+        if 'home' in roles or roles == ['news'] or entry.get('fetched') is False:
+            continue
+        text = texts.get(entry['url'], '').strip().lower()
+        if not text:
+            continue
+        fields = [field for field in YIELD_FIELDS if any(v in text for v in values[field])]
+        labelled.append({
+            'url': entry['url'],
+            'link_text': entry.get('link_text', ''),
+            'roles': roles,
+            'fields': fields
+        })
+    return labelled
+
+
+def append_yield_log(pages: List[Dict], company_url: str, path: str = LINK_YIELD_FILE):
+    """Append one line per labelled page to the yield log"""
+    with open(path, 'a', encoding='utf-8') as f:
+        for page in pages:
+            f.write(json.dumps({'company_url': company_url, **page}, ensure_ascii=False) + '\n')
+
+
+class LinkScorer:
+    """
+    Naive Bayes log-odds over link features: does a page behind this link
+    contribute at least one Stage 3 field? Higher scores are fetched first.
+    """
+
+    def __init__(self, weights: Dict[str, float], prior: float, trained_on: int):
+        self.weights = weights
+        self.prior = prior
+        self.trained_on = trained_on
+
+    @classmethod
+    def train(cls, examples: List[Dict]) -> 'LinkScorer':
+        positive, negative = Counter(), Counter()
+        n_pos = n_neg = 0
+        for example in examples:
+            features = link_features(example['url'], example.get('link_text', ''))
+            if example.get('fields'):
+                positive.update(features)
+                n_pos += 1
+            else:
+                negative.update(features)
+                n_neg += 1
+
+        weights = {}
+        for feature in positive.keys() | negative.keys():
+            weights[feature] = (math.log((positive[feature] + 1) / (n_pos + 2))
+                                - math.log((negative[feature] + 1) / (n_neg + 2)))
+        prior = math.log((n_pos + 1) / (n_neg + 1))
+        return cls(weights, prior, n_pos + n_neg)
+
+    @classmethod
+    def from_yield_log(cls, path: str = LINK_YIELD_FILE) -> Optional['LinkScorer']:
+        """Train from the yield log, or None while there is too little data"""
+        if not os.path.exists(path):
+            return None
+
+        examples = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    examples.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+        positives = sum(1 for e in examples if e.get('fields'))
+        if len(examples) < MIN_TRAINING_PAGES or positives < MIN_POSITIVE_PAGES:
+            return None
+        return cls.train(examples)
+
+    def score(self, url: str, link_text: str = '') -> float:
+        return self.prior + sum(self.weights.get(f, 0.0) for f in link_features(url, link_text))
@@ -0,0 +1,336 @@
+"""
+Local Extractor: rule-based location, founders and funding from scraped text before any paid search
+Compiled regexes, a Colorado city gazetteer and money/round grammars; every value carries a confidence score
+"""
+import re
+import hashlib
+from typing import Dict, List, Optional
+
+
+# Colorado cities and towns a startup is likely to name as its home
+COLORADO_CITIES = {
+    'Denver', 'Boulder', 'Colorado Springs', 'Fort Collins', 'Aurora', 'Lakewood', 'Golden', 'Longmont',
+    'Louisville', 'Broomfield', 'Englewood', 'Greenwood Village', 'Centennial', 'Littleton', 'Arvada',
+    'Westminster', 'Thornton', 'Loveland', 'Greeley', 'Durango', 'Pueblo', 'Grand Junction', 'Superior',
+    'Lafayette', 'Erie', 'Castle Rock', 'Parker', 'Highlands Ranch', 'Lone Tree', 'Evergreen', 'Estes Park',
+    'Steamboat Springs', 'Aspen', 'Vail', 'Breckenridge', 'Glenwood Springs', 'Commerce City', 'Brighton',
+    'Northglenn', 'Wheat Ridge', 'Niwot', 'Windsor', 'Frisco', 'Telluride', 'Carbondale', 'Basalt',
+    'Edwards', 'Avon', 'Montrose', 'Gunnison', 'Salida', 'Buena Vista', 'Canon City', 'Monument',
+    'Berthoud', 'Firestone', 'Frederick', 'Dacono', 'Federal Heights', 'Sheridan', 'Glendale', 'Morrison',
+}
+
+US_STATES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California', 'CO': 'Colorado',
+    'CT': 'Connecticut', 'DE': 'Delaware', 'DC': 'District of Columbia', 'FL': 'Florida', 'GA': 'Georgia',
+    'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois', 'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas',
+    'KY': 'Kentucky', 'LA': 'Louisiana', 'ME': 'Maine', 'MD': 'Maryland', 'MA': 'Massachusetts',
+    'MI': 'Michigan', 'MN': 'Minnesota', 'MS': 'Mississippi', 'MO': 'Missouri', 'MT': 'Montana',
+    'NE': 'Nebraska', 'NV': 'Nevada', 'NH': 'New Hampshire', 'NJ': 'New Jersey', 'NM': 'New Mexico',
+    'NY': 'New York', 'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio', 'OK': 'Oklahoma',
+    'OR': 'Oregon', 'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina', 'SD': 'South Dakota',
+    'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont', 'VA': 'Virginia', 'WA': 'Washington',
+    'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming',
+}
+_STATE_ABBR = {name.lower(): abbr for abbr, name in US_STATES.items()}
+_STATE_ABBR['colo.'] = 'CO'
+
+# Words that make a capitalized run a company, place or heading rather than a person
+NOT_A_NAME = {
+    'The', 'Our', 'We', 'Inc', 'LLC', 'Team', 'Company', 'Group', 'Capital', 'Ventures', 'Partners', 'Fund',
+    'University', 'Labs', 'Technologies', 'Colorado', 'Denver', 'Boulder', 'About', 'Contact', 'Read', 'More',
+    'Series', 'Seed', 'Founder', 'Founders', 'CEO', 'CTO', 'COO',
+}
+
+_STATE = '|'.join(sorted((re.escape(name) for name in US_STATES.values()), key=len, reverse=True))
+STATE = rf"(?:{_STATE}|Colo\.|\b(?:{'|'.join(US_STATES)})\b)"
+CITY = r"[A-Z][a-z]+(?:[ .][A-Z][a-z]+){0,2}"
+
+NAME = r"[A-Z][a-z]+(?:-[A-Z][a-z]+)?(?:\s[A-Z]\.)?\s(?:(?:van|de|von|der|del|la|du)\s)?[A-Z][a-zA-Z'\-]+"
+NAME_LIST = rf"{NAME}(?:(?:\s*,\s*(?:and\s+)?|\s+and\s+|\s*&\s*){NAME})*"
+
+# "Headquartered/based in" names the home; "located/offices in" often names a branch office
+HQ_RE = re.compile(
+    rf"(?i:headquartered|based|headquarters|HQ)\s+(?i:is\s+|are\s+)?(?i:in|out\s+of)[:\s]+"
+    rf"(?:(?i:beautiful|sunny|downtown)\s+)?({CITY}),\s*({STATE})")
+OFFICE_RE = re.compile(
+    rf"(?i:located|offices?)\s+(?i:is\s+|are\s+)?(?i:in)[:\s]+(?:(?i:beautiful|sunny|downtown)\s+)?({CITY}),\s*({STATE})")
+ADDRESS_RE = re.compile(rf"\b\d{{1,6}}\s+[\w .#'-]{{3,60}}?,\s*({CITY}),\s*({STATE})\s+\d{{5}}(?:-\d{{4}})?\b")
+CITY_BASED_RE = re.compile(rf"\b({CITY}|Colorado)[- ]based\b")
+MENTION_RE = re.compile(rf"\b({CITY}),\s*({STATE})")
+
+FOUNDED_BY_RE = re.compile(rf"(?i:\b(?:co-?)?founded\b)[^.]{{0,40}}?(?i:\bby)\s+(?:(?i:serial\s+)?(?i:entrepreneurs?)\s+)?({NAME_LIST})")
+NAME_TITLE_RE = re.compile(rf"({NAME}),?\s+(?:(?i:is\s+(?:the|our|a)\s+))?(?i:co-?founder|founder)\b")
+TITLE_NAME_RE = re.compile(
+    rf"(?i:\b(?:co-?founder|founder)(?:\s*(?:&|and|/)\s*(?:CEO|CTO|COO|president|chief\s+\w+\s+officer))?)[,:]?\s+({NAME})")
+
+MONEY_RE = re.compile(r"(?i)(?:US)?\$\s?(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s?(billion|million|thousand|bn|mm|[bmk])?\b(?!/)")
+ROUND_RE = re.compile(r"(?i)\b(pre-seed|seed|series\s+[a-h]\b|angel|bridge|convertible\s+note|growth\s+equity)")
+FUNDING_VERB_RE = re.compile(r"(?i)\b(rais(?:e|ed|es|ing)|clos(?:ed|es)|secur(?:ed|es)|announc(?:ed|es)|funding|round|financing)\b")
+# A raise that happened (not "helping founders raise"), and who raised it
+PAST_RAISE_RE = re.compile(r"(?i)\b(raised|closed|secured|announced|completed|landed)\b")
+OWN_SUBJECT_RE = re.compile(r"(?i)\b(?:we|our\s+(?:company|team|startup)|the\s+(?:company|startup))\b"
+                            r"(?:\s+\w+){0,3}?\s+(?:raised|closed|secured|announced|completed|landed)\b")
+TOTAL_RE = re.compile(r"(?i)(?:raised\s+(?:a\s+total\s+of|over|more\s+than|nearly|approximately|about)|total\s+funding\s+of)\s+"
+                      r"(?=(?:US)?\$)")
+_INVESTOR_LIST = r"((?:[A-Z0-9][\w&'.-]*)(?:(?:\s+|,\s*)(?:[A-Z0-9][\w&'.-]*|&|of|and))*)"
+LEAD_RE = re.compile(rf"(?i:\b(?:co-)?led\s+by)\s+{_INVESTOR_LIST}")
+PARTICIPANTS_RE = re.compile(rf"(?i:participation\s+(?:from|by))\s+{_INVESTOR_LIST}")
+MONTH_YEAR_RE = re.compile(r"(?i)\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+(?:\d{1,2},\s+)?(20[0-3]\d)\b")
+YEAR_RE = re.compile(r"\b(20[0-3]\d)\b")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+MULTIPLIERS = {'billion': 1e9, 'bn': 1e9, 'b': 1e9, 'million': 1e6, 'mm': 1e6, 'm': 1e6, 'thousand': 1e3, 'k': 1e3}
+MIN_ROUND_DOLLARS = 10_000  # Smaller amounts are prices, not funding
+
+
+def _evidence(text: str, match: re.Match, width: int = 80) -> str:
+    return ' '.join(text[max(0, match.start() - width):match.end() + width].split())
+
+
+def _normalize_location(city: str, state: str) -> Optional[str]:
+    abbr = state if state in US_STATES else _STATE_ABBR.get(state.lower())
+    return f"{city.strip()}, {abbr}" if abbr else None
+
+
+# Two strong matches naming different places: neither is trusted
+CONFLICT_CONFIDENCE = 0.7
+
+
+def extract_location(text: str) -> Optional[Dict]:
+    """{'value': 'Boulder, CO', 'confidence', 'evidence'} from HQ phrases, addresses and 'X-based'"""
+    candidates = []  # (confidence, in gazetteer, value, match)
+
+    def consider(value: Optional[str], confidence: float, match: re.Match):
+        if not value:
+            return
+        city, _, abbr = value.rpartition(', ')
+        if abbr == 'CO' and city not in COLORADO_CITIES:
+            # Colorado cities are checked against the gazetteer; other states cannot be
+            confidence -= 0.2
+        candidates.append((confidence, city in COLORADO_CITIES, value, match))
+
+    for regex, confidence in ((HQ_RE, 0.85), (ADDRESS_RE, 0.8), (OFFICE_RE, 0.6)):
+        for match in regex.finditer(text):
+            consider(_normalize_location(*match.groups()), confidence, match)
+    for match in CITY_BASED_RE.finditer(text):
+        # The capitalized run may start with a sentence word ("Our Denver-based team")
+        words = match.group(1).split()
+        city = next((' '.join(words[i:]) for i in range(len(words)) if ' '.join(words[i:]) in COLORADO_CITIES), None)
+        if city:
+            consider(f"{city}, CO", 0.85, match)
+        elif words[-1] == 'Colorado':
+            candidates.append((0.6, False, 'Colorado', match))
+
+    # Bare "City, ST" mentions (event venues, customer quotes) only count when they repeat
+    mentions = {}
+    for match in MENTION_RE.finditer(text):
+        value = _normalize_location(*match.groups())
+        if value and (value[-2:] != 'CO' or match.group(1) in COLORADO_CITIES):
+            mentions.setdefault(value, []).append(match)
+    for value, matches in mentions.items():
+        consider(value, min(0.5 + 0.1 * (len(matches) - 1), 0.75), matches[0])
+
+    if not candidates:
+        return None
+    # The gazetteer only breaks ties between equally strong matches
+    confidence, _, value, match = max(candidates, key=lambda c: (c[0], c[1]))
+    if any(other[0] >= 0.8 and other[2] != value for other in candidates):
+        confidence = min(confidence, CONFLICT_CONFIDENCE)
+    return {'value': value, 'confidence': confidence, 'evidence': _evidence(text, match)}
+
+
+def _names(name_list: str) -> List[str]:
+    names = re.split(r"\s*,\s*(?:and\s+)?|\s+and\s+|\s*&\s*", name_list)
+    return [name.strip() for name in names
+            if name.strip() and not any(word.strip('.') in NOT_A_NAME for word in name.split())]
+
+
+def extract_founders(text: str) -> Optional[Dict]:
+    """{'value': 'Jane Doe, John Roe', 'confidence', 'evidence'} from 'founded by' and founder titles"""
+    found = {}  # name -> (confidence, match)
+    for regex, confidence in ((FOUNDED_BY_RE, 0.9), (NAME_TITLE_RE, 0.8), (TITLE_NAME_RE, 0.8)):
+        for match in regex.finditer(text):
+            for name in _names(match.group(1)):
+                if name not in found or confidence > found[name][0]:
+                    found[name] = (confidence, match)
+    if not found:
+        return None
+    names = list(found)[:4]
+    top = max((found[name] for name in names), key=lambda item: item[0])
+    return {'value': ', '.join(names), 'confidence': top[0], 'evidence': _evidence(text, top[1])}
+
+
+def parse_amount(number: str, unit: Optional[str]) -> float:
+    return float(number.replace(',', '')) * MULTIPLIERS.get((unit or '').lower(), 1)
+
+
+def format_amount(dollars: float) -> str:
+    """$12M, $1.5B, $750K"""
+    for divisor, suffix in ((1e9, 'B'), (1e6, 'M'), (1e3, 'K')):
+        if dollars >= divisor:
+            return f"${dollars / divisor:.1f}".rstrip('0').rstrip('.') + suffix
+    return f"${dollars:.0f}"
+
+
+def money_amounts(text: str) -> List[float]:
+    """Dollar amounts of at least MIN_ROUND_DOLLARS mentioned in text"""
+    amounts = [parse_amount(*match.groups()) for match in MONEY_RE.finditer(text or '')]
+    return [amount for amount in amounts if amount >= MIN_ROUND_DOLLARS]
+
+
+def _round_name(text: str) -> str:
+    name = ' '.join(text.split())
+    return 'Pre-Seed' if name.lower() == 'pre-seed' else name.title()
+
+
+def _investors(regex: re.Pattern, text: str) -> List[str]:
+    investors = []
+    for match in regex.finditer(text):
+        for name in re.split(r"\s*,\s*(?:and\s+)?|\s+and\s+", match.group(1)):
+            name = re.sub(r"\s+(?:&|of|and)$", '', name.strip().rstrip('.'))
+            if name and name not in investors:
+                investors.append(name)
+    return investors
+
+
+def _date(sentence: str) -> str:
+    match = MONTH_YEAR_RE.search(sentence)
+    if match:
+        return f"{match.group(2)}-{MONTHS.index(match.group(1).lower()[:3]) + 1:02d}"
+    match = YEAR_RE.search(sentence)
+    return match.group(1) if match else ''
+
+
+def _own_raise(sentence: str, company_name: str) -> bool:
+    """The sentence reports a past raise by this company: its subject is we/our/the company or the company's name"""
+    if not PAST_RAISE_RE.search(sentence):
+        return False
+    if OWN_SUBJECT_RE.search(sentence):
+        return True
+    return bool(company_name) and company_name.lower() in sentence.lower()
+
+
+def extract_funding(text: str, company_name: str = '') -> Optional[Dict]:
+    """
+    {'value': funding_info, 'confidence', 'evidence', 'total_funding', 'latest_funding_date', 'key_investors'}
+    from sentences that name a raise. Only a past raise whose subject is the company can be trusted;
+    amount + round is strongest, and a lead investor or date adds a little.
+    A page that only states a total still yields the total.
+    """
+    rounds = []
+    total = ''
+    total_confidence = 0.0
+    total_evidence = ''
+    for sentence in SENTENCE_RE.split(text):
+        if not FUNDING_VERB_RE.search(sentence):
+            continue
+        amounts = money_amounts(sentence)
+        round_match = ROUND_RE.search(sentence)
+        own = _own_raise(sentence, company_name)
+        total_match = TOTAL_RE.search(sentence)
+        if total_match:
+            # "raised a total of $X": the sum of all rounds, not a round of its own
+            total_amounts = money_amounts(sentence[total_match.end():])
+            if total_amounts and not total:
+                total = format_amount(total_amounts[0])
+                total_confidence = 0.7 if own else 0.5
+                total_evidence = ' '.join(sentence.split())[:200]
+            continue
+        if not amounts and not round_match:
+            continue
+        # Marketing copy ("we help founders raise their $2M seed") and other companies' raises
+        # ("clients like Foo raised...") stay below the trust threshold
+        if own:
+            confidence = 0.8 if amounts and round_match else 0.7 if amounts else 0.6
+            if LEAD_RE.search(sentence) or _date(sentence):
+                confidence = round(confidence + 0.05, 2)
+        else:
+            confidence = 0.5
+        rounds.append({
+            'round': _round_name(round_match.group(1)) if round_match else '',
+            'amount': format_amount(amounts[0]) if amounts else '',
+            'leads': _investors(LEAD_RE, sentence),
+            'investors': _investors(LEAD_RE, sentence) + _investors(PARTICIPANTS_RE, sentence),
+            'date': _date(sentence),
+            'confidence': confidence,
+            'evidence': ' '.join(sentence.split())[:200],
+        })
+    if not rounds:
+        if not total:
+            return None
+        return {'value': f"{total} total", 'confidence': total_confidence, 'evidence': total_evidence,
+                'total_funding': total, 'latest_funding_date': '', 'key_investors': []}
+
+    # One line per distinct round, most recent first
+    distinct = {}
+    for found in rounds:
+        key = (found['round'], found['amount'])
+        if key not in distinct or found['confidence'] > distinct[key]['confidence']:
+            distinct[key] = found
+    ordered = sorted(distinct.values(), key=lambda r: (r['date'], r['confidence']), reverse=True)[:3]
+
+    parts = []
+    for found in ordered:
+        part = ' '.join(p for p in (found['amount'], found['round']) if p)
+        if found['leads']:
+            part += f" led by {', '.join(found['leads'][:3])}"
+        if found['date']:
+            part += f" ({found['date']})"
+        parts.append(part)
+
+    best = max(ordered, key=lambda r: r['confidence'])
+    investors = list(dict.fromkeys(name for found in ordered for name in found['investors']))
+    return {
+        'value': '; '.join(parts),
+        'confidence': best['confidence'],
+        'evidence': best['evidence'],
+        'total_funding': total,
+        'latest_funding_date': next((found['date'] for found in ordered if found['date']), ''),
+        'key_investors': investors[:5],
+    }
+
+
+def extract_local(scraped: Dict, company_name: str = '') -> Dict[str, Dict]:
+    """Location, founders and funding found in a company's scraped main/about text (only fields found)"""
+    text = '\n'.join(part for part in (scraped.get('about_content', ''), scraped.get('main_content', '')) if part)
+    if not text:
+        return {}
+    found = {
+        'location': extract_location(text),
+        'founders': extract_founders(text),
+        'funding': extract_funding(text, company_name),
+    }
+    return {field: value for field, value in found.items() if value}
+
+
+def in_holdout(url: str, rate: float) -> bool:
+    """Deterministic sample of companies whose local values are checked against the LLM, not trusted"""
+    return int(hashlib.md5(url.encode('utf-8')).hexdigest()[:8], 16) % 1000 < rate * 1000
+
+
+def agrees(field: str, local_value: str, llm_value) -> Optional[bool]:
+    """Does the LLM's value match the local one? None when the LLM found nothing to compare"""
+    llm_text = str(llm_value or '').strip()
+    if not llm_text or llm_text.lower() in ('not found', 'unknown', 'n/a', 'none'):
+        return None
+    llm_lower = llm_text.lower()
+
+    if field == 'location':
+        if local_value == 'Colorado':
+            return 'colorado' in llm_lower or ', co' in llm_lower
+        city, state = local_value.rsplit(', ', 1)
+        return city.lower() in llm_lower
+
+    if field == 'founders':
+        surnames = [name.split()[-1].lower() for name in local_value.split(', ')]
+        return all(surname in llm_lower for surname in surnames)
+
+    if field == 'funding':
+        local_amounts = {format_amount(amount) for amount in money_amounts(local_value)}
+        if local_amounts:
+            return bool(local_amounts & {format_amount(amount) for amount in money_amounts(llm_text)})
+        rounds = {_round_name(r) for r in ROUND_RE.findall(local_value)}
+        return bool(rounds & {_round_name(r) for r in ROUND_RE.findall(llm_text)})
+
+    return None
@@ -69,11 +69,9 @@ def monitor():
 
             # Stage 2: Scraping
             print("STAGE 2: WEB SCRAPING")
-            if os.path.exists('stage_2.json'):
-                import json
-                with open('stage_2.json', 'r') as f:
-                    scraped = json.load(f)
-                print(f"  ✅ Complete - {len(scraped)} websites scraped")
+            if os.path.exists('stage_2.jsonl'):
+                from stage_2_store import count_stage_2_records
+                print(f"  ✅ {count_stage_2_records('stage_2.jsonl')} websites scraped")
             else:
                 print(f"  ⏳ Running or not started...")
             print()
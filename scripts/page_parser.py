@@ -0,0 +1,451 @@
+"""
+Page Parser: HTML parsing and link classification for Stage 2
+Parses each page once with lxml and sorts every anchor into investor/about/pdf/social buckets
+"""
+import re
+from functools import cached_property
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
+
+import lxml.html
+from lxml import etree
+
+from simhash import simhash
+
+
+# Link text / URL keywords that mark investor, team, funding and press pages
+INVESTOR_KEYWORDS = [
+    'investor', 'funding', 'partner', 'about', 'team', 'careers',
+    'founder', 'leadership', 'company', 'who we are', 'our story',
+    'press', 'news', 'newsroom', 'media', 'blog',
+    'series a', 'series b', 'series c', 'venture', 'capital',
+    'raise', 'investment', 'backed by', 'portfolio'
+]
+
+# Subset of investor keywords that get crawled first
+HIGH_PRIORITY_KEYWORDS = ['investor', 'funding', 'founder', 'team', 'about', 'press', 'news']
+
+# Keywords that mark an about/company/team page
+ABOUT_KEYWORDS = [
+    'about', 'mission', 'history', 'our story', 'company',
+    'who we are', 'our team', 'leadership', 'founders'
+]
+
+# Investor links that point at people pages rather than funding/press pages
+TEAM_KEYWORDS = ['team', 'founder', 'leadership', 'people', 'who we are']
+
+# Keywords that mark a PDF as investor material
+PDF_PRIORITY_KEYWORDS = ['investor', 'pitch', 'deck', 'funding', 'overview']
+
+# URL markers for document links (matched against the href only)
+PDF_URL_MARKERS = ['.pdf', 'issuu.com']
+
+SOCIAL_PLATFORMS = {
+    'facebook.com': 'facebook',
+    'twitter.com': 'twitter',
+    'x.com': 'twitter',
+    'instagram.com': 'instagram',
+    'linkedin.com': 'linkedin',
+    'youtube.com': 'youtube',
+    'crunchbase.com': 'crunchbase'
+}
+
+MAX_INVESTOR_LINKS = 15
+MAX_PDF_LINKS = 15
+
+# Elements whose text is never visible content
+NON_CONTENT_TAGS = frozenset(['script', 'style', 'noscript', 'template'])
+
+# Page chrome left out of the main text view
+BOILERPLATE_TAGS = frozenset(['nav', 'footer', 'header'])
+
+# Extra chrome left out of the article view (related links, share bars, comment forms)
+ARTICLE_SKIP_TAGS = NON_CONTENT_TAGS | BOILERPLATE_TAGS | frozenset(['aside', 'form', 'button', 'figure'])
+
+# Paragraphs shorter than this are not counted when scoring article containers
+MIN_PARAGRAPH_CHARS = 25
+
+
+def _build_keyword_matcher(categories: Dict[str, List[str]]):
+    """
+    Compile all keyword lists into one alternation regex.
+
+    The pattern is wrapped in a lookahead so findall reports a match at every
+    position (overlapping), and alternatives are ordered longest first so each
+    position yields its longest keyword. Every keyword is then mapped to the
+    categories of all keywords it contains, which makes a single scan
+    equivalent to running `keyword in text` for every keyword of every list.
+    """
+    keywords = sorted({kw for kws in categories.values() for kw in kws}, key=len, reverse=True)
+    pattern = re.compile('(?=(' + '|'.join(re.escape(kw) for kw in keywords) + '))')
+
+    keyword_categories = {}
+    for kw in keywords:
+        keyword_categories[kw] = frozenset(
+            category for category, kws in categories.items()
+            if any(other in kw for other in kws)
+        )
+
+    return pattern, keyword_categories
+
+
+_KEYWORD_PATTERN, _KEYWORD_CATEGORIES = _build_keyword_matcher({
+    'investor': INVESTOR_KEYWORDS,
+    'high': HIGH_PRIORITY_KEYWORDS,
+    'about': ABOUT_KEYWORDS,
+    'team': TEAM_KEYWORDS,
+    'pdf_priority': PDF_PRIORITY_KEYWORDS,
+    'pdf': PDF_URL_MARKERS,
+})
+
+
+def match_categories(text: str) -> frozenset:
+    """Return the keyword categories found in an already lowercased string"""
+    found = set()
+    for kw in _KEYWORD_PATTERN.findall(text):
+        found |= _KEYWORD_CATEGORIES[kw]
+    return frozenset(found)
+
+
+def parse_html(html, encoding: Optional[str] = None) -> Optional[etree._Element]:
+    """Parse raw HTML (bytes or str) into an lxml tree, None if the document is empty or unparseable"""
+    if not html:
+        return None
+    if isinstance(html, str):
+        # lxml rejects str input that carries an encoding declaration, so hand it UTF-8 bytes
+        html, encoding = html.encode('utf-8'), 'utf-8'
+    parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+    try:
+        return lxml.html.document_fromstring(html, parser=parser)
+    except (etree.ParserError, ValueError, LookupError):
+        return None
+
+
+def extract_text(root: Optional[etree._Element], skip_tags: frozenset = NON_CONTENT_TAGS) -> str:
+    """
+    Collect visible text, one line per text node, without modifying the tree.
+    Subtrees rooted at skip_tags are left out but the text following them is kept.
+    """
+    if root is None:
+        return ''
+
+    parts = []
+    stack = [(root, False)]
+    while stack:
+        el, closing = stack.pop()
+        if closing:
+            if el.tail and el is not root:
+                parts.append(el.tail)
+            continue
+
+        # Comments and processing instructions have non-string tags
+        if not isinstance(el.tag, str) or el.tag.lower() in skip_tags:
+            if el.tail and el is not root:
+                parts.append(el.tail)
+            continue
+
+        if el.text:
+            parts.append(el.text)
+        stack.append((el, True))
+        for child in reversed(el):
+            stack.append((child, False))
+
+    lines = []
+    for part in parts:
+        lines.extend(line.strip() for line in part.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def _link_density(el: etree._Element, text_len: int) -> float:
+    """Share of an element's text that sits inside links"""
+    if not text_len:
+        return 1.0
+    link_len = sum(len(a.text_content()) for a in el.iter('a'))
+    return min(link_len / text_len, 1.0)
+
+
+def find_article_root(tree: Optional[etree._Element]) -> Optional[etree._Element]:
+    """
+    Locate the element holding the main article, readability-style.
+
+    Explicit markup (<article>, itemprop=articleBody, <main>) wins when it has
+    enough text. Otherwise every paragraph scores its parent (and half its
+    grandparent) by length and comma count, scores are damped by link density,
+    and the best-scoring container is returned.
+    """
+    if tree is None:
+        return None
+
+    for xpath in ('//*[@itemprop="articleBody"]', '//article', '//main', '//*[@role="main"]'):
+        candidates = tree.xpath(xpath)
+        if candidates:
+            best = max(candidates, key=lambda el: len(el.text_content()))
+            if len(best.text_content().strip()) >= 500:
+                return best
+
+    scores = {}
+    for p in tree.iter('p'):
+        text = p.text_content().strip()
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        score = 1 + text.count(',') + min(len(text) / 100, 3)
+        parent = p.getparent()
+        if parent is None:
+            continue
+        scores[parent] = scores.get(parent, 0) + score
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0) + score / 2
+
+    if not scores:
+        return None
+
+    def weighted(el):
+        return scores[el] * (1 - _link_density(el, len(el.text_content())))
+
+    return max(scores, key=weighted)
+
+
+def _social_platform(full_url: str) -> Optional[str]:
+    """Map a URL to a social platform name by its host"""
+    host = urlparse(full_url).netloc.lower().split(':')[0]
+    for domain, platform in SOCIAL_PLATFORMS.items():
+        if host == domain or host.endswith('.' + domain):
+            return platform
+    return None
+
+
+# Query parameters that never change page content
+TRACKING_PARAMS = frozenset(['gclid', 'fbclid', 'mc_cid', 'mc_eid', 'ref', '_hsenc', '_hsmi'])
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL into a dedup key: lowercase scheme/host, no 'www.', no default port,
+    no fragment, no trailing slash, tracking parameters removed and the query sorted.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url.strip()
+
+    scheme = (parts.scheme or 'http').lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    ))
+
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def is_same_domain(url1: str, url2: str) -> bool:
+    """Check if two URLs are from the same domain"""
+    try:
+        return urlparse(url1).netloc == urlparse(url2).netloc
+    except ValueError:
+        return False
+
+
+def classify_links(tree: Optional[etree._Element], base_url: str) -> Dict:
+    """
+    Walk every anchor once and classify it into all link buckets.
+
+    Returns:
+        {
+            'investor': [{'url', 'link_text', 'type', 'priority', 'role'}, ...]  (same domain, high priority first),
+            'about': [url, ...]  (same domain, document order),
+            'pdf': [{'url', 'link_text', 'priority'}, ...]  (high priority first),
+            'social': {platform: href}
+        }
+    """
+    links = {'investor': [], 'about': [], 'pdf': [], 'social': {}}
+    if tree is None:
+        return links
+
+    seen_investor = set()
+    seen_about = set()
+    seen_pdf = set()
+
+    for anchor in tree.iter('a'):
+        href = anchor.get('href')
+        if not href:
+            continue
+        href = href.strip()
+        href_lower = href.lower()
+        link_text = anchor.text_content().strip()
+
+        text_hits = match_categories(link_text.lower())
+        href_hits = match_categories(href_lower)
+        hits = text_hits | href_hits
+
+        full_url = urljoin(base_url, href)
+
+        platform = _social_platform(full_url)
+        if platform:
+            links['social'][platform] = href
+
+        if 'pdf' in href_hits:
+            if full_url not in seen_pdf:
+                seen_pdf.add(full_url)
+                links['pdf'].append({
+                    'url': full_url,
+                    'link_text': link_text,
+                    'priority': 'high' if 'pdf_priority' in hits else 'normal'
+                })
+
+        if not ('investor' in hits or 'about' in hits):
+            continue
+        if not is_same_domain(base_url, full_url):
+            continue
+
+        if 'investor' in hits and full_url not in seen_investor:
+            seen_investor.add(full_url)
+            links['investor'].append({
+                'url': full_url,
+                'link_text': link_text,
+                'type': 'investor_page',
+                'priority': 'high' if 'high' in hits else 'normal',
+                'role': 'team' if 'team' in hits else 'investor'
+            })
+
+        if 'about' in hits and full_url not in seen_about:
+            seen_about.add(full_url)
+            links['about'].append(full_url)
+
+    # Sort by priority (high priority first, stable within each tier)
+    links['investor'].sort(key=lambda x: 0 if x['priority'] == 'high' else 1)
+    links['pdf'].sort(key=lambda x: 0 if x['priority'] == 'high' else 1)
+
+    return links
+
+
+# Derived fields every fetched page needs; article_text is added for news/press pages
+PAGE_FIELDS = ('main_text', 'links', 'metadata', 'simhash')
+ARTICLE_FIELDS = PAGE_FIELDS + ('article_text',)
+
+
+class Page:
+    """
+    A fetched page, parsed once per response.
+    Text, links and metadata are derived lazily from the same tree and cached; the tree is never mutated.
+    """
+
+    def __init__(self, url: str, html, encoding: Optional[str] = None,
+                 final_url: Optional[str] = None, content_type: str = 'text/html',
+                 truncated: bool = False):
+        self.url = url
+        self.html = html
+        self.encoding = encoding
+        self.final_url = final_url or url
+        self.content_type = content_type
+        self.truncated = truncated
+
+    @cached_property
+    def tree(self) -> Optional[etree._Element]:
+        return parse_html(self.html, self.encoding)
+
+    @cached_property
+    def text(self) -> str:
+        """All visible text, including navigation, header and footer"""
+        return extract_text(self.tree, NON_CONTENT_TAGS)
+
+    @cached_property
+    def main_text(self) -> str:
+        """Visible text with nav/header/footer chrome stripped"""
+        return extract_text(self.tree, NON_CONTENT_TAGS | BOILERPLATE_TAGS)
+
+    @cached_property
+    def article_text(self) -> str:
+        """Main article body (headline first), falling back to main_text when no article is found"""
+        root = find_article_root(self.tree)
+        body = extract_text(root, ARTICLE_SKIP_TAGS) if root is not None else ''
+        if len(body) < 200:
+            return self.main_text
+
+        title = self.metadata['title']
+        if title and not body.startswith(title):
+            return f"{title}\n{body}"
+        return body
+
+    @cached_property
+    def simhash(self) -> int:
+        """64-bit SimHash of main_text, for near-duplicate and SPA-shell detection"""
+        return simhash(self.main_text)
+
+    @cached_property
+    def links(self) -> Dict:
+        """
+        Classified link table (see classify_links), built from the full tree including navigation.
+        Links resolve against the URL the page was served from, after redirects (apex -> www, new host).
+        """
+        return classify_links(self.tree, self.final_url or self.url)
+
+    @cached_property
+    def metadata(self) -> Dict:
+        """Title, description, canonical URL and language"""
+        meta = {'title': '', 'description': '', 'canonical_url': '', 'site_name': '', 'lang': ''}
+        tree = self.tree
+        if tree is None:
+            return meta
+
+        title = tree.find('.//title')
+        if title is not None:
+            meta['title'] = title.text_content().strip()
+
+        meta['lang'] = (tree.get('lang') or '').strip()
+
+        for el in tree.iter('meta'):
+            key = (el.get('name') or el.get('property') or '').lower()
+            content = (el.get('content') or '').strip()
+            if not content:
+                continue
+            if key in ('description', 'og:description') and not meta['description']:
+                meta['description'] = content
+            elif key == 'og:site_name':
+                meta['site_name'] = content
+
+        for el in tree.iter('link'):
+            rel = (el.get('rel') or '').lower().split()
+            if 'canonical' in rel and el.get('href'):
+                meta['canonical_url'] = urljoin(self.final_url, el.get('href').strip())
+                break
+
+        return meta
+
+    def extract(self, fields: Tuple[str, ...] = PAGE_FIELDS, max_chars: Optional[int] = None) -> Dict:
+        """
+        Compute the requested derived fields into a plain dict (text fields cut to max_chars).
+        This is what a parse worker sends back: no HTML, no tree.
+        """
+        data = {
+            'url': self.url,
+            'final_url': self.final_url,
+            'content_type': self.content_type,
+            'truncated': self.truncated,
+        }
+        for field in fields:
+            value = getattr(self, field)
+            data[field] = value[:max_chars] if max_chars and isinstance(value, str) else value
+        return data
+
+    @classmethod
+    def from_extracted(cls, data: Dict) -> 'Page':
+        """Rebuild a Page from extract() output, with the shipped fields already cached"""
+        page = cls(data['url'], None, final_url=data['final_url'],
+                   content_type=data['content_type'], truncated=data['truncated'])
+        for field in PAGE_FIELDS + ('text', 'article_text'):
+            if field in data:
+                # cached_property looks in the instance dict first
+                page.__dict__[field] = data[field]
+        return page
@@ -0,0 +1,132 @@
+"""
+Parse Pool: HTML parsing and text extraction for Stage 2 in worker processes
+Fetch threads hand over raw bytes and move on; workers send back text, links and metadata only
+"""
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from page_parser import Page, PAGE_FIELDS
+
+
+def parse_page(url: str, body: bytes, encoding: Optional[str], final_url: Optional[str],
+               content_type: str, truncated: bool, fields: Tuple[str, ...], max_chars: Optional[int]) -> Dict:
+    """
+    Parse one page and extract the requested fields.
+    Runs in a worker process; takes raw bytes and returns a small dict.
+    """
+    start = time.process_time()
+    page = Page(url, body, encoding=encoding, final_url=final_url,
+                content_type=content_type, truncated=truncated)
+    data = page.extract(fields, max_chars)
+    data['cpu_seconds'] = time.process_time() - start
+    return data
+
+
+def pool_context():
+    """
+    Start workers with forkserver (spawn where unavailable), never fork: the fetch
+    threads may hold locks at fork time, and a forked child can deadlock on them.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class ParsePool:
+    """
+    Process pool for HTML parsing, with a bounded queue and pages/second accounting.
+
+    At most max_pending pages wait for a worker; further submits block, so fetchers
+    slow down instead of piling up page bodies in memory. If a worker dies the pool
+    is replaced: pages in flight fail, later pages go to the new pool.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 max_chars: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 2
+        self.max_chars = max_chars
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = None
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.bytes = 0
+        self.cpu_seconds = 0.0
+
+    def submit(self, url: str, body: bytes, encoding: Optional[str] = None, final_url: Optional[str] = None,
+               content_type: str = 'text/html', truncated: bool = False,
+               fields: Tuple[str, ...] = PAGE_FIELDS) -> Future:
+        """Queue one page for parsing, blocking while the queue is full; the pool is started on first use"""
+        self._slots.acquire()
+        args = (parse_page, url, body, encoding, final_url, content_type, truncated, fields, self.max_chars)
+        try:
+            pool = self._executor()
+            try:
+                future = pool.submit(*args)
+            except BrokenProcessPool:
+                self._discard(pool)
+                pool = self._executor()
+                future = pool.submit(*args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.pool = pool
+        future.add_done_callback(lambda _: self._slots.release())
+        self.bytes += len(body)
+        return future
+
+    def collect(self, future: Future) -> Page:
+        """Wait for one parse and fold it into the stats"""
+        try:
+            data = future.result()
+        except BrokenProcessPool:
+            self._discard(future.pool)
+            raise
+        cpu_seconds = data.pop('cpu_seconds')
+        self.pages += 1
+        self.cpu_seconds += cpu_seconds
+        page = Page.from_extracted(data)
+        page.parse_seconds = cpu_seconds
+        return page
+
+    def parse(self, url: str, body: bytes, **kwargs) -> Page:
+        """Parse one page and wait for it"""
+        return self.collect(self.submit(url, body, **kwargs))
+
+    def parse_many(self, pages: List[Tuple[str, bytes]]) -> List[Page]:
+        """Parse a batch of (url, body) pairs in parallel, results in input order"""
+        futures = [self.submit(url, body) for url, body in pages]
+        return [self.collect(future) for future in futures]
+
+    def stats(self) -> Dict:
+        return {
+            'pages': self.pages,
+            'megabytes': self.bytes / 1e6,
+            'workers': self.workers,
+            'pages_per_second_per_core': self.pages / self.cpu_seconds if self.cpu_seconds else 0.0,
+        }
+
+    def _executor(self) -> ProcessPoolExecutor:
+        """The worker pool, started on first use (and after a broken pool was discarded)"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+            return self._pool
+
+    def _discard(self, pool: Optional[ProcessPoolExecutor]):
+        """Drop a broken pool so the next submit starts a fresh one (no-op if it was already replaced)"""
+        with self._lock:
+            if pool is None or pool is not self._pool:
+                return
+            self._pool = None
+        print("  ⚠️  Parse worker died, restarting the parse pool")
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
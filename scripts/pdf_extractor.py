@@ -0,0 +1,149 @@
+"""
+PDF Extractor: text extraction for pitch decks and investor PDFs found in Stage 2
+Parsing is CPU-bound, so it runs in a process pool while the crawler keeps fetching
+"""
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, Future, CancelledError, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from PyPDF2 import PdfReader
+
+from parse_pool import pool_context
+
+
+def extract_pdf_text(data: bytes, max_pages: int, max_chars: int) -> Dict:
+    """
+    Extract text from the first max_pages pages of a PDF.
+    Runs in a worker process; takes raw bytes and returns a small dict.
+    """
+    start = time.process_time()
+    result = {'text': '', 'pages': 0, 'total_pages': 0, 'cpu_seconds': 0.0, 'error': None}
+
+    try:
+        reader = PdfReader(io.BytesIO(data), strict=False)
+        result['total_pages'] = len(reader.pages)
+
+        parts = []
+        length = 0
+        for page in reader.pages[:max_pages]:
+            text = (page.extract_text() or '').strip()
+            result['pages'] += 1
+            if text:
+                parts.append(text)
+                length += len(text)
+            if length >= max_chars:
+                break
+        result['text'] = '\n\n'.join(parts)[:max_chars]
+
+    except Exception as e:
+        result['error'] = str(e)
+
+    result['cpu_seconds'] = time.process_time() - start
+    return result
+
+
+def failed_extraction(error: str) -> Dict:
+    return {'text': '', 'pages': 0, 'total_pages': 0, 'cpu_seconds': 0.0, 'error': error}
+
+
+class PdfExtractor:
+    """
+    Process pool for PDF text extraction, with pages/second accounting.
+
+    Workers start with forkserver (spawn where unavailable) rather than fork. A PDF that
+    takes longer than `timeout` counts as failed, and its pool is replaced so the stuck
+    worker does not hold a slot; the other PDFs that pool was still working on are queued
+    again on the new pool. A pool broken by a dying worker is replaced too.
+    """
+
+    def __init__(self, max_pages: int = 10, max_chars: int = 20000, workers: Optional[int] = None,
+                 timeout: float = 30.0):
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self._pool = None
+        # Pools stopped because one of their PDFs timed out: their other PDFs did nothing wrong
+        self._timed_out_pools = set()
+        self.documents = 0
+        self.failed = 0
+        self.pages = 0
+        self.cpu_seconds = 0.0
+
+    def submit(self, data: bytes) -> Future:
+        """Queue one PDF for extraction; the pool is started on first use"""
+        pool = self._executor()
+        try:
+            future = pool.submit(extract_pdf_text, data, self.max_pages, self.max_chars)
+        except BrokenProcessPool:
+            self._discard(pool)
+            pool = self._executor()
+            future = pool.submit(extract_pdf_text, data, self.max_pages, self.max_chars)
+        future.pool = pool
+        future.data = data
+        return future
+
+    def collect(self, future: Future, timeout: Optional[float] = None) -> Dict:
+        """Wait for one extraction (at most min(timeout, self.timeout) seconds) and fold it into the stats"""
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        for attempt in range(2):
+            try:
+                extracted = future.result(timeout=timeout)
+            except FutureTimeout:
+                print(f"    PDF parse took over {timeout:g}s, giving up on it")
+                self._timed_out_pools.add(future.pool)
+                self._discard(future.pool)
+                extracted = failed_extraction(f"Timed out after {timeout:g}s")
+            except (CancelledError, BrokenProcessPool) as e:
+                if not attempt and future.pool in self._timed_out_pools:
+                    # Lost when another PDF's timeout stopped the pool: run it again on the current one
+                    future = self.submit(future.data)
+                    continue
+                self._discard(future.pool)
+                extracted = failed_extraction(str(e) or 'PDF worker died')
+            except Exception as e:
+                extracted = failed_extraction(str(e))
+            break
+
+        self.documents += 1
+        if extracted['error']:
+            self.failed += 1
+        self.pages += extracted['pages']
+        self.cpu_seconds += extracted['cpu_seconds']
+        return extracted
+
+    def extract_many(self, pdfs: List[bytes]) -> List[Dict]:
+        """Extract a batch of PDFs in parallel, results in input order"""
+        futures = [self.submit(data) for data in pdfs]
+        return [self.collect(future) for future in futures]
+
+    def stats(self) -> Dict:
+        return {
+            'documents': self.documents,
+            'failed': self.failed,
+            'pages': self.pages,
+            'workers': self.workers,
+            'pages_per_second_per_core': self.pages / self.cpu_seconds if self.cpu_seconds else 0.0,
+        }
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+        return self._pool
+
+    def _discard(self, pool: ProcessPoolExecutor):
+        """Stop a pool, killing any worker still parsing; the next submit starts a new one"""
+        if pool is not self._pool:
+            return
+        self._pool = None
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
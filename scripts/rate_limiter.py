@@ -0,0 +1,47 @@
+"""
+Rate Limiter: per-provider pacing for concurrent Stage 3 API calls
+Caps requests in flight and spaces request starts so a provider's per-minute limit is never exceeded
+"""
+import time
+import asyncio
+from typing import Dict
+
+
+class AsyncRateLimiter:
+    """
+    `async with limiter:` around one API call.
+    At most max_concurrent calls run at once and starts are at least 60/requests_per_minute seconds apart.
+    """
+
+    def __init__(self, requests_per_minute: float, max_concurrent: int):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+        self.calls = 0
+        self.waited = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            # Reserve the next start slot under the lock, sleep outside it
+            async with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self.interval
+            delay = start - now
+            if delay > 0:
+                self.waited += delay
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        self.calls += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
+    def stats(self) -> Dict:
+        return {'calls': self.calls, 'waited': self.waited}
@@ -0,0 +1,119 @@
+"""
+Refresh: change detection for re-scraping companies already in the Stage 2 store
+Pages are revalidated with conditional GETs; only companies whose text changed are re-run in Stages 3/4
+"""
+import os
+import csv
+import json
+import shutil
+import hashlib
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional
+
+STAGE_3_JSON = '../outputs/stage_3.json'
+STAGE_3_CSV = '../outputs/stage_3_progress.csv'
+STAGE_4_JSON = '../outputs/FINAL_Investment_Intelligence.json'
+
+
+def text_hash(text: str) -> str:
+    """
+    Hash of a page's extracted main text (whitespace-normalized), for servers that send no
+    ETag/Last-Modified; unlike the raw body it ignores per-request nonces, tokens and timestamps
+    """
+    return hashlib.blake2b(' '.join(text.split()).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def content_hash(record: Dict) -> str:
+    """Hash of everything Stage 3 reads from a Stage 2 record (page, about, investor, news and PDF text)"""
+    parts = [record.get('main_content') or '', record.get('about_content') or '']
+    for list_field, item_field in (('investor_page_content', 'content'), ('investor_info_content', 'content'),
+                                   ('pdf_content', 'text')):
+        parts.extend(item.get(item_field) or '' for item in record.get(list_field) or [])
+
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def is_stale(scraped_at: Optional[str], ttl_days: float) -> bool:
+    """True if a record was scraped more than ttl_days ago (or has no timestamp)"""
+    if not scraped_at:
+        return True
+    age = datetime.now(timezone.utc) - datetime.fromisoformat(scraped_at)
+    return age > timedelta(days=ttl_days)
+
+
+def unchanged_since(lastmod: Optional[str], scraped_at: Optional[str]) -> bool:
+    """
+    True if a sitemap <lastmod> says the page has not changed since scraped_at.
+    A date-only lastmod counts as the end of that day; missing or unparseable values are never trusted.
+    """
+    if not lastmod or not scraped_at:
+        return False
+    try:
+        modified = datetime.fromisoformat(lastmod.replace('Z', '+00:00'))
+        scraped = datetime.fromisoformat(scraped_at)
+    except ValueError:
+        return False
+    if len(lastmod) <= 10:
+        modified += timedelta(days=1)
+    if modified.tzinfo is None:
+        modified = modified.replace(tzinfo=timezone.utc)
+    return modified <= scraped
+
+
+def conditional_headers(validator: Dict) -> Dict:
+    headers = {}
+    if validator.get('etag'):
+        headers['If-None-Match'] = validator['etag']
+    if validator.get('last_modified'):
+        headers['If-Modified-Since'] = validator['last_modified']
+    return headers
+
+
+def _backup(path: str, timestamp: str):
+    root, ext = os.path.splitext(path)
+    shutil.copyfile(path, f"{root}_backup_{timestamp}{ext}")
+
+
+def invalidate_downstream(urls: List[str]) -> Dict[str, int]:
+    """
+    Remove companies from the Stage 3 and Stage 4 outputs (after a backup) so the next
+    stage_3.py / stage_4.py run processes them again. Returns rows removed per file.
+    """
+    urls = set(urls)
+    removed = {}
+    if not urls:
+        return removed
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    for path in (STAGE_3_JSON, STAGE_4_JSON):
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            companies = json.load(f)
+        kept = [c for c in companies if c.get('url', '') not in urls]
+        if len(kept) < len(companies):
+            _backup(path, timestamp)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(kept, f, indent=2, ensure_ascii=False)
+        removed[path] = len(companies) - len(kept)
+
+    if os.path.exists(STAGE_3_CSV):
+        with open(STAGE_3_CSV, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames or []
+            rows = list(reader)
+        kept = [row for row in rows if row.get('url', '') not in urls]
+        if len(kept) < len(rows):
+            _backup(STAGE_3_CSV, timestamp)
+            with open(STAGE_3_CSV, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(kept)
+        removed[STAGE_3_CSV] = len(rows) - len(kept)
+
+    return removed
@@ -0,0 +1,56 @@
+"""
+SimHash: 64-bit near-duplicate fingerprints for Stage 2 page text
+Pages a few bits apart (same body at /about and /our-story, SPA shells) are treated as one
+"""
+import re
+import hashlib
+from typing import Iterable
+
+import numpy as np
+
+
+SHINGLE_SIZE = 3
+
+# Fingerprints at most this many bits apart are near-duplicates
+MAX_NEAR_DUPLICATE_DISTANCE = 3
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+_BIT_POSITIONS = np.arange(64, dtype=np.uint64)
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> int:
+    """
+    SimHash over word shingles: every shingle's 64-bit hash votes +1/-1 per bit,
+    and the fingerprint keeps the bits with a positive total. Vectorized over shingles.
+    """
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if not tokens:
+        return 0
+
+    span = min(shingle_size, len(tokens))
+    shingles = [' '.join(tokens[i:i + span]) for i in range(len(tokens) - span + 1)]
+    digests = b''.join(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest() for s in shingles)
+    hashes = np.frombuffer(digests, dtype='<u8')
+
+    bits = (hashes[:, None] >> _BIT_POSITIONS) & np.uint64(1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(hashes)
+    return int(((votes > 0).astype(np.uint64) << _BIT_POSITIONS).sum(dtype=np.uint64))
+
+
+def fingerprintable(text: str) -> bool:
+    """False for text with no words: simhash() returns 0 for it, which would match every other empty page"""
+    return _TOKEN_PATTERN.search(text) is not None
+
+
+def hamming_distances(fingerprint: int, others: Iterable[int]) -> np.ndarray:
+    """Bit distance from one fingerprint to each of the others"""
+    others = np.fromiter(others, dtype=np.uint64)
+    xor = others ^ np.uint64(fingerprint)
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def is_near_duplicate(fingerprint: int, others: Iterable[int],
+                      max_distance: int = MAX_NEAR_DUPLICATE_DISTANCE) -> bool:
+    """True if the fingerprint is within max_distance bits of any of the others"""
+    distances = hamming_distances(fingerprint, others)
+    return bool(distances.size) and int(distances.min()) <= max_distance
@@ -0,0 +1,109 @@
+"""
+Site Classifier: spots parked domains, bot challenges, cookie walls and dead sites on the first response
+Tagged companies skip Playwright, subpage fetching and the Stage 3/4 LLM calls
+"""
+import re
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+# Bytes of the raw response scanned for signatures (markers sit in <head> or early <body>)
+SNIFF_BYTES = 64 * 1024
+
+# Sites with less visible text than this can be cookie walls or dead placeholder pages
+SHORT_PAGE_CHARS = 1000
+
+PARKING_HOSTS = (
+    'sedoparking.com', 'parkingcrew.net', 'bodis.com', 'above.com', 'afternic.com', 'dan.com',
+    'hugedomains.com', 'sav.com', 'undeveloped.com', 'domainmarket.com', 'buydomains.com',
+    'parklogic.com', 'uniregistry.com', 'squadhelp.com', 'atom.com', 'efty.com',
+)
+
+PARKING_MARKERS = [
+    'this domain is for sale', 'this domain may be for sale', 'domain is for sale', 'buy this domain',
+    'domain name is for sale', 'make an offer on this domain', 'parked free, courtesy of',
+    'this domain is parked', 'domain parking', 'sedoparking', 'parkingcrew', 'bodis.com',
+    'hugedomains', 'afternic', 'is available for purchase',
+]
+
+CHALLENGE_MARKERS = [
+    'cf-browser-verification', 'challenge-platform', '__cf_chl_', 'cf_chl_opt',
+    'checking your browser before accessing', 'attention required! | cloudflare', '<title>just a moment...',
+    'ddos-guard', 'captcha-delivery.com', 'px-captcha', '_incapsula_resource', 'sucuri website firewall',
+    'please enable js and disable any ad blocker', 'verify you are human',
+]
+
+# Interstitial-only markers: ordinary cookie banners on real sites must not match
+COOKIE_WALL_MARKERS = [
+    'consent.google', 'consent.yahoo', 'before you continue to', 'consent-wall', 'cookiewall', 'cookie-wall',
+]
+
+DEAD_SITE_MARKERS = [
+    'welcome to nginx', 'apache2 ubuntu default page', 'apache2 debian default page', '<h1>it works!</h1>',
+    'index of /', 'account suspended', 'this account has been suspended', 'site not found',
+    'this domain has expired', 'domain has expired', 'future home of something quite cool',
+    'default web site page', 'web server is down', 'no such app',
+]
+
+TAG_LABELS = {
+    'parked': 'parked domain',
+    'bot_challenge': 'bot challenge',
+    'cookie_wall': 'cookie wall',
+    'dead_site': 'dead site',
+}
+
+
+def _build_pattern(markers) -> re.Pattern:
+    return re.compile('|'.join(re.escape(marker) for marker in markers).encode('utf-8'))
+
+
+_PARKING_PATTERN = _build_pattern(PARKING_MARKERS)
+_CHALLENGE_PATTERN = _build_pattern(CHALLENGE_MARKERS)
+_COOKIE_WALL_PATTERN = _build_pattern(COOKIE_WALL_MARKERS)
+_DEAD_SITE_PATTERN = _build_pattern(DEAD_SITE_MARKERS)
+
+
+def _tag(tag: str, reason: str) -> Dict:
+    return {'tag': tag, 'reason': reason}
+
+
+def classify_challenge(status: int, headers, head: bytes) -> Optional[Dict]:
+    """Bot challenge on an error response (403/429/503 from Cloudflare, DataDome, Incapsula, ...)"""
+    if (headers.get('cf-mitigated') or '').lower() == 'challenge':
+        return _tag('bot_challenge', 'cf-mitigated: challenge')
+    match = _CHALLENGE_PATTERN.search(head[:SNIFF_BYTES].lower())
+    if match:
+        return _tag('bot_challenge', f"HTTP {status}, '{match.group().decode('utf-8', 'replace')}'")
+    return None
+
+
+def classify_site(head: bytes, title: str, text: str, final_url: str) -> Optional[Dict]:
+    """
+    Tag a homepage response as parked / bot_challenge / cookie_wall / dead_site, or None for a real site.
+    head: the first bytes of the raw HTML; title and text: the parsed title and main text.
+    """
+    host = urlparse(final_url or '').netloc.lower().removeprefix('www.')
+    if any(host == parker or host.endswith('.' + parker) for parker in PARKING_HOSTS):
+        return _tag('parked', f"redirects to {host}")
+
+    raw = head[:SNIFF_BYTES].lower()
+    short = len(text) < SHORT_PAGE_CHARS
+
+    match = _CHALLENGE_PATTERN.search(raw)
+    if match and short:
+        return _tag('bot_challenge', f"'{match.group().decode('utf-8', 'replace')}'")
+
+    match = _PARKING_PATTERN.search(raw) or _PARKING_PATTERN.search(title.lower().encode('utf-8'))
+    if match and (short or 'for sale' in title.lower()):
+        return _tag('parked', f"'{match.group().decode('utf-8', 'replace')}'")
+
+    # Short pages only: an empty JavaScript app shell is not a dead site and still gets rendered
+    if short:
+        match = _COOKIE_WALL_PATTERN.search(raw)
+        if match and ('cookie' in text.lower() or 'consent' in text.lower()):
+            return _tag('cookie_wall', f"'{match.group().decode('utf-8', 'replace')}'")
+        match = _DEAD_SITE_PATTERN.search(raw)
+        if match:
+            return _tag('dead_site', f"'{match.group().decode('utf-8', 'replace')}'")
+
+    return None
@@ -0,0 +1,274 @@
+"""
+Site Discovery: robots.txt and sitemap.xml driven page discovery for Stage 2
+Finds team/about/investor/press pages from a site's sitemaps, so JS-only menus don't hide them
+"""
+import os
+import gzip
+import json
+import time
+from typing import List, Dict, Optional
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+from lxml import etree
+
+from page_parser import match_categories, canonicalize_url
+
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+# Sitemap crawl limits per domain
+MAX_SITEMAP_FILES = 6
+MAX_SITEMAP_BYTES = 5_000_000
+MAX_CACHED_CANDIDATES = 50
+
+# Companies between rewrites of the cache file (it is also written at the end of the run)
+SAVE_EVERY = 25
+
+# Score per keyword category found in a sitemap URL path
+CATEGORY_SCORES = {'team': 3, 'about': 3, 'high': 2, 'investor': 1}
+
+
+def route_pattern(url: str) -> str:
+    """Route pattern of a URL: its first path segment, with '/*' when the path goes deeper"""
+    segments = [segment for segment in urlparse(url).path.lower().split('/') if segment]
+    if not segments:
+        return '/'
+    return f"/{segments[0]}/*" if len(segments) > 1 else f"/{segments[0]}"
+
+
+def score_sitemap_url(loc: str) -> Dict:
+    """Score a sitemap URL by the investor/about/team keywords in its path"""
+    path = urlparse(loc).path.lower()
+    words = path.replace('-', ' ').replace('_', ' ')
+    categories = match_categories(words)
+
+    score = sum(points for category, points in CATEGORY_SCORES.items() if category in categories)
+    if 'pdf' in categories:
+        score = 0
+
+    # Deep paths are usually individual posts, not section pages
+    depth = len([segment for segment in path.split('/') if segment])
+    if depth > 2:
+        score -= depth - 2
+
+    if 'team' in categories:
+        role = 'team'
+    elif 'about' in categories:
+        role = 'about'
+    else:
+        role = 'investor'
+
+    return {'score': score, 'role': role}
+
+
+class SiteDiscovery:
+    """Fetches and caches robots.txt and sitemaps per domain"""
+
+    def __init__(self, session: requests.Session, cache_file: str, timeout: int = 10, ttl_days: float = 7,
+                 scheduler=None):
+        self.session = session
+        self.scheduler = scheduler
+        self.cache_file = cache_file
+        self.timeout = timeout
+        self.ttl_seconds = ttl_days * 86400
+        self.cache = {'domains': {}}
+        # The current company's Deadline (set by the scraper); requests stop once it is spent
+        self.deadline = None
+        self._dirty = False
+        self._unsaved = 0
+
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    self.cache = json.load(f)
+                # Per-page scrape times from older versions are no longer used
+                self.cache.pop('last_scraped', None)
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"  Warning: Could not read site cache {cache_file}: {e}")
+
+    def save(self, force: bool = False):
+        """
+        Called once per company: the cache file is rewritten every SAVE_EVERY calls,
+        or now with force=True (end of run), and only if anything changed.
+        """
+        self._unsaved += 1
+        if not self._dirty or (not force and self._unsaved < SAVE_EVERY):
+            return
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f, ensure_ascii=False)
+            self._dirty = False
+            self._unsaved = 0
+        except OSError as e:
+            print(f"  Warning: Could not save site cache: {e}")
+
+    def _get(self, url: str, max_bytes: int = MAX_SITEMAP_BYTES) -> Optional[bytes]:
+        """Fetch a small text/XML resource, None on any failure"""
+        timeout = self.timeout
+        if self.deadline:
+            if self.deadline.expired:
+                return None
+            timeout = min(timeout, self.deadline.remaining())
+        try:
+            if self.scheduler and not self.scheduler.wait(url, self.deadline.expires_at if self.deadline else None):
+                return None
+            response = self.session.get(url, timeout=timeout, verify=False, stream=True)
+            try:
+                if response.status_code != 200:
+                    return None
+                body = b''
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    body += chunk
+                    if len(body) >= max_bytes:
+                        break
+                return body
+            finally:
+                response.close()
+        except requests.RequestException:
+            return None
+
+    def _domain_entry(self, base_url: str) -> Dict:
+        """Return the cached robots/sitemap data for a domain, refreshing it when stale"""
+        parsed = urlparse(base_url)
+        domain = parsed.netloc.lower()
+        entry = self.cache['domains'].get(domain)
+        if entry and time.time() - entry.get('fetched_at', 0) < self.ttl_seconds:
+            return entry
+
+        root = f"{parsed.scheme or 'https'}://{parsed.netloc}/"
+        robots_body = self._get(urljoin(root, '/robots.txt'), max_bytes=500_000)
+        robots_text = robots_body.decode('utf-8', errors='replace') if robots_body else ''
+
+        robots = self._parse_robots(robots_text)
+        sitemap_urls = robots.site_maps() or [urljoin(root, '/sitemap.xml')]
+
+        candidates = []
+        for entry_url in self._read_sitemaps(sitemap_urls):
+            loc = entry_url['loc']
+            if urlparse(loc).netloc.lower().removeprefix('www.') != domain.removeprefix('www.'):
+                continue
+            if not robots.can_fetch(USER_AGENT, loc):
+                continue
+            scored = score_sitemap_url(loc)
+            if scored['score'] > 0:
+                candidates.append({**entry_url, **scored})
+
+        candidates.sort(key=lambda c: -c['score'])
+
+        entry = {
+            'fetched_at': time.time(),
+            'robots_txt': robots_text,
+            'crawl_delay': robots.crawl_delay(USER_AGENT),
+            'candidates': candidates[:MAX_CACHED_CANDIDATES]
+        }
+        # Cut short by the company budget: use what was read, but fetch it properly next time
+        if not (self.deadline and self.deadline.expired):
+            self.cache['domains'][domain] = entry
+            self._dirty = True
+        return entry
+
+    def _parse_robots(self, robots_text: str) -> RobotFileParser:
+        robots = RobotFileParser()
+        robots.parse(robots_text.splitlines())
+        return robots
+
+    def _read_sitemaps(self, sitemap_urls: List[str]) -> List[Dict]:
+        """Read sitemaps breadth-first, following sitemap indexes and gzip sitemaps"""
+        queue = list(sitemap_urls)
+        seen = set()
+        entries = []
+
+        while queue and len(seen) < MAX_SITEMAP_FILES:
+            sitemap_url = queue.pop(0)
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+
+            body = self._get(sitemap_url)
+            if not body:
+                continue
+            if body[:2] == b'\x1f\x8b':
+                try:
+                    body = gzip.decompress(body)
+                except (OSError, EOFError):
+                    continue
+
+            try:
+                root = etree.fromstring(body, parser=etree.XMLParser(recover=True, resolve_entities=False))
+            except etree.XMLSyntaxError:
+                continue
+            if root is None:
+                continue
+
+            is_index = etree.QName(root).localname == 'sitemapindex'
+            for node in root.xpath('./*[local-name()="sitemap" or local-name()="url"]'):
+                loc = node.xpath('string(./*[local-name()="loc"])').strip()
+                if not loc:
+                    continue
+                if is_index:
+                    queue.append(loc)
+                else:
+                    lastmod = node.xpath('string(./*[local-name()="lastmod"])').strip()
+                    entries.append({'loc': loc, 'lastmod': lastmod})
+
+        return entries
+
+    def crawl_delay(self, url: str) -> float:
+        """Crawl-delay from the domain's cached robots.txt (0 if none or not yet fetched)"""
+        entry = self.cache['domains'].get(urlparse(url).netloc.lower())
+        return float(entry.get('crawl_delay') or 0) if entry else 0.0
+
+    def discover(self, base_url: str, limit: int) -> List[Dict]:
+        """
+        Return the best sitemap URLs for a company site as [{'url', 'role', 'score', 'lastmod'}].
+        Every page is returned whatever its lastmod: a re-scrape rebuilds the whole record,
+        so a page left out here would vanish from it. lastmod is used by refresh instead
+        (lastmods()), to keep a stored record without re-requesting its unchanged pages.
+        """
+        entry = self._domain_entry(base_url)
+        home_key = canonicalize_url(base_url)
+
+        pages = []
+        for candidate in entry['candidates']:
+            key = canonicalize_url(candidate['loc'])
+            if key == home_key:
+                continue
+
+            pages.append({
+                'url': candidate['loc'],
+                'role': candidate['role'],
+                'score': candidate['score'],
+                'lastmod': candidate.get('lastmod', '')
+            })
+            if len(pages) >= limit:
+                break
+
+        return pages
+
+    def lastmods(self, base_url: str, fetched_after: float) -> Dict[str, str]:
+        """
+        Sitemap <lastmod> per canonical URL for a site, from a sitemap read after fetched_after
+        (epoch seconds); {} when the cached sitemap is older, since it cannot vouch for that period.
+        """
+        entry = self._domain_entry(base_url)
+        if entry.get('fetched_at', 0) < fetched_after:
+            return {}
+        return {canonicalize_url(c['loc']): c['lastmod'] for c in entry['candidates'] if c.get('lastmod')}
+
+    def mark_shell_route(self, url: str, whole_site: bool = False):
+        """
+        Remember that a route serves the homepage again (an SPA shell), so later scrapes skip it.
+        whole_site=True covers every subpage of the domain.
+        """
+        domain = urlparse(url).netloc.lower()
+        patterns = self.cache.setdefault('shell_routes', {}).setdefault(domain, [])
+        pattern = '*' if whole_site else route_pattern(url)
+        if pattern not in patterns:
+            patterns.append(pattern)
+            self._dirty = True
+
+    def is_shell_route(self, url: str) -> bool:
+        patterns = self.cache.get('shell_routes', {}).get(urlparse(url).netloc.lower())
+        return bool(patterns) and ('*' in patterns or route_pattern(url) in patterns)
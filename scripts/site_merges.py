@@ -0,0 +1,134 @@
+"""
+Site Merges: collapses companies whose URLs resolve to the same site
+Redirects (brand.io -> brand.com, acquired startups -> parent) and <link rel=canonical> decide the site;
+the first company to claim it is scraped, later ones are recorded as merged for deduplicate.py
+"""
+import os
+import json
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+
+SITE_MERGES_FILE = '../outputs/stage_2_site_merges.json'
+
+# Hosts where the path, not the host, identifies a company: never merge on these
+SHARED_HOSTS = (
+    'linkedin.com', 'facebook.com', 'instagram.com', 'twitter.com', 'x.com', 'youtube.com',
+    'medium.com', 'github.com', 'sites.google.com', 'linktr.ee', 'crunchbase.com', 'angel.co',
+    'wellfound.com', 'notion.so',
+    # Site builders and app hosts: every customer shares the parent domain (and often its canonical)
+    'wixsite.com', 'webflow.io', 'squarespace.com', 'godaddysites.com', 'herokuapp.com', 'github.io',
+)
+
+# Second-level labels under which registrations happen one level deeper (example.co.uk)
+PUBLIC_SECOND_LEVELS = {'co', 'com', 'net', 'org', 'ac', 'gov', 'edu'}
+
+
+def _matches(host: str, domains) -> bool:
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+def site_key(url: str) -> Optional[str]:
+    """Lowercase host without 'www.', or None for relative, local and shared-platform URLs"""
+    try:
+        parts = urlsplit((url or '').strip())
+        host = (parts.hostname or '').lower().removeprefix('www.')
+    except ValueError:
+        return None
+    if parts.scheme not in ('http', 'https') or '.' not in host or _matches(host, SHARED_HOSTS):
+        return None
+    return host
+
+
+def registrable_domain(host: str) -> str:
+    """example.com for www.app.example.com (example.co.uk for shop.example.co.uk)"""
+    labels = host.split('.')
+    if len(labels) > 2 and labels[-2] in PUBLIC_SECOND_LEVELS and len(labels[-1]) == 2:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def resolve_site(url: str, final_url: Optional[str], canonical_url: Optional[str]) -> Optional[str]:
+    """
+    The site a homepage belongs to: where the redirects ended, refined by its rel=canonical host
+    only when that is on the same registrable domain (templates often ship someone else's canonical)
+    """
+    landed = site_key(final_url or url)
+    canonical = site_key(canonical_url)
+    if landed and canonical and registrable_domain(canonical) == registrable_domain(landed):
+        return canonical
+    return landed
+
+
+def _url_key(url: str) -> str:
+    """Scheme-, 'www.'- and trailing-slash-insensitive key for a candidate URL"""
+    parts = urlsplit(url.strip().lower())
+    return (parts.netloc.removeprefix('www.') + parts.path).rstrip('/')
+
+
+def load_site_merges(path: str = SITE_MERGES_FILE) -> Dict[str, str]:
+    """{merged company URL: URL of the company kept for the site}"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {merge['url']: merge['merged_into'] for merge in data.get('merges', [])}
+
+
+class SiteMerges:
+    """
+    Which company owns each resolved site, persisted across runs.
+    {'owners': {site: company URL}, 'aliases': {candidate URL key: site}, 'merges': [...]}
+    """
+
+    def __init__(self, path: str = SITE_MERGES_FILE):
+        self.path = path
+        self.owners = {}
+        self.aliases = {}
+        self.merges = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.owners = data.get('owners', {})
+                self.aliases = data.get('aliases', {})
+                self.merges = {merge['url']: merge for merge in data.get('merges', [])}
+            except (json.JSONDecodeError, OSError, KeyError) as e:
+                print(f"  ⚠️  Could not load {path}: {e}")
+
+    def owner_of(self, url: str) -> Optional[str]:
+        """Company already scraped for the site this URL resolved to on an earlier fetch (None if it is this one)"""
+        owner = self.owners.get(self.aliases.get(_url_key(url)))
+        return owner if owner and owner != url else None
+
+    def claim(self, url: str, final_url: Optional[str], canonical_url: Optional[str]) -> Optional[str]:
+        """
+        Register the site a company's homepage resolved to. Returns the URL of the company
+        that already owns the site (the caller should stop scraping), or None.
+        """
+        site = resolve_site(url, final_url, canonical_url)
+        if not site:
+            return None
+        self.aliases[_url_key(url)] = site
+        owner = self.owners.setdefault(site, url)
+        if owner == url:
+            return None
+        self.merges[url] = {
+            'url': url,
+            'merged_into': owner,
+            'site': site,
+            'final_url': final_url or '',
+            'canonical_url': canonical_url or '',
+        }
+        return owner
+
+    def __len__(self) -> int:
+        return len(self.merges)
+
+    def save(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'owners': self.owners, 'aliases': self.aliases, 'merges': list(self.merges.values())},
+                          f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            print(f"  Warning: Could not save site merges: {e}")
@@ -5,23 +5,104 @@ Scrapes company websites and collects PDFs, investor pages, etc.
 import os
 import json
 import csv
+import argparse
 import requests
 import warnings
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
-from urllib.parse import urljoin, urlparse
+from typing import List, Dict, Optional, Tuple
 import time
-import re
+from datetime import datetime, timezone
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from playwright.sync_api import sync_playwright
 from openai import OpenAI
 
+from page_parser import Page, canonicalize_url, PAGE_FIELDS, ARTICLE_FIELDS, MAX_INVESTOR_LINKS, MAX_PDF_LINKS
+from parse_pool import ParsePool
+from template_filter import strip_site_template
+from simhash import is_near_duplicate, fingerprintable
+from link_scorer import LinkScorer, LINK_YIELD_FILE
+from refresh import text_hash, content_hash, is_stale, conditional_headers, unchanged_since, invalidate_downstream
+from site_discovery import SiteDiscovery
+from host_scheduler import HostScheduler, parse_retry_after, host_of
+from fetch_errors import classify_error, DomainBreaker, RetryQueue, SiteBlockedError, RETRY_QUEUE_FILE, RETRYABLE_KINDS
+from deadline import Deadline, DeadlineExceeded
+from dns_cache import DnsCache
+from url_cache import UrlCache, URL_CACHE_FILE
+from fetch_timing import (TimingLog, TIMING_LOG_FILE, install_connection_timing, reset_connection_phases,
+                          connection_phases, print_timing_report)
+from site_classifier import classify_site, classify_challenge, TAG_LABELS, SNIFF_BYTES
+from site_merges import SiteMerges, SITE_MERGES_FILE
+from stage_2_store import Stage2Store, migrate_legacy_json, STAGE_2_JSONL, LEGACY_STAGE_2_JSON
+from blob_store import BlobStore, BLOB_PACK_FILE
+from pdf_extractor import PdfExtractor
+
 # Suppress SSL warnings
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 requests.packages.urllib3.disable_warnings()
 
 load_dotenv('../.env')
 
+# Config Settings
+try:
+    from config import (SCRAPE_DELAY, MAX_MAIN_CONTENT_SIZE, MAX_ABOUT_CONTENT_SIZE, MAX_PAGE_BYTES, MAX_CONCURRENT_FETCHES,
+                        ENABLE_SITEMAP_DISCOVERY, MAX_SITEMAP_PAGES, SITE_CACHE_TTL_DAYS, ENABLE_BLOB_STORE,
+                        ENABLE_PDF_EXTRACTION, MAX_PDFS_TO_EXTRACT, MAX_PDF_BYTES, MAX_PDF_PAGES, PDF_WORKERS,
+                        FETCH_RETRIES, RETRY_BACKOFF_BASE, BREAKER_THRESHOLD, MAX_RETRY_RUNS, PARSE_WORKERS,
+                        ENABLE_TEMPLATE_FILTER, TEMPLATE_LINE_THRESHOLD, ENABLE_LINK_SCORER, PAGE_BUDGET,
+                        REFRESH_TTL_DAYS, COMPANY_BUDGET_SECONDS, MIN_RENDER_SECONDS, ENABLE_TIMING_LOG,
+                        ENABLE_DNS_CACHE, DNS_CACHE_TTL, DNS_NEGATIVE_TTL, DNS_PREFETCH_HOSTS, URL_CACHE_TTL_DAYS)
+except ImportError:
+    SCRAPE_DELAY = 1
+    FETCH_RETRIES = 2
+    RETRY_BACKOFF_BASE = 1.0
+    BREAKER_THRESHOLD = 3
+    MAX_RETRY_RUNS = 3
+    PARSE_WORKERS = None
+    ENABLE_TEMPLATE_FILTER = True
+    TEMPLATE_LINE_THRESHOLD = 0.6
+    ENABLE_LINK_SCORER = True
+    PAGE_BUDGET = 6
+    REFRESH_TTL_DAYS = 30
+    COMPANY_BUDGET_SECONDS = 90
+    MIN_RENDER_SECONDS = 5
+    ENABLE_TIMING_LOG = True
+    ENABLE_DNS_CACHE = True
+    DNS_CACHE_TTL = 300
+    DNS_NEGATIVE_TTL = 3600
+    DNS_PREFETCH_HOSTS = 8
+    URL_CACHE_TTL_DAYS = 7
+    MAX_MAIN_CONTENT_SIZE = 50000
+    MAX_ABOUT_CONTENT_SIZE = 15000
+    MAX_PAGE_BYTES = 2_000_000
+    MAX_CONCURRENT_FETCHES = 4
+    ENABLE_SITEMAP_DISCOVERY = True
+    MAX_SITEMAP_PAGES = 4
+    SITE_CACHE_TTL_DAYS = 7
+    ENABLE_BLOB_STORE = True
+    ENABLE_PDF_EXTRACTION = True
+    MAX_PDFS_TO_EXTRACT = 3
+    MAX_PDF_BYTES = 15_000_000
+    MAX_PDF_PAGES = 10
+    PDF_WORKERS = None
+
+SITE_CACHE_FILE = '../outputs/stage_2_site_cache.json'
+
+# Upper bound on honored robots.txt Crawl-delay values (seconds)
+MAX_CRAWL_DELAY = 30
+
+# Per-company fetch plan limits
+MAX_ABOUT_CANDIDATES = 3
+MAX_INVESTOR_PAGES = 8
+MAX_NEWS_URLS = 3
+MAX_ARTICLE_CONTENT_SIZE = 10000
+
+MAX_PDF_TEXT_SIZE = 20000
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+STREAM_CHUNK_SIZE = 64 * 1024
+
 # Initialize OpenAI client
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
@@ -35,6 +116,39 @@ class CompanyScraper:
         })
         self.timeout = 10
         self.openai_client = openai_client
+        # News/press articles by canonical URL; the same article is often cited for many companies
+        self.url_cache = UrlCache(URL_CACHE_FILE, URL_CACHE_TTL_DAYS)
+        # Per-host politeness: only requests to the same host are spaced out
+        self.scheduler = HostScheduler(SCRAPE_DELAY, max_delay=MAX_CRAWL_DELAY)
+        # robots.txt / sitemap discovery, cached per domain across runs
+        self.discovery = SiteDiscovery(self.session, SITE_CACHE_FILE, self.timeout, SITE_CACHE_TTL_DAYS,
+                                       scheduler=self.scheduler) if ENABLE_SITEMAP_DISCOVERY else None
+        if self.discovery:
+            self.scheduler.crawl_delay = self.discovery.crawl_delay
+        # Stops requests to a domain after repeated connection-level failures
+        self.breaker = DomainBreaker(BREAKER_THRESHOLD)
+        # Best-first subpage ranking, trained on which pages fed Stage 3 fields on earlier runs
+        self.link_scorer = LinkScorer.from_yield_log(LINK_YIELD_FILE) if ENABLE_LINK_SCORER else None
+        if self.link_scorer:
+            print(f"  Link scorer trained on {self.link_scorer.trained_on} pages, budget {PAGE_BUDGET} subpages per company")
+        # HTML parsing and text extraction run in worker processes, off the fetch threads
+        self.parse_pool = ParsePool(PARSE_WORKERS, max_chars=MAX_MAIN_CONTENT_SIZE)
+        # Pitch deck / investor PDF text extraction (process pool, started on first PDF)
+        self.pdf_extractor = PdfExtractor(MAX_PDF_PAGES, MAX_PDF_TEXT_SIZE, PDF_WORKERS) \
+            if ENABLE_PDF_EXTRACTION else None
+        # Refresh mode: pages answered with 304 Not Modified / an unchanged body
+        self.pages_not_modified = 0
+        self.pages_unchanged_by_lastmod = 0
+        # Companies whose homepages redirect to / declare the same canonical site are scraped once
+        self.site_merges = SiteMerges(SITE_MERGES_FILE)
+        # Wall-clock budget of the company being scraped (replaced in scrape_company)
+        self.deadline = Deadline(None)
+        # Per-request phase timings for `stage_2.py --report`
+        self.timing_log = TimingLog(TIMING_LOG_FILE) if ENABLE_TIMING_LOG else None
+        # Resolver cache with NXDOMAIN caching; hosts are prefetched ahead of the crawl
+        self.dns_cache = DnsCache(DNS_CACHE_TTL, DNS_NEGATIVE_TTL) if ENABLE_DNS_CACHE else None
+        if self.timing_log or self.dns_cache:
+            install_connection_timing(self.dns_cache.addresses if self.dns_cache else None)
 
     def _extract_structured_info(self, scraped_data: Dict) -> Dict:
         """Use AI to extract structured information from scraped content"""
@@ -111,50 +225,274 @@ Format your response as JSON:
                 'industry': ''
             }
 
-    def _save_progress_csv(self, scraped_data: List[Dict], filename: str):
-        """Save scraping progress - just basic info, no AI extraction"""
-        if not scraped_data:
-            return
-
+    def _append_progress_csv(self, data: Dict, filename: str):
+        """Append one company's scraping progress row - just basic info, no AI extraction"""
         try:
             # Simple CSV - just what we scraped
             fieldnames = [
                 'company_name', 'url', 'snippet', 'social_links',
                 'content_length', 'scrape_method', 'success'
             ]
+            write_header = not os.path.exists(filename) or os.path.getsize(filename) == 0
 
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
+            with open(filename, 'a', newline='', encoding='utf-8') as f:
                 writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-
-                for data in scraped_data:
-                    # Extract candidate info
-                    candidate = data.get('candidate_info', {})
-
-                    # Format social links
-                    social_links = data.get('social_links', {})
-                    social_str = ', '.join([f"{k}: {v}" for k, v in social_links.items()])
-
-                    # Calculate total content length
-                    content_length = len(data.get('main_content', '')) + len(data.get('about_content', ''))
-
-                    writer.writerow({
-                        'company_name': candidate.get('title', 'Unknown'),
-                        'url': data.get('url', ''),
-                        'snippet': candidate.get('snippet', '')[:300],  # From Phase 1
-                        'social_links': social_str[:500],
-                        'content_length': content_length,
-                        'scrape_method': data.get('scrape_method', 'requests'),
-                        'success': 'Yes' if data.get('success') else 'No'
-                    })
+                if write_header:
+                    writer.writeheader()
+
+                # Extract candidate info
+                candidate = data.get('candidate_info', {})
+
+                # Format social links
+                social_links = data.get('social_links', {})
+                social_str = ', '.join([f"{k}: {v}" for k, v in social_links.items()])
+
+                # Calculate total content length
+                content_length = len(data.get('main_content', '')) + len(data.get('about_content', ''))
+
+                writer.writerow({
+                    'company_name': candidate.get('title', 'Unknown'),
+                    'url': data.get('url', ''),
+                    'snippet': candidate.get('snippet', '')[:300],  # From Phase 1
+                    'social_links': social_str[:500],
+                    'content_length': content_length,
+                    'scrape_method': data.get('scrape_method', 'requests'),
+                    'success': 'Yes' if data.get('success') else 'No'
+                })
 
         except Exception as e:
             print(f"  Warning: Could not save progress CSV: {e}")
 
-    def _scrape_with_playwright(self, url: str) -> tuple[str, BeautifulSoup]:
+    def _request(self, url: str, scheduled: bool = False, headers: Optional[Dict] = None) -> requests.Response:
+        """
+        Open a streaming GET once the host's politeness slot is free
+        (scheduled=True means the caller already reserved the slot).
+
+        Transient failures (connection errors, timeouts, 429, 5xx) are retried with
+        jittered exponential backoff; 429/503 with Retry-After push the host back further.
+        Failures that survive the retries count towards the domain's circuit breaker.
+        Raises CircuitOpenError without a request once the breaker is open,
+        SiteBlockedError (never retried) for bot challenges, and requests.HTTPError for error statuses.
+        Timeouts are capped by the company deadline; DeadlineExceeded once it is spent.
+        """
+        for attempt in range(FETCH_RETRIES + 1):
+            self.breaker.check(url)
+            self.deadline.check()
+            if (attempt or not scheduled) and not self.scheduler.wait(url, self.deadline.expires_at):
+                self.deadline.hit = True
+                raise DeadlineExceeded(f"Company budget spent waiting for {host_of(url)}")
+
+            response = None
+            try:
+                reset_connection_phases()
+                response = self.session.get(url, timeout=self.deadline.timeout(self.timeout), verify=False,
+                                            stream=True, headers=headers)
+                if response.status_code in (403, 429, 503):
+                    # A bot challenge will not go away on retry: tag it and cut the domain off
+                    head, _ = self._read_body(response, SNIFF_BYTES)
+                    challenge = classify_challenge(response.status_code, response.headers, head)
+                    if challenge:
+                        response.close()
+                        self.breaker.record_failure(url, 'blocked')
+                        raise SiteBlockedError(url, challenge['reason'])
+                if response.status_code in (429, 503):
+                    self.scheduler.defer(url, parse_retry_after(response.headers.get('Retry-After')))
+                response.raise_for_status()
+                self.breaker.record_success(url)
+
+                # Resolve/connect only happen on a new connection; the rest of the wait for headers is TTFB
+                phases = {phase: seconds for phase, seconds in connection_phases().items() if seconds}
+                response.timing = {**phases, 'status': response.status_code,
+                                   'ttfb': max(response.elapsed.total_seconds() - sum(phases.values()), 0.0)}
+                return response
+            except requests.RequestException as e:
+                if response is not None:
+                    response.close()
+                error = classify_error(e)
+                # Equal jitter: half the exponential step is fixed, half random
+                step = RETRY_BACKOFF_BASE * 2 ** attempt
+                backoff = step / 2 + random.uniform(0, step / 2)
+                if not error['transient'] or attempt == FETCH_RETRIES or backoff >= self.deadline.remaining():
+                    self.breaker.record_failure(url, error['kind'])
+                    raise
+                self.scheduler.defer(url, backoff, f"{error['kind']}, retry {attempt + 1}/{FETCH_RETRIES}")
+
+    def _fetch(self, url: str, max_bytes: int = MAX_PAGE_BYTES, scheduled: bool = False,
+               fields: Tuple[str, ...] = PAGE_FIELDS, wait_for_parse: bool = True, classify: bool = False) -> Dict:
+        """
+        Stream a URL, checking Content-Type and Content-Length before reading the body.
+        HTML is read up to max_bytes and parsed in the parse pool into a Page carrying
+        `fields`; anything else is handed to _handle_non_html without downloading the body.
+
+        Returns {'page': Page or None, 'document': dict or None}; with wait_for_parse=False
+        the page is left as {'parsing': Future} for the caller to collect.
+        With classify=True the response is also checked for parked/challenge/cookie-wall/dead
+        signatures and the result added as 'site_tag' ({'tag', 'reason'} or None).
+        """
+        response = self._request(url, scheduled)
+        try:
+            raw_content_type = response.headers.get('Content-Type', '')
+            content_type = raw_content_type.split(';')[0].strip().lower()
+            if content_type and content_type not in HTML_CONTENT_TYPES:
+                self._log_timing(url, response.timing)
+                return {'page': None, 'document': self._handle_non_html(url, response, content_type)}
+
+            content_length = response.headers.get('Content-Length', '')
+            if content_length.isdigit() and int(content_length) > max_bytes:
+                print(f"    ⚠️  Large page ({int(content_length) // 1024} KB), reading first {max_bytes // 1024} KB")
+
+            started = time.perf_counter()
+            body, truncated = self._read_body(response, max_bytes)
+            timing = {**response.timing, 'download': time.perf_counter() - started, 'bytes': len(body)}
+
+            # Servers without a Content-Type occasionally send PDFs
+            if not content_type and body.startswith(b'%PDF'):
+                self._log_timing(url, timing)
+                return {'page': None, 'document': self._handle_non_html(url, response, 'application/pdf')}
+
+            # Validators for conditional re-fetches in refresh mode (text_hash is added once parsed)
+            validators = {
+                'url': url,
+                'etag': response.headers.get('ETag', ''),
+                'last_modified': response.headers.get('Last-Modified', ''),
+            }
+
+            # Pass on the charset only when the server declared one; otherwise lxml reads <meta charset>
+            encoding = response.encoding if 'charset' in raw_content_type.lower() else None
+            parsing = self.parse_pool.submit(url, body, encoding=encoding, final_url=response.url,
+                                             content_type=content_type or 'text/html', truncated=truncated,
+                                             fields=fields)
+            if not wait_for_parse:
+                return {'page': None, 'document': None, 'parsing': parsing, 'validators': validators, 'timing': timing}
+
+            page = self.parse_pool.collect(parsing)
+            validators['text_hash'] = text_hash(page.main_text)
+            self._log_timing(url, {**timing, 'parse': page.parse_seconds})
+            fetched = {'page': page, 'document': None, 'validators': validators}
+            if classify:
+                fetched['site_tag'] = classify_site(body[:SNIFF_BYTES], page.metadata['title'],
+                                                    page.main_text, response.url)
+            return fetched
+        finally:
+            response.close()
+
+    def _log_timing(self, url: str, timing: Dict):
+        if self.timing_log:
+            self.timing_log.record(url, timing)
+
+    def _read_body(self, response: requests.Response, max_bytes: int) -> Tuple[bytes, bool]:
+        """Read a streamed body up to max_bytes (or until the company deadline); returns (body, truncated)"""
+        chunks = []
+        received = 0
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            chunks.append(chunk)
+            received += len(chunk)
+            if received >= max_bytes:
+                return b''.join(chunks)[:max_bytes], True
+            if self.deadline.expired:
+                return b''.join(chunks), True
+        return b''.join(chunks), False
+
+    def revalidate(self, record: Dict) -> bool:
+        """
+        Refresh mode: conditional GETs for the site pages stored with a record.
+        True only if every page answers 304 Not Modified or with the same extracted main text
+        (records whose validators predate text hashes are always re-scraped).
+        Pages whose sitemap lastmod is no later than the record's scraped_at are not requested at all.
+        """
+        validators = record.get('page_validators') or []
+        if not validators:
+            return False
+
+        # Its own budget: the previous company's may long be spent (scrape_company starts another one)
+        self.deadline = Deadline(COMPANY_BUDGET_SECONDS)
+
+        lastmods = {}
+        scraped_at = record.get('scraped_at')
+        if self.discovery and scraped_at:
+            self.discovery.deadline = self.deadline
+            try:
+                lastmods = self.discovery.lastmods(record['url'], datetime.fromisoformat(scraped_at).timestamp())
+            except Exception as e:
+                print(f"    Sitemap discovery error: {e}")
+
+        for validator in validators:
+            if unchanged_since(lastmods.get(canonicalize_url(validator['url'])), scraped_at):
+                self.pages_not_modified += 1
+                self.pages_unchanged_by_lastmod += 1
+                continue
+            try:
+                response = self._request(validator['url'], headers=conditional_headers(validator))
+            except Exception:
+                return False
+            try:
+                if response.status_code != 304:
+                    if not validator.get('text_hash'):
+                        return False
+                    body, truncated = self._read_body(response, MAX_PAGE_BYTES)
+                    raw_content_type = response.headers.get('Content-Type', '')
+                    encoding = response.encoding if 'charset' in raw_content_type.lower() else None
+                    page = self.parse_pool.parse(validator['url'], body, encoding=encoding, final_url=response.url,
+                                                 truncated=truncated, fields=('main_text',))
+                    if text_hash(page.main_text) != validator['text_hash']:
+                        return False
+            except Exception:
+                return False
+            finally:
+                response.close()
+            self.pages_not_modified += 1
+
+        return True
+
+    def _download(self, url: str, max_bytes: int) -> Optional[bytes]:
+        """Stream a binary file, giving up (None) if it is larger than max_bytes"""
+        response = self._request(url)
+        try:
+            content_length = response.headers.get('Content-Length', '')
+            if content_length.isdigit() and int(content_length) > max_bytes:
+                print(f"    Skipping large file ({int(content_length) // 1024} KB): {url[:80]}")
+                return None
+
+            started = time.perf_counter()
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                body.extend(chunk)
+                if len(body) > max_bytes:
+                    print(f"    Skipping large file (over {max_bytes // 1024} KB): {url[:80]}")
+                    return None
+            self._log_timing(url, {**response.timing, 'download': time.perf_counter() - started, 'bytes': len(body)})
+            return bytes(body)
+        finally:
+            response.close()
+
+    def _handle_non_html(self, url: str, response: requests.Response, content_type: str) -> Dict:
+        """Describe a non-HTML response (PDF, video, image, ...) without reading its body"""
+        content_length = response.headers.get('Content-Length', '')
+        is_pdf = content_type == 'application/pdf'
+        print(f"    Skipping non-HTML content ({content_type}): {url[:80]}")
+        return {
+            'url': url,
+            'final_url': response.url,
+            'content_type': content_type,
+            'content_length': int(content_length) if content_length.isdigit() else None,
+            'type': 'pdf' if is_pdf else 'other',
+        }
+
+    def _scrape_with_playwright(self, url: str) -> Optional[Page]:
         """Scrape using Playwright for JavaScript-rendered sites"""
+        if self.breaker.is_open(url):
+            return None
+        if self.dns_cache and self.dns_cache.is_dead(url):
+            print(f"    Skipping Playwright (domain does not resolve)")
+            return None
+        remaining = self.deadline.remaining()
+        if remaining < MIN_RENDER_SECONDS:
+            self.deadline.hit = True
+            print(f"    ⏱️  Skipping Playwright ({remaining:.0f}s of the company budget left)")
+            return None
         try:
             print(f"    → Using Playwright (JavaScript rendering)...")
+            started = time.perf_counter()
             with sync_playwright() as p:
                 browser = p.chromium.launch(headless=True)
                 context = browser.new_context(
@@ -164,31 +502,38 @@ Format your response as JSON:
                 page = context.new_page()
 
                 # Navigate and wait for content to load
-                page.goto(url, timeout=15000, wait_until='networkidle')
+                page.goto(url, timeout=int(min(15, self.deadline.remaining()) * 1000), wait_until='networkidle')
 
                 # Wait a bit more for dynamic content
-                page.wait_for_timeout(2000)
+                page.wait_for_timeout(int(min(2, self.deadline.remaining()) * 1000))
 
                 # Get the rendered HTML
                 html = page.content()
                 browser.close()
 
-                # Parse with BeautifulSoup
-                soup = BeautifulSoup(html, 'html.parser')
-                return html, soup
+            rendered = time.perf_counter() - started
+            body = html.encode('utf-8')
+            page = self.parse_pool.parse(url, body, encoding='utf-8')
+            self._log_timing(url, {'render': rendered, 'parse': page.parse_seconds, 'bytes': len(body)})
+            return page
 
         except Exception as e:
             print(f"    Playwright error: {e}")
-            return None, None
+            return None
 
     def scrape_website(self, url: str, use_playwright: bool = False) -> Dict:
         """
-        Scrape a company website and collect relevant information
+        Scrape a company homepage: main text, classified links and social profiles
         Falls back to Playwright if content is minimal
+        Subpages (about, team, investor, news) are fetched by scrape_company
         """
-        result = {
+        return self._scrape_homepage(url, use_playwright)[0]
+
+    def _new_result(self, url: str) -> Dict:
+        return {
             'url': url,
             'success': False,
+            'page_title': '',
             'main_content': '',
             'investor_pages': [],
             'pdfs': [],
@@ -197,238 +542,521 @@ Format your response as JSON:
             'contact_info': {},
             'social_links': {},
             'scrape_method': 'requests',
-            'error': None
+            'error': None,
+            'error_kind': None,
+            'home_simhashes': [],
+            'page_validators': []
         }
 
+    def _scrape_homepage(self, url: str, use_playwright: bool = False) -> Tuple[Dict, Optional[Page]]:
+        """Scrape a homepage and also return its parsed Page so subpage planning can reuse it"""
+        page = None
+        result = self._new_result(url)
         try:
             print(f"  Scraping: {url}")
 
             # Try standard requests first (unless playwright explicitly requested)
             if not use_playwright:
-                response = self.session.get(url, timeout=self.timeout, verify=False)
-                response.raise_for_status()
-                html = response.content
-                soup = BeautifulSoup(html, 'html.parser')
+                fetched = self._fetch(url, classify=True)
+                document = fetched['document']
+                if document:
+                    if document['type'] == 'pdf':
+                        result['pdfs'].append({'url': url, 'link_text': '', 'priority': 'high'})
+                    raise Exception(f"Non-HTML content ({document['content_type']})")
+                page = fetched['page']
+                result['page_validators'].append(fetched['validators'])
                 result['scrape_method'] = 'requests'
+
+                # Parked domains, challenges, cookie walls and dead sites: no rendering, no subpages
+                if fetched.get('site_tag'):
+                    self._tag_site(result, fetched['site_tag'])
+                    return result, None
             else:
-                html, soup = self._scrape_with_playwright(url)
-                if soup is None:
+                page = self._scrape_with_playwright(url)
+                if page is None:
                     raise Exception("Playwright scraping failed")
                 result['scrape_method'] = 'playwright'
 
             # Extract main text content
-            result['main_content'] = self._extract_text_content(soup)
+            result['main_content'] = self._extract_text_content(page)
+            if fingerprintable(page.main_text):
+                result['home_simhashes'].append(f"{page.simhash:016x}")
 
             # If content is very short, retry with Playwright
             if len(result['main_content']) < 500 and not use_playwright:
                 print(f"    ⚠️  Low content ({len(result['main_content'])} chars), retrying with Playwright...")
-                html, soup = self._scrape_with_playwright(url)
-                if soup:
-                    result['main_content'] = self._extract_text_content(soup)
+                rendered = self._scrape_with_playwright(url)
+                if rendered:
+                    page = rendered
+                    result['main_content'] = self._extract_text_content(page)
                     result['scrape_method'] = 'playwright'
+                    if fingerprintable(page.main_text):
+                        result['home_simhashes'].append(f"{page.simhash:016x}")
 
-            # Find investor-related pages
-            result['investor_pages'] = self._find_investor_pages(soup, url)
+            result['page_title'] = page.metadata['title']
 
-            # Find PDFs (pitch decks, investor materials, etc.)
-            result['pdfs'] = self._find_pdfs(soup, url)
-
-            # Look for about/contact pages
-            about_data = self._find_about_content_with_url(soup, url)
-            result['about_content'] = about_data['content']
-            result['about_page_url'] = about_data['url']
-
-            # Extract social media links
-            result['social_links'] = self._extract_social_links(soup)
+            # Classify every link in one pass (investor pages, PDFs, about pages, social)
+            links = page.links
+            result['investor_pages'] = links['investor'][:MAX_INVESTOR_LINKS]
+            result['pdfs'] = links['pdf'][:MAX_PDF_LINKS]
+            result['social_links'] = links['social']
 
             result['success'] = True
 
+        except SiteBlockedError as e:
+            self._tag_site(result, {'tag': 'bot_challenge', 'reason': e.reason})
+            page = None
+
         except Exception as e:
             result['error'] = str(e)
-            print(f"  Error scraping {url}: {e}")
-
-        return result
-
-    def _extract_text_content(self, soup: BeautifulSoup) -> str:
-        """Extract main text content from page"""
-        # Remove script and style elements
-        for script in soup(['script', 'style', 'nav', 'footer', 'header']):
-            script.decompose()
-
-        # Get text
-        text = soup.get_text(separator='\n', strip=True)
-
-        # Clean up whitespace
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        text = '\n'.join(lines)
-
-        # Limit length
-        return text[:50000]  # Limit to ~50KB
-
-    def _find_investor_pages(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
-        """Find links to investor/partner/team/funding pages"""
-        investor_pages = []
-
-        # Expanded keywords for better detection
-        investor_keywords = [
-            'investor', 'funding', 'partner', 'about', 'team', 'careers',
-            'founder', 'leadership', 'company', 'who we are', 'our story',
-            'press', 'news', 'newsroom', 'media', 'blog',
-            'series a', 'series b', 'series c', 'venture', 'capital',
-            'raise', 'investment', 'backed by', 'portfolio'
-        ]
-
-        for link in soup.find_all('a', href=True):
-            href = link.get('href', '')
-            text = link.get_text().lower().strip()
-
-            # Check if link text or URL contains investor keywords
-            if any(keyword in text or keyword in href.lower() for keyword in investor_keywords):
-                full_url = urljoin(base_url, href)
-
-                # Avoid duplicates and external domains
-                if self._is_same_domain(base_url, full_url):
-                    # Prioritize certain keywords
-                    priority = 'high' if any(kw in text or kw in href.lower()
-                                            for kw in ['investor', 'funding', 'founder', 'team', 'about', 'press', 'news']) else 'normal'
-
-                    investor_pages.append({
-                        'url': full_url,
-                        'link_text': link.get_text().strip(),
-                        'type': 'investor_page',
-                        'priority': priority
-                    })
-
-        # Deduplicate
-        seen = set()
-        unique_pages = []
-        for page in investor_pages:
-            if page['url'] not in seen:
-                seen.add(page['url'])
-                unique_pages.append(page)
-
-        # Sort by priority (high priority first)
-        unique_pages.sort(key=lambda x: 0 if x.get('priority') == 'high' else 1)
-
-        return unique_pages[:15]  # Increased limit to 15
-
-    def _find_pdfs(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
-        """Find PDF links (pitch decks, investor materials, etc.)"""
-        pdfs = []
-
-        # Find all links to PDFs
-        for link in soup.find_all('a', href=True):
-            href = link.get('href', '')
-
-            if '.pdf' in href.lower() or 'issuu.com' in href.lower():
-                full_url = urljoin(base_url, href)
-                text = link.get_text().strip()
-
-                # Prioritize investor-related PDFs
-                investor_terms = ['investor', 'pitch', 'deck', 'funding', 'overview']
-                priority = 'high' if any(term in text.lower() or term in href.lower()
-                                        for term in investor_terms) else 'normal'
+            result['error_kind'] = classify_error(e)['kind']
+            print(f"  Error scraping {url} ({result['error_kind']}): {e}")
+            page = None
+
+        return result, page
+
+    def _tag_site(self, result: Dict, site_tag: Dict):
+        """Mark a homepage scrape as a parked/challenge/cookie-wall/dead site; it is not sent downstream"""
+        label = TAG_LABELS[site_tag['tag']]
+        result['site_tag'] = site_tag['tag']
+        result['site_tag_reason'] = site_tag['reason']
+        result['success'] = False
+        result['error'] = f"{label}: {site_tag['reason']}"
+        result['error_kind'] = site_tag['tag']
+        print(f"  🚫 Tagged as {label} ({site_tag['reason']}), skipping rendering, subpages and LLM stages")
+
+    def _merge_into(self, result: Dict, owner: str):
+        """Mark a company as sharing its site with an already scraped one; deduplicate.py folds it in"""
+        result['merged_into'] = owner
+        result['success'] = False
+        result['error'] = f"Same site as {owner}"
+        result['error_kind'] = 'merged'
+        print(f"  🔗 Same site as {owner}, skipping subpages")
+
+    def _extract_text_content(self, page: Page, max_chars: int = MAX_MAIN_CONTENT_SIZE) -> str:
+        """Extract main text content from page (nav/header/footer excluded, tree left intact)"""
+        return page.main_text[:max_chars]
+
+    def fetch_article(self, url: str, scheduled: bool = False) -> Optional[Dict]:
+        """
+        Lightweight fetch for news/press URLs: one request, readability-style article
+        extraction, no subpage discovery and no browser fallback.
+        Parsed articles are shared through the URL cache; failures are remembered for the run.
+        """
+        hit, data = self.url_cache.get(url, ARTICLE_FIELDS)
+        if hit:
+            print(f"    Article cache hit: {url[:60]}...")
+            return self._article(url, Page.from_extracted(data)) if data else None
 
-                pdfs.append({
-                    'url': full_url,
-                    'link_text': text,
-                    'priority': priority
-                })
+        try:
+            print(f"    Fetching article: {url[:60]}...")
+            page = self._fetch(url, scheduled=scheduled, fields=ARTICLE_FIELDS)['page']
+        except DeadlineExceeded as e:
+            # Not remembered: another company citing the article may have time for it
+            print(f"    Skipping article: {e}")
+            return None
+        except Exception as e:
+            print(f"    Error fetching article: {e}")
+            page = None
 
-        # Sort by priority
-        pdfs.sort(key=lambda x: 0 if x['priority'] == 'high' else 1)
+        if page is None:
+            self.url_cache.put_failure(url)
+            return None
+        self.url_cache.put(url, page.extract(ARTICLE_FIELDS), ARTICLE_FIELDS)
+        return self._article(url, page)
 
-        return pdfs[:15]  # Limit to top 15
+    def _article(self, url: str, page: Page) -> Dict:
+        return {
+            'url': url,
+            'final_url': page.final_url,
+            'title': page.metadata['title'],
+            'content': page.article_text[:MAX_ARTICLE_CONTENT_SIZE]
+        }
 
-    def _find_about_content_with_url(self, soup: BeautifulSoup, base_url: str) -> Dict:
-        """Try to find and scrape about/company/team page, return content and URL"""
-        about_keywords = [
-            'about', 'mission', 'history', 'our story', 'company',
-            'who we are', 'our team', 'leadership', 'founders'
-        ]
+    def build_fetch_plan(self, home_url: str, home_page: Optional[Page], news_urls: List[str],
+                         sitemap_pages: Optional[List[Dict]] = None) -> Dict[str, Dict]:
+        """
+        Build the set of pages to fetch for one company, keyed by canonical URL.
+        Each entry carries every role the URL plays (home, about, team, investor, news),
+        so a page linked as both "About" and "Team" is fetched once.
+        Sitemap-discovered pages are added alongside the homepage links.
+        With a trained link scorer, all site links compete for PAGE_BUDGET slots, best first.
+        """
+        plan = {}
+
+        def add(url: str, role: str, link_text: str = ''):
+            # Routes that served the homepage again on an earlier scrape are not followed
+            if role not in ('home', 'news') and self.discovery and self.discovery.is_shell_route(url):
+                return
+            key = canonicalize_url(url)
+            entry = plan.setdefault(key, {'url': url, 'roles': [], 'link_text': link_text})
+            if role not in entry['roles']:
+                entry['roles'].append(role)
+
+        add(home_url, 'home')
+
+        about_limit, investor_limit = MAX_ABOUT_CANDIDATES, MAX_INVESTOR_PAGES
+        if self.link_scorer:
+            about_limit = investor_limit = MAX_INVESTOR_LINKS
+
+        if home_page is not None:
+            links = home_page.links
+            for about_url in links['about'][:about_limit]:
+                add(about_url, 'about')
+            for link in links['investor'][:investor_limit]:
+                add(link['url'], link.get('role', 'investor'), link.get('link_text', ''))
+
+        for sitemap_page in sitemap_pages or []:
+            add(sitemap_page['url'], sitemap_page['role'])
+
+        if self.link_scorer:
+            site_keys = [key for key, entry in plan.items() if 'home' not in entry['roles']]
+            for key in site_keys:
+                plan[key]['score'] = round(self.link_scorer.score(plan[key]['url'], plan[key]['link_text']), 3)
+            ranked = sorted(site_keys, key=lambda k: -plan[k]['score'])
+            for key in ranked[PAGE_BUDGET:]:
+                del plan[key]
+
+        for news_url in news_urls[:MAX_NEWS_URLS]:
+            add(news_url, 'news')
+
+        return plan
+
+    def _fetch_plan(self, plan: Dict[str, Dict], fetched: Dict[str, Dict]) -> Dict[str, Dict]:
+        """
+        Fetch every planned URL not already in `fetched`, concurrently, each exactly once.
+        URLs are dispatched as soon as their host's politeness slot is free, so while one
+        host cools down the workers move on to other hosts (news sites, CDNs).
+        Fetch threads only download; parsing is collected from the parse pool at the end.
+        Pages not yet started when the company deadline runs out are skipped (error_kind 'deadline').
+        News and off-site pages (press, investor portfolios) go through the run-wide URL cache.
+        """
+        pending = [key for key in plan if key not in fetched]
+        if not pending:
+            return fetched
+
+        home_hosts = {host_of(entry['url']).removeprefix('www.') for entry in plan.values() if 'home' in entry['roles']}
+        shared = {key for key, entry in plan.items()
+                  if 'news' in entry['roles'] or host_of(entry['url']).removeprefix('www.') not in home_hosts}
+
+        def fields_for(key: str) -> Tuple[str, ...]:
+            return ARTICLE_FIELDS if 'news' in plan[key]['roles'] else PAGE_FIELDS
+
+        def fetch_one(key: str) -> Dict:
+            url = plan[key]['url']
+            if plan[key]['roles'] == ['news']:
+                return {'page': None, 'document': None, 'article': self.fetch_article(url, scheduled=True)}
+            if key in shared:
+                hit, data = self.url_cache.get(url, fields_for(key))
+                if hit:
+                    return {'page': Page.from_extracted(data) if data else None, 'document': None, 'cached': True}
+            try:
+                return self._fetch(url, scheduled=True, fields=fields_for(key), wait_for_parse=False)
+            except Exception as e:
+                print(f"    Error fetching {url[:80]}: {e}")
+                error_kind = classify_error(e)['kind']
+                if key in shared and error_kind != 'deadline':
+                    self.url_cache.put_failure(url)
+                return {'page': None, 'document': None, 'error': str(e), 'error_kind': error_kind}
+
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES) as executor:
+            while pending or in_flight:
+                if pending and self.deadline.expired:
+                    print(f"  ⏱️  Company budget spent, skipping {len(pending)} unfetched pages")
+                    for key in pending:
+                        fetched[key] = {'page': None, 'document': None, 'error': 'Company budget spent',
+                                        'error_kind': 'deadline'}
+                    pending = []
+                    continue
 
-        for link in soup.find_all('a', href=True):
-            href = link.get('href', '').lower()
-            text = link.get_text().lower().strip()
+                for key in list(pending):
+                    if len(in_flight) >= MAX_CONCURRENT_FETCHES:
+                        break
+                    url = plan[key]['url']
+                    # Cached pages need no request (or slot)
+                    cached = key in shared and self.url_cache.contains(url, fields_for(key))
+                    if cached or self.scheduler.try_reserve(url):
+                        pending.remove(key)
+                        in_flight[executor.submit(fetch_one, key)] = key
+
+                if not in_flight:
+                    # Every pending host is cooling down: sleep until the first one is free
+                    delay = self.scheduler.next_ready(plan[key]['url'] for key in pending) - time.monotonic()
+                    time.sleep(max(min(delay, self.deadline.remaining()), 0.01))
+                    continue
 
-            if any(keyword in href or keyword in text for keyword in about_keywords):
+                timeout = None
+                if pending:
+                    delay = self.scheduler.next_ready(plan[key]['url'] for key in pending) - time.monotonic()
+                    timeout = max(min(delay, self.deadline.remaining()), 0.01)
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    fetched[in_flight.pop(future)] = future.result()
+
+        for key, outcome in fetched.items():
+            if 'parsing' in outcome:
+                timing = outcome.pop('timing')
                 try:
-                    full_url = urljoin(base_url, link.get('href'))
-                    if self._is_same_domain(base_url, full_url):
-                        response = self.session.get(full_url, timeout=self.timeout, verify=False)
-                        about_soup = BeautifulSoup(response.content, 'html.parser')
-                        content = self._extract_text_content(about_soup)
-                        if len(content) > 200:  # Only return if meaningful content
-                            return {
-                                'content': content[:15000],  # Increased limit to 15KB
-                                'url': full_url
-                            }
-                except:
-                    pass
-
-        return {'content': '', 'url': ''}
-
-    def _extract_social_links(self, soup: BeautifulSoup) -> Dict:
-        """Extract social media links"""
-        social = {}
-        social_platforms = {
-            'facebook.com': 'facebook',
-            'twitter.com': 'twitter',
-            'x.com': 'twitter',
-            'instagram.com': 'instagram',
-            'linkedin.com': 'linkedin',
-            'youtube.com': 'youtube',
-            'crunchbase.com': 'crunchbase'
-        }
+                    outcome['page'] = self.parse_pool.collect(outcome.pop('parsing'))
+                    outcome['validators']['text_hash'] = text_hash(outcome['page'].main_text)
+                    timing['parse'] = outcome['page'].parse_seconds
+                    if key in shared:
+                        self.url_cache.put(plan[key]['url'], outcome['page'].extract(fields_for(key)), fields_for(key))
+                except Exception as e:
+                    print(f"    Error parsing {plan[key]['url'][:80]}: {e}")
+                self._log_timing(plan[key]['url'], timing)
+
+        return fetched
+
+    def _pdfs_to_extract(self, result: Dict) -> List[Dict]:
+        """High-priority PDFs from the homepage and investor pages, de-duplicated"""
+        pdf_links = list(result.get('pdfs', []))
+        for page in result.get('investor_page_content', []):
+            pdf_links.extend(page.get('pdfs', []))
+
+        selected = {}
+        for pdf in pdf_links:
+            if pdf.get('priority') != 'high':
+                continue
+            selected.setdefault(canonicalize_url(pdf['url']), pdf)
+            if len(selected) >= MAX_PDFS_TO_EXTRACT:
+                break
+        return list(selected.values())
+
+    def _extract_pdfs(self, result: Dict):
+        """
+        Download high-priority PDFs concurrently and extract their text in the process pool.
+        Each PDF is queued for parsing as soon as its download finishes.
+        """
+        pdfs = self._pdfs_to_extract(result)
+        if not pdfs:
+            return
+        if self.deadline.expired:
+            print(f"  ⏱️  Company budget spent, skipping {len(pdfs)} PDFs")
+            return
 
-        for link in soup.find_all('a', href=True):
-            href = link.get('href', '')
-            for domain, platform in social_platforms.items():
-                if domain in href:
-                    social[platform] = href
-                    break
+        print(f"  Extracting text from {len(pdfs)} PDFs")
 
-        return social
+        def download(pdf: Dict) -> Optional[bytes]:
+            try:
+                data = self._download(pdf['url'], MAX_PDF_BYTES)
+            except Exception as e:
+                print(f"    Error downloading PDF: {e}")
+                return None
+            return data if data and data.lstrip()[:4] == b'%PDF' else None
+
+        parse_jobs = {}
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES) as executor:
+            downloads = {executor.submit(download, pdf): i for i, pdf in enumerate(pdfs)}
+            for future in as_completed(downloads):
+                data = future.result()
+                if data:
+                    parse_jobs[downloads[future]] = self.pdf_extractor.submit(data)
+
+        pdf_content = []
+        for i in sorted(parse_jobs):
+            extracted = self.pdf_extractor.collect(parse_jobs[i], timeout=max(self.deadline.remaining(), 1.0))
+            if extracted['text']:
+                pdf_content.append({
+                    'url': pdfs[i]['url'],
+                    'link_text': pdfs[i].get('link_text', ''),
+                    'pages': extracted['pages'],
+                    'total_pages': extracted['total_pages'],
+                    'text': extracted['text']
+                })
 
-    def _is_same_domain(self, url1: str, url2: str) -> bool:
-        """Check if two URLs are from the same domain"""
-        try:
-            domain1 = urlparse(url1).netloc
-            domain2 = urlparse(url2).netloc
-            return domain1 == domain2
-        except:
-            return False
+        result['pdf_content'] = pdf_content
 
-    def scrape_investor_pages(self, investor_pages: List[Dict]) -> List[Dict]:
+    def scrape_company(self, candidate: Dict) -> Dict:
         """
-        Scrape individual investor pages for detailed information
+        Scrape one company: homepage first, then a de-duplicated fetch plan covering
+        about, team, investor and news pages, fetched concurrently and assigned back to roles
         """
-        results = []
-
-        for page in investor_pages[:8]:  # Increased to top 8 investor pages
-            try:
-                print(f"    Scraping investor page: {page['url']}")
-                response = self.session.get(page['url'], timeout=self.timeout, verify=False)
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                content = self._extract_text_content(soup)
+        url = candidate['url']
+
+        # One wall-clock budget for everything below: discovery, homepage, render, subpages, PDFs
+        self.deadline = Deadline(COMPANY_BUDGET_SECONDS)
+        if self.discovery:
+            self.discovery.deadline = self.deadline
+
+        # Redirected to a site another company already owns on an earlier fetch: no requests at all
+        owner = self.site_merges.owner_of(url)
+        if owner:
+            result = self._new_result(url)
+            self._merge_into(result, owner)
+            return self._finish_early(result)
+
+        # Sitemap discovery runs alongside the homepage fetch; it needs no rendered page
+        sitemap_pages = []
+        if self.discovery:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                discovery = executor.submit(self.discovery.discover, url, MAX_SITEMAP_PAGES)
+                result, home_page = self._scrape_homepage(url)
+                try:
+                    sitemap_pages = discovery.result()
+                except Exception as e:
+                    print(f"    Sitemap discovery error: {e}")
+            if sitemap_pages:
+                print(f"  Sitemap: {len(sitemap_pages)} candidate pages")
+        else:
+            result, home_page = self._scrape_homepage(url)
+
+        if result.get('site_tag'):
+            return self._finish_early(result)
+
+        # Collapse companies that resolve to the same site before their subpages are fetched
+        if home_page is not None:
+            result['final_url'] = home_page.final_url
+            result['canonical_url'] = home_page.metadata['canonical_url']
+            owner = self.site_merges.claim(url, result['final_url'], result['canonical_url'])
+            if owner:
+                self._merge_into(result, owner)
+                return self._finish_early(result)
+
+        plan = self.build_fetch_plan(url, home_page, candidate.get('investor_info_urls', []), sitemap_pages)
+        home_key = canonicalize_url(url)
+        fetched = {home_key: {'page': home_page, 'document': None}}
+
+        if self.dns_cache:
+            self.dns_cache.prefetch(entry['url'] for entry in plan.values())
+
+        planned_links = sum(1 for entry in plan.values() for role in entry['roles'] if role != 'home')
+        print(f"  Fetch plan: {len(plan) - 1} pages for {planned_links} links")
+        fetched = self._fetch_plan(plan, fetched)
+
+        investor_page_content = []
+        investor_info_content = []
+
+        # Near-duplicate pages (SimHash) are used once; pages repeating the homepage
+        # (raw or rendered) are SPA shells. Pages without text have no fingerprint and are not compared
+        home_fingerprints = [int(h, 16) for h in result['home_simhashes']]
+        kept_fingerprints = list(home_fingerprints)
+        dedup = {'pages_dropped': 0, 'chars_dropped': 0, 'shell_pages': 0}
+        site_pages = 0
+        shell_urls = []
+
+        for key, entry in plan.items():
+            outcome = fetched.get(key, {})
+            page = outcome.get('page')
+            document = outcome.get('document')
+            roles = entry['roles']
+
+            if page is not None and key != home_key and roles != ['news'] and fingerprintable(page.main_text):
+                site_pages += 1
+                if is_near_duplicate(page.simhash, home_fingerprints):
+                    dedup['shell_pages'] += 1
+                    shell_urls.append(entry['url'])
+                if is_near_duplicate(page.simhash, kept_fingerprints):
+                    dedup['pages_dropped'] += 1
+                    dedup['chars_dropped'] += len(self._extract_text_content(page))
+                    page = None
+                else:
+                    kept_fingerprints.append(page.simhash)
+
+            # About: first candidate (in link order) with meaningful content
+            if 'about' in roles and page is not None and not result['about_page_url']:
+                content = self._extract_text_content(page, MAX_ABOUT_CONTENT_SIZE)
+                if len(content) > 200:  # Only keep if meaningful content
+                    result['about_content'] = content
+                    result['about_page_url'] = entry['url']
+
+            if 'team' in roles or 'investor' in roles:
+                if page is not None:
+                    investor_page_content.append({
+                        'url': entry['url'],
+                        'content': self._extract_text_content(page),
+                        'pdfs': page.links['pdf'][:MAX_PDF_LINKS]
+                    })
+                elif document and document['type'] == 'pdf':
+                    # Investor links that point straight at a deck are kept as PDFs
+                    investor_page_content.append({
+                        'url': entry['url'],
+                        'content': '',
+                        'content_type': document['content_type'],
+                        'pdfs': [{'url': entry['url'], 'link_text': entry['link_text'], 'priority': 'high'}]
+                    })
 
-                results.append({
-                    'url': page['url'],
-                    'content': content,
-                    'pdfs': self._find_pdfs(soup, page['url'])
-                })
+            if 'news' in roles:
+                article = outcome.get('article')
+                if article is None and page is not None:
+                    article = {'content': page.article_text[:MAX_ARTICLE_CONTENT_SIZE]}
+                if article:
+                    investor_info_content.append({
+                        'url': entry['url'],
+                        'content': article['content']
+                    })
 
-                time.sleep(1)  # Rate limiting
+        result['dedup_stats'] = dedup
+        if dedup['pages_dropped']:
+            print(f"  Dedup: dropped {dedup['pages_dropped']} near-duplicate pages ({dedup['chars_dropped']:,} chars), "
+                  f"{dedup['shell_pages']} identical to the homepage")
+        if shell_urls and self.discovery:
+            # Every subpage repeating the homepage means an SPA shell: stop following the whole site
+            whole_site = len(shell_urls) >= 2 and len(shell_urls) == site_pages
+            for shell_url in shell_urls:
+                self.discovery.mark_shell_route(shell_url, whole_site)
 
-            except Exception as e:
-                print(f"    Error scraping investor page: {e}")
+        if result['investor_pages']:
+            print(f"  Found {len(result['investor_pages'])} investor pages")
+            result['investor_page_content'] = investor_page_content
+
+        if candidate.get('investor_info_urls'):
+            print(f"  Found {len(candidate['investor_info_urls'])} investor info sources (news/press releases)")
+            result['investor_info_content'] = investor_info_content
+
+        # Drop the site's shared menus, banners and footers from its own pages
+        if ENABLE_TEMPLATE_FILTER:
+            template = strip_site_template(result, TEMPLATE_LINE_THRESHOLD)
+            result['template_stats'] = template
+            if template['template_lines']:
+                print(f"  Template: {template['template_lines']} repeated lines across {template['pages']} pages, "
+                      f"{template['chars_removed']:,} chars (~{template['tokens_saved']:,} tokens) removed")
+
+        if self.pdf_extractor:
+            self._extract_pdfs(result)
+
+        if self.discovery:
+            self.discovery.save()
+
+        result['fetch_plan'] = []
+        for key, entry in plan.items():
+            record = {field: entry[field] for field in ('url', 'roles', 'link_text', 'score') if field in entry}
+            # Whether it came back as a page or document, where it ended up (redirects)
+            # and which URL the page declares canonical
+            outcome = fetched.get(key, {})
+            page = outcome.get('page')
+            record['fetched'] = page is not None or outcome.get('document') is not None
+            if page is not None:
+                record['final_url'] = page.final_url
+                record['canonical_url'] = page.metadata['canonical_url']
+            result['fetch_plan'].append(record)
+
+        # Validators and hashes for refresh mode (news articles live on other sites and are not revalidated)
+        for key, entry in plan.items():
+            validators = fetched.get(key, {}).get('validators')
+            if validators and key != home_key and 'news' not in entry['roles']:
+                result['page_validators'].append(validators)
+        result['content_hash'] = content_hash(result)
+        result['scraped_at'] = datetime.now(timezone.utc).isoformat()
+        result['timing'] = self.deadline.stats()
+        return result
 
-        return results
+    def _finish_early(self, result: Dict) -> Dict:
+        """Close out a tagged or merged company after its homepage: no subpages, PDFs or discovery"""
+        result['fetch_plan'] = [{'url': result['url'], 'roles': ['home']}]
+        result['content_hash'] = content_hash(result)
+        result['scraped_at'] = datetime.now(timezone.utc).isoformat()
+        result['timing'] = self.deadline.stats()
+        return result
 
 
-def main():
-    """Run web scraping on discovered candidates"""
+def main(export_json: bool = False, refresh: bool = False, refresh_ttl_days: float = REFRESH_TTL_DAYS):
+    """
+    Run web scraping on discovered candidates.
+    With refresh=True, companies scraped more than refresh_ttl_days ago are revalidated too;
+    those whose text changed are re-scraped and removed from the Stage 3/4 outputs for reprocessing.
+    """
     print("=" * 60)
     print("STAGE 2: WEB SCRAPING & CONTENT COLLECTION")
     print("=" * 60)
@@ -441,17 +1069,28 @@ def main():
         print("Error: stage_1.json not found. Run stage_1.py first.")
         return
 
-    # Load existing scraped data if it exists
-    output_file = '../outputs/stage_2.json'
-    scraped_data = []
-    scraped_urls = set()
-
-    if os.path.exists(output_file):
+    # Open the append-only results store (one JSON line per company, page text in the blob store)
+    # Records from earlier runs may reference the blob pack even with ENABLE_BLOB_STORE off:
+    # an existing pack is always opened for reads, new text only goes into it when enabled
+    blobs = BlobStore(BLOB_PACK_FILE) if ENABLE_BLOB_STORE or os.path.exists(BLOB_PACK_FILE) else None
+    store = Stage2Store(STAGE_2_JSONL, blobs, write_blobs=ENABLE_BLOB_STORE)
+    migrated = migrate_legacy_json(store, LEGACY_STAGE_2_JSON)
+    if migrated:
+        print(f"\n📁 Migrated {migrated} companies from {LEGACY_STAGE_2_JSON} to {STAGE_2_JSONL}")
+    elif len(store):
         print(f"\n📁 Found existing scraped data file")
-        with open(output_file, 'r', encoding='utf-8') as f:
-            scraped_data = json.load(f)
-        scraped_urls = {d['url'] for d in scraped_data}
-        print(f"   Loaded {len(scraped_data)} existing scraped companies")
+        print(f"   Loaded {len(store)} existing scraped companies")
+    scraped_urls = store.urls()
+
+    # Companies whose last scrape failed transiently (timeout, refused connection, 5xx)
+    retry_queue = RetryQueue(RETRY_QUEUE_FILE, MAX_RETRY_RUNS)
+    retry_urls = retry_queue.due()
+
+    # Refresh mode: successful scrapes older than the TTL are revalidated
+    stale_urls = set()
+    if refresh:
+        stale_urls = {url for url, entry in store.index.items()
+                      if entry['success'] and is_stale(entry.get('scraped_at'), refresh_ttl_days)}
 
     scraper = CompanyScraper()
 
@@ -467,92 +1106,217 @@ def main():
 
     candidates_to_process = candidates[:limit] if limit is not None else candidates
 
-    # Filter out already scraped candidates and those without URLs
+    # Filter out already scraped candidates (unless queued for retry or stale) and those without URLs
     new_candidates = [c for c in candidates_to_process
-                     if c['url'] not in scraped_urls
+                     if (c['url'] not in scraped_urls or c['url'] in retry_urls or c['url'] in stale_urls)
                      and c.get('url') != 'URL_NEEDED']
 
     skipped_no_url = sum(1 for c in candidates_to_process if c.get('url') == 'URL_NEEDED')
     skipped_scraped = len(candidates_to_process) - len(new_candidates) - skipped_no_url
-
-    print(f"\n🔍 Found {len(new_candidates)} NEW companies to scrape")
+    retrying = sum(1 for c in new_candidates if c['url'] in scraped_urls and c['url'] in retry_urls)
+    refreshing = sum(1 for c in new_candidates if c['url'] in stale_urls)
+
+    print(f"\n🔍 Found {len(new_candidates) - retrying - refreshing} NEW companies to scrape")
+    if retrying:
+        print(f"   Retrying {retrying} companies that failed transiently last run")
+    if refresh:
+        print(f"   Refreshing {refreshing} companies scraped more than {refresh_ttl_days:g} days ago")
     print(f"   Skipping {skipped_scraped} already scraped")
     if skipped_no_url > 0:
         print(f"   Skipping {skipped_no_url} without URLs (run stage_1b.py to find URLs)")
 
     if not new_candidates:
         print("⚠️  No new companies to scrape! All candidates have already been processed.")
-        return scraped_data
+        store.close()
+        if blobs:
+            blobs.close()
+        return store
 
     # CSV progress file
     csv_progress_file = '../outputs/stage_2_progress.csv'
+    error_kinds = Counter()
+    site_tags = Counter()
+    merged_this_run = 0
+    company_seconds = []
+    budget_hits = 0
+    template_tokens_saved = 0
+    dedup_totals = Counter()
+    subpages_fetched = 0
+    refresh_unchanged = 0
+    changed_urls = []
 
     for i, candidate in enumerate(new_candidates, 1):
         print(f"\n[{i}/{len(new_candidates)}] Processing: {candidate['title']}")
 
-        # Scrape main website
-        result = scraper.scrape_website(candidate['url'])
+        # Resolve this and the next few companies' hosts in the background, off the critical path
+        if scraper.dns_cache:
+            scraper.dns_cache.prefetch(c['url'] for c in new_candidates[i - 1:i + DNS_PREFETCH_HOSTS])
+
+        # Refresh: conditional GETs first; a company whose pages all validate is not re-scraped
+        old = store.get(candidate['url']) if candidate['url'] in stale_urls else None
+        if old is not None and scraper.revalidate(old):
+            print(f"  ✓ Unchanged since {old.get('scraped_at') or 'last scrape'}, keeping stored content")
+            old['scraped_at'] = datetime.now(timezone.utc).isoformat()
+            store.append(old, new_references=False)
+            refresh_unchanged += 1
+            continue
+
+        # Scrape homepage, then about/team/investor/news pages from one de-duplicated fetch plan
+        result = scraper.scrape_company(candidate)
         result['candidate_info'] = candidate
 
-        # If investor pages found, scrape them too
-        if result['investor_pages']:
-            print(f"  Found {len(result['investor_pages'])} investor pages")
-            result['investor_page_content'] = scraper.scrape_investor_pages(result['investor_pages'])
-
-        # If investor info URLs found from news/press releases, scrape those too
-        investor_info_urls = candidate.get('investor_info_urls', [])
-        if investor_info_urls:
-            print(f"  Found {len(investor_info_urls)} investor info sources (news/press releases)")
-            result['investor_info_content'] = []
-            for info_url in investor_info_urls[:3]:  # Limit to top 3 to avoid too many requests
-                try:
-                    print(f"    Scraping investor info: {info_url[:60]}...")
-                    info_result = scraper.scrape_website(info_url)
-                    if info_result['success']:
-                        result['investor_info_content'].append({
-                            'url': info_url,
-                            'content': info_result['main_content'][:10000]  # Limit content size
-                        })
-                    time.sleep(1)  # Rate limiting
-                except Exception as e:
-                    print(f"    Error scraping investor info URL: {e}")
-                    continue
+        if old is not None:
+            # A transient failure says nothing about the site: keep the stored scrape.
+            # Tagged, merged or permanently failing sites replace it.
+            if not result['success'] and result.get('error_kind') in RETRYABLE_KINDS:
+                print(f"  ⚠️  Refresh failed ({result['error_kind']}), keeping the stored scrape")
+                continue
+            if result.get('content_hash') != (old.get('content_hash') or content_hash(old)):
+                changed_urls.append(result['url'])
+                if result['success']:
+                    print(f"  ↻ Text changed since last scrape, re-marked for Stage 3/4")
+                else:
+                    print(f"  ↻ No longer scrapeable as before, re-marked for Stage 3/4")
 
         # No AI extraction needed - Phase 3 will handle that
-        scraped_data.append(result)
-
-        # Save progress to BOTH CSV and JSON after each company
-        scraper._save_progress_csv(scraped_data, csv_progress_file)
-
-        # Also save JSON incrementally so content isn't lost if killed
-        json_progress_file = '../outputs/stage_2.json'
-        with open(json_progress_file, 'w', encoding='utf-8') as f:
-            json.dump(scraped_data, f, indent=2, ensure_ascii=False)
+        # Append one line to the JSONL store and one row to the progress CSV
+        store.append(result)
+        scraper._append_progress_csv(result, csv_progress_file)
+        if blobs and ENABLE_BLOB_STORE:
+            blobs.save_stats()
+
+        retry_queue.record(result['url'], result['success'], result.get('error_kind'))
+        retry_queue.save()
+        scraper.site_merges.save()
+        if result.get('site_tag'):
+            site_tags[result['site_tag']] += 1
+        elif result.get('merged_into'):
+            merged_this_run += 1
+        elif result.get('error_kind'):
+            error_kinds[result['error_kind']] += 1
+        template_tokens_saved += result.get('template_stats', {}).get('tokens_saved', 0)
+        dedup_totals.update(result.get('dedup_stats', {}))
+        subpages_fetched += sum(1 for entry in result.get('fetch_plan', [])
+                                if entry.get('fetched') and 'home' not in entry['roles'] and entry['roles'] != ['news'])
+        timing = result.get('timing', {})
+        if timing:
+            company_seconds.append(timing['elapsed_s'])
+            if timing['deadline_hit']:
+                budget_hits += 1
+                print(f"  ⏱️  {timing['budget_s']:g}s company budget spent, partial results kept")
 
         print(f"  💾 Progress saved ({i}/{len(new_candidates)} new companies)")
 
-        time.sleep(2)  # Rate limiting
-
-    # Save final results
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(scraped_data, f, indent=2, ensure_ascii=False)
+    store.close()
+    if scraper.discovery:
+        scraper.discovery.save(force=True)
+    scraper.parse_pool.shutdown()
+    if scraper.pdf_extractor:
+        scraper.pdf_extractor.shutdown()
+    if scraper.timing_log:
+        scraper.timing_log.close()
+    if scraper.dns_cache:
+        scraper.dns_cache.shutdown()
+
+    if export_json:
+        print(f"\nExporting {LEGACY_STAGE_2_JSON}...")
+        store.export_json(LEGACY_STAGE_2_JSON)
 
     print(f"\n✓ Scraping complete!")
-    print(f"✓ Total scraped: {len(scraped_data)} websites ({len(scraped_data) - len(new_candidates)} existing + {len(new_candidates)} new)")
-    print(f"✓ Results saved to {output_file}")
+    print(f"✓ Total scraped: {len(store)} websites ({len(new_candidates) - retrying - refreshing} new this run)")
+    print(f"✓ Results saved to {STAGE_2_JSONL}")
     print(f"✓ Progress CSV saved to {csv_progress_file}")
 
-    # Summary stats
-    successful = sum(1 for d in scraped_data if d['success'])
-    with_investors = sum(1 for d in scraped_data if d['investor_pages'])
-    with_pdfs = sum(1 for d in scraped_data if d['pdfs'])
+    # Summary stats (from the index, without loading page content)
+    entries = store.index.values()
+    successful = sum(1 for e in entries if e['success'])
+    with_investors = sum(1 for e in entries if e['investor_pages'])
+    with_pdfs = sum(1 for e in entries if e['pdfs'])
 
     print(f"\n  - Successful scrapes: {successful}")
     print(f"  - Sites with investor pages: {with_investors}")
     print(f"  - Sites with PDFs: {with_pdfs}")
-
-    return scraped_data
+    cache_stats = scraper.url_cache.stats()
+    print(f"  - Shared pages (press, off-site investor pages): {cache_stats['hits']}/{cache_stats['lookups']} "
+          f"from the URL cache ({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['entries']} cached)")
+
+    print(f"  - Subpages fetched: {subpages_fetched} ({subpages_fetched / len(new_candidates):.1f} per company"
+          f"{', ranked by link scorer' if scraper.link_scorer else ''})")
+    if dedup_totals['pages_dropped']:
+        print(f"  - Near-duplicate pages dropped: {dedup_totals['pages_dropped']} "
+              f"({dedup_totals['chars_dropped']:,} chars, {dedup_totals['shell_pages']} homepage shells)")
+    if template_tokens_saved:
+        print(f"  - Site template lines removed: ~{template_tokens_saved:,} tokens saved")
+
+    if company_seconds:
+        company_seconds.sort()
+        print(f"  - Time per company: median {company_seconds[len(company_seconds) // 2]:.1f}s, "
+              f"max {company_seconds[-1]:.1f}s, {budget_hits} stopped by the company budget")
+    if site_tags:
+        print(f"  - Tagged sites (no rendering, subpages or Stage 3/4 calls): "
+              + ', '.join(f"{TAG_LABELS[tag]} {count}" for tag, count in site_tags.most_common()))
+    if merged_this_run:
+        print(f"  - Companies sharing another company's site: {merged_this_run} "
+              f"(merges in {SITE_MERGES_FILE}, applied by deduplicate.py)")
+    if error_kinds:
+        print(f"  - Failures this run: " + ', '.join(f"{kind} {count}" for kind, count in error_kinds.most_common()))
+    open_domains = scraper.breaker.open_domains()
+    if open_domains:
+        print(f"  - Domains cut off by circuit breaker: {len(open_domains)}")
+    if len(retry_queue):
+        print(f"  - Queued for retry next run: {len(retry_queue)} companies ({RETRY_QUEUE_FILE})")
+
+    if refresh:
+        print(f"\n  Refresh: {refreshing} stale companies, {refresh_unchanged} unchanged "
+              f"({scraper.pages_not_modified} pages not modified, {scraper.pages_unchanged_by_lastmod} of them "
+              f"by sitemap lastmod without a request), {len(changed_urls)} with changed text")
+        for path, count in invalidate_downstream(changed_urls).items():
+            if count:
+                print(f"  - Removed {count} changed companies from {path} (run Stage 3/4 to reprocess)")
+
+    parse_stats = scraper.parse_pool.stats()
+    print(f"  - Pages parsed: {parse_stats['pages']} ({parse_stats['megabytes']:.1f} MB, "
+          f"{parse_stats['pages_per_second_per_core']:.1f} pages/s per core on {parse_stats['workers']} workers)")
+    if scraper.dns_cache:
+        dns_stats = scraper.dns_cache.stats()
+        print(f"  - DNS: {dns_stats['lookups']} lookups, {dns_stats['hit_rate']:.0%} from cache or prefetch "
+              f"({dns_stats['prefetched']} prefetched), {dns_stats['dead_hosts']} non-existent domains "
+              f"({dns_stats['negative_hits']} requests failed without a lookup)")
+    if scraper.timing_log and scraper.timing_log.records:
+        print(f"  - Request timings logged: {scraper.timing_log.records} ({TIMING_LOG_FILE}, "
+              f"see python stage_2.py --report)")
+
+    if scraper.pdf_extractor and scraper.pdf_extractor.documents:
+        pdf_stats = scraper.pdf_extractor.stats()
+        print(f"  - PDFs extracted: {pdf_stats['documents'] - pdf_stats['failed']}/{pdf_stats['documents']} "
+              f"({pdf_stats['pages']} pages, {pdf_stats['pages_per_second_per_core']:.1f} pages/s per core "
+              f"on {pdf_stats['workers']} workers)")
+
+    if blobs:
+        stats = blobs.stats()
+        blobs.close()
+    if blobs and ENABLE_BLOB_STORE:
+        print(f"\n  Blob store: {stats['unique_blobs']} unique bodies for {stats['references']} references "
+              f"(dedup ratio {stats['dedup_ratio']:.2f}x)")
+        print(f"  - Text: {stats['logical_bytes'] / 1e6:.1f} MB raw, {stats['unique_bytes'] / 1e6:.1f} MB unique, "
+              f"{stats['disk_bytes'] / 1e6:.1f} MB on disk ({stats['savings']:.0%} saved)")
+
+    return store
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Stage 2: Website Scraper & Content Collection")
+    parser.add_argument('--export-json', action='store_true',
+                        help='Also write the results as one stage_2.json array (legacy format)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Revalidate companies scraped more than --refresh-ttl-days ago (conditional GETs) '
+                             'and re-mark those whose text changed for Stage 3/4')
+    parser.add_argument('--refresh-ttl-days', type=float, default=REFRESH_TTL_DAYS,
+                        help=f'Age after which a scrape is revalidated (default {REFRESH_TTL_DAYS})')
+    parser.add_argument('--report', action='store_true',
+                        help=f'Print phase percentiles and the slowest hosts from {TIMING_LOG_FILE} instead of scraping')
+    args = parser.parse_args()
+    if args.report:
+        print_timing_report(TIMING_LOG_FILE)
+    else:
+        main(export_json=args.export_json, refresh=args.refresh, refresh_ttl_days=args.refresh_ttl_days)
@@ -0,0 +1,230 @@
+"""
+Stage 2 Store: append-only JSONL storage for scrape results
+Each company costs one appended line plus one index line, instead of rewriting stage_2.json
+"""
+import os
+import json
+from typing import Dict, Iterator, Optional
+
+from blob_store import BlobStore, externalize, internalize, BLOB_PACK_FILE
+
+STAGE_2_JSONL = '../outputs/stage_2.jsonl'
+LEGACY_STAGE_2_JSON = '../outputs/stage_2.json'
+
+
+class Stage2Store:
+    """
+    Append-only record file (one JSON object per line) with a byte-offset index.
+
+    The index file holds one small line per record: url, offset, length and the
+    counters the run summary needs, so opening the store never loads page bodies.
+    A URL that is appended again (retry/refresh) points at its newest record.
+
+    With a BlobStore attached, page text is written to the blob store and the
+    JSONL line only carries blob IDs; reads resolve them transparently.
+    write_blobs=False keeps new text inline but still resolves records written with blobs.
+
+    read_only=True is for readers running next to a writer (Stage 3, dedup, the progress
+    monitor): neither file is ever modified, and a last line still being written is ignored.
+    """
+
+    def __init__(self, path: str = STAGE_2_JSONL, blobs: Optional[BlobStore] = None, write_blobs: bool = True,
+                 read_only: bool = False):
+        self.path = path
+        self.blobs = blobs
+        self.write_blobs = write_blobs
+        self.read_only = read_only
+        self.index_path = path + '.index'
+        self.index = {}
+        self._data_file = None
+        self._index_file = None
+        self._load_index()
+
+    def _load_index(self):
+        """
+        Load the offset index. A writer rebuilds it from the record file if it is missing or stale;
+        a read-only store indexes records past the end of the index file in memory instead.
+        """
+        data_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            # A writer may be halfway through its last index line
+                            if self.read_only:
+                                break
+                            raise
+                        self.index[entry['url']] = entry
+                indexed_end = max((e['offset'] + e['length'] for e in self.index.values()), default=0)
+                if indexed_end == data_size:
+                    return
+                if self.read_only and indexed_end < data_size:
+                    self._scan(indexed_end)
+                    return
+            except (json.JSONDecodeError, KeyError):
+                pass
+
+        self.index = {}
+        if self.read_only:
+            self._scan(0)
+            return
+        if data_size:
+            print(f"  Rebuilding Stage 2 index from {self.path}")
+        self._rebuild_index()
+
+    def _scan(self, offset: int) -> int:
+        """Index the complete records from offset on; returns where they end (a torn last line is not included)"""
+        if not os.path.exists(self.path):
+            return offset
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(raw)
+                except json.JSONDecodeError:
+                    break
+                self.index[record.get('url', '')] = self._index_entry(record, offset, len(raw))
+                offset += len(raw)
+        return offset
+
+    def _rebuild_index(self):
+        """Scan the record file, drop a torn trailing line and rewrite the index (writers only)"""
+        self.index = {}
+        valid_end = self._scan(0)
+
+        if os.path.exists(self.path) and valid_end < os.path.getsize(self.path):
+            print(f"  Dropping incomplete last record in {self.path}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_end)
+
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            for entry in sorted(self.index.values(), key=lambda e: e['offset']):
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    @staticmethod
+    def _index_entry(record: Dict, offset: int, length: int) -> Dict:
+        return {
+            'url': record.get('url', ''),
+            'offset': offset,
+            'length': length,
+            'success': bool(record.get('success')),
+            'investor_pages': len(record.get('investor_pages') or []),
+            'pdfs': len(record.get('pdfs') or []),
+            'scraped_at': record.get('scraped_at', ''),
+        }
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def urls(self) -> set:
+        return set(self.index)
+
+    def append(self, record: Dict, new_references: bool = True):
+        """
+        Append one record and its index line, flushed so a killed run loses at most the current company.
+        Blob references are counted for a new record only, not one stored again unchanged (refresh, dedup);
+        pass new_references=False for those.
+        """
+        if self.read_only:
+            raise ValueError(f"{self.path} was opened read-only")
+        if self._data_file is None:
+            self._data_file = open(self.path, 'ab')
+            self._index_file = open(self.index_path, 'a', encoding='utf-8')
+
+        stored = externalize(record, self.blobs, new_references) if self.blobs and self.write_blobs else record
+        line = (json.dumps(stored, ensure_ascii=False) + '\n').encode('utf-8')
+        self._data_file.seek(0, os.SEEK_END)
+        offset = self._data_file.tell()
+        self._data_file.write(line)
+        self._data_file.flush()
+
+        entry = self._index_entry(record, offset, len(line))
+        self._index_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._index_file.flush()
+        self.index[entry['url']] = entry
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Read a single record by URL"""
+        entry = self.index.get(url)
+        if not entry:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(entry['offset'])
+            return internalize(json.loads(f.read(entry['length'])), self.blobs)
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Stream the latest record for every URL, in the order they were written"""
+        if not self.index:
+            return
+        with open(self.path, 'rb') as f:
+            for entry in sorted(self.index.values(), key=lambda e: e['offset']):
+                f.seek(entry['offset'])
+                yield internalize(json.loads(f.read(entry['length'])), self.blobs)
+
+    def export_json(self, output_file: str):
+        """Write all records as one JSON array (the legacy stage_2.json layout), streaming"""
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write('[\n')
+            for i, record in enumerate(self.iter_records()):
+                if i:
+                    f.write(',\n')
+                f.write(json.dumps(record, indent=2, ensure_ascii=False))
+            f.write('\n]\n')
+
+    def close(self):
+        if self._data_file is not None:
+            self._data_file.close()
+            self._index_file.close()
+            self._data_file = None
+            self._index_file = None
+
+
+def migrate_legacy_json(store: Stage2Store, legacy_file: str = LEGACY_STAGE_2_JSON) -> int:
+    """Copy records from a legacy stage_2.json into an empty store, once"""
+    if len(store) or not os.path.exists(legacy_file):
+        return 0
+
+    with open(legacy_file, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+
+    for record in records:
+        store.append(record)
+    return len(records)
+
+
+def count_stage_2_records(path: str = STAGE_2_JSONL) -> int:
+    """Companies in the store, from its index file alone (cheap enough for a progress monitor)"""
+    urls = set()
+    try:
+        with open(path + '.index', 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    urls.add(json.loads(line)['url'])
+                except (json.JSONDecodeError, KeyError):
+                    continue
+    except FileNotFoundError:
+        return 0
+    return len(urls)
+
+
+def load_stage_2_records(path: str = STAGE_2_JSONL, legacy_file: str = LEGACY_STAGE_2_JSON) -> Iterator[Dict]:
+    """Iterate Stage 2 results from the JSONL store, falling back to a legacy stage_2.json"""
+    if os.path.exists(path):
+        blobs = BlobStore(BLOB_PACK_FILE) if os.path.exists(BLOB_PACK_FILE) else None
+        yield from Stage2Store(path, blobs, read_only=True).iter_records()
+    elif os.path.exists(legacy_file):
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+    else:
+        raise FileNotFoundError(path)
@@ -5,59 +5,125 @@ Uses Perplexity and external sources to fill missing information
 import os
 import json
 import csv
-import time
-from typing import Dict, List
-from openai import OpenAI
+import asyncio
+from typing import Dict, List, Optional
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
+from stage_2_store import load_stage_2_records, STAGE_2_JSONL
+from link_scorer import attribute_pages, append_yield_log, LINK_YIELD_FILE
+from site_classifier import TAG_LABELS
+from rate_limiter import AsyncRateLimiter
+from local_extractor import extract_local, in_holdout, agrees
+
 load_dotenv('../.env')
 
+# Config Settings
+try:
+    from config import (STAGE_3_CONCURRENCY, PERPLEXITY_RPM, PERPLEXITY_MAX_CONCURRENT,
+                        OPENAI_RPM, OPENAI_MAX_CONCURRENT, PERPLEXITY_CONSOLIDATED, CONSOLIDATED_MAX_TOKENS,
+                        ENABLE_LOCAL_EXTRACTION, LOCAL_MIN_CONFIDENCE, LOCAL_HOLDOUT_RATE)
+except ImportError:
+    STAGE_3_CONCURRENCY = 8
+    PERPLEXITY_RPM = 50
+    PERPLEXITY_MAX_CONCURRENT = 5
+    OPENAI_RPM = 500
+    OPENAI_MAX_CONCURRENT = 10
+    PERPLEXITY_CONSOLIDATED = True
+    CONSOLIDATED_MAX_TOKENS = 1200
+    ENABLE_LOCAL_EXTRACTION = True
+    LOCAL_MIN_CONFIDENCE = 0.8
+    LOCAL_HOLDOUT_RATE = 0.1
+
 PERPLEXITY_API_KEY = os.getenv('PERPLEXITY_API_KEY')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
-perplexity_client = OpenAI(
+perplexity_client = AsyncOpenAI(
     api_key=PERPLEXITY_API_KEY,
     base_url="https://api.perplexity.ai"
 ) if PERPLEXITY_API_KEY else None
 
-openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
 
+# Free-text Perplexity query per missing field (per-field mode, and consolidated-mode follow-ups)
+FIELD_QUERIES = {
+    'funding': '"{name}" funding investors series A B C venture capital',
+    'location': '"{name}" headquarters location address city',
+    'founders': '"{name}" founders CEO co-founders team',
+    'social': '"{name}" LinkedIn Crunchbase Twitter',
+}
 
-class DataEnricher:
-    def __init__(self):
-        self.perplexity = perplexity_client
-        self.openai = openai_client
+# What the consolidated query asks for under each JSON key
+FIELD_QUESTIONS = {
+    'funding': 'funding rounds (round type, amount, date, lead investors), total funding and key investors',
+    'location': 'headquarters city and state/country, and the full address if published',
+    'founders': 'full names of the founders/co-founders and the current CEO',
+    'social': 'LinkedIn company page, Crunchbase profile and Twitter/X URLs',
+}
 
-    def search_for_missing_data(self, company_name: str, url: str, missing_fields: List[str]) -> Dict:
-        """Use Perplexity to search for missing company information"""
-        if not self.perplexity:
-            return {}
+SEARCH_SYSTEM_PROMPT = ("You are a research assistant finding factual information about companies. "
+                        "Provide specific, factual details with sources.")
+
+# Nominal API calls enrich_company makes for a company with no scraped investor info (one
+# consolidated query or one search per field, then one extraction; follow-ups not counted).
+# Only used for the tagged-site estimate when a run has no measured api_usage to average
+PERPLEXITY_CALLS_PER_COMPANY = 1 if PERPLEXITY_CONSOLIDATED else len(FIELD_QUERIES)
+OPENAI_CALLS_PER_COMPANY = 1
 
-        queries = []
 
-        if 'funding' in missing_fields:
-            queries.append(f'"{company_name}" funding investors series A B C venture capital')
+def new_usage() -> Dict:
+    """Per-company API call and token counters"""
+    return {'perplexity_calls': 0, 'perplexity_tokens': 0, 'openai_calls': 0, 'openai_tokens': 0}
 
-        if 'location' in missing_fields:
-            queries.append(f'"{company_name}" headquarters location address city')
 
-        if 'founders' in missing_fields:
-            queries.append(f'"{company_name}" founders CEO co-founders team')
+def _count_usage(usage: Optional[Dict], provider: str, response):
+    if usage is None:
+        return
+    usage[f'{provider}_calls'] += 1
+    if getattr(response, 'usage', None):
+        usage[f'{provider}_tokens'] += response.usage.total_tokens or 0
 
-        if 'social' in missing_fields:
-            queries.append(f'"{company_name}" LinkedIn Crunchbase Twitter')
 
-        all_findings = []
+def _parse_json_answer(text: str) -> Dict:
+    """The JSON object in a model answer (tolerates code fences and prose around it), or {}"""
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
 
-        for query in queries:
-            try:
-                print(f"    Searching: {query[:60]}...")
-                response = self.perplexity.chat.completions.create(
+
+def _is_found(value) -> bool:
+    if isinstance(value, (list, dict)):
+        return any(_is_found(v) for v in (value.values() if isinstance(value, dict) else value))
+    text = str(value or '').strip().lower()
+    return bool(text) and text not in ('null', 'none', 'not found', 'unknown', 'n/a')
+
+
+class DataEnricher:
+    """Enriches companies concurrently; create it inside the running event loop"""
+
+    def __init__(self):
+        self.perplexity = perplexity_client
+        self.openai = openai_client
+        self.perplexity_limiter = AsyncRateLimiter(PERPLEXITY_RPM, PERPLEXITY_MAX_CONCURRENT)
+        self.openai_limiter = AsyncRateLimiter(OPENAI_RPM, OPENAI_MAX_CONCURRENT)
+
+    async def _search(self, company_name: str, query: str, usage: Optional[Dict] = None,
+                      max_tokens: int = 1500) -> str:
+        """One Perplexity query ('' on error)"""
+        try:
+            async with self.perplexity_limiter:
+                print(f"    [{company_name}] Searching: {query[:60]}...")
+                response = await self.perplexity.chat.completions.create(
                     model="sonar-pro",
                     messages=[
                         {
                             "role": "system",
-                            "content": "You are a research assistant finding factual information about companies. Provide specific, factual details with sources."
+                            "content": SEARCH_SYSTEM_PROMPT
                         },
                         {
                             "role": "user",
@@ -65,24 +131,72 @@ class DataEnricher:
                         }
                     ],
                     temperature=0.2,
-                    max_tokens=1500
+                    max_tokens=max_tokens
                 )
+            _count_usage(usage, 'perplexity', response)
+            return response.choices[0].message.content or ''
 
-                findings = response.choices[0].message.content
-                all_findings.append(findings)
-
-                time.sleep(1)  # Rate limiting
+        except Exception as e:
+            print(f"    [{company_name}] Search error: {e}")
+            return ''
+
+    async def _search_fields(self, company_name: str, fields: List[str], usage: Optional[Dict]) -> List[str]:
+        """One free-text search per field, run concurrently; findings keep field order"""
+        queries = [FIELD_QUERIES[field].format(name=company_name) for field in fields]
+        findings = await asyncio.gather(*(self._search(company_name, query, usage) for query in queries))
+        return [finding for finding in findings if finding]
+
+    async def _consolidated_search(self, company_name: str, url: str, missing_fields: List[str],
+                                   usage: Optional[Dict]) -> List[str]:
+        """
+        One structured query for all missing fields, answered as JSON keyed by field;
+        fields the answer leaves empty get a per-field follow-up search.
+        An answer that is not valid JSON (e.g. cut off at max_tokens) is passed on as-is,
+        and only the fields it never got to are searched again.
+        """
+        wanted = '\n'.join(f'- "{field}": {FIELD_QUESTIONS[field]}' for field in missing_fields)
+        query = (f'Research the company "{company_name}" (website: {url}).\n'
+                 f'Answer with ONLY a JSON object with these keys:\n{wanted}\n'
+                 f'Each value is a short factual string; use null when you cannot find it.')
+        raw = await self._search(company_name, query, usage, CONSOLIDATED_MAX_TOKENS)
+        answer = _parse_json_answer(raw)
+
+        findings = []
+        if raw and not answer:
+            print(f"    [{company_name}] Consolidated answer is not valid JSON, passing it on as text")
+            findings.append(raw)
+            still_missing = [field for field in missing_fields if f'"{field}"' not in raw]
+        else:
+            found = {field: answer[field] for field in missing_fields if _is_found(answer.get(field))}
+            if found:
+                lines = [f"{field.title()}: {value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)}"
+                         for field, value in found.items()]
+                findings.append('\n'.join(lines))
+            still_missing = [field for field in missing_fields if field not in found]
+
+        if still_missing:
+            print(f"    [{company_name}] Follow-up searches for: {', '.join(still_missing)}")
+            findings.extend(await self._search_fields(company_name, still_missing, usage))
+        return findings
+
+    async def search_for_missing_data(self, company_name: str, url: str, missing_fields: List[str],
+                                      usage: Optional[Dict] = None) -> Dict:
+        """Use Perplexity to search for missing company information"""
+        if not self.perplexity:
+            return {}
 
-            except Exception as e:
-                print(f"    Search error: {e}")
-                continue
+        if PERPLEXITY_CONSOLIDATED:
+            all_findings = await self._consolidated_search(company_name, url, missing_fields, usage)
+        else:
+            all_findings = await self._search_fields(company_name, missing_fields, usage)
 
         return {
             'search_results': '\n\n'.join(all_findings),
             'company_name': company_name
         }
 
-    def extract_structured_data(self, company_data: Dict, search_results: str) -> Dict:
+    async def extract_structured_data(self, company_data: Dict, search_results: str,
+                                      usage: Optional[Dict] = None) -> Dict:
         """Use AI to extract structured information from search results AND scraped content"""
         if not self.openai:
             return {}
@@ -114,6 +228,15 @@ class DataEnricher:
                     if article_content:
                         website_content += f"\n{article_content}"
 
+            # Include text from pitch decks / investor PDFs linked on the site
+            pdf_content = scraped.get('pdf_content', [])
+            if pdf_content:
+                website_content += "\n\nInvestor PDFs & Pitch Decks:"
+                for pdf in pdf_content[:2]:  # Top 2 PDFs
+                    pdf_text = pdf.get('text', '')[:2000]  # First 2000 chars per PDF
+                    if pdf_text:
+                        website_content += f"\n{pdf_text}"
+
         prompt = f"""Extract structured information about this company from ALL sources below.
 
 Company Name: {company_data.get('company_name')}
@@ -126,7 +249,7 @@ Existing Information from Phase 1 & 2:
 External Search Results:
 {search_results}
 
-Scraped Content (website, investor pages, news articles):
+Scraped Content (website, investor pages, news articles, PDFs):
 {website_content}
 
 IMPORTANT: Prioritize information from scraped content over search results when available.
@@ -149,43 +272,64 @@ Be specific with funding details - include round type, amount, and investors.
 """
 
         try:
-            response = self.openai.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a data extraction expert. Extract factual information and return valid JSON only."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                response_format={"type": "json_object"}
-            )
+            async with self.openai_limiter:
+                response = await self.openai.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": "You are a data extraction expert. Extract factual information and return valid JSON only."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.1,
+                    response_format={"type": "json_object"}
+                )
+            _count_usage(usage, 'openai', response)
 
             extracted = json.loads(response.choices[0].message.content)
             return extracted
 
         except Exception as e:
-            print(f"    Extraction error: {e}")
+            print(f"    [{company_data.get('company_name')}] Extraction error: {e}")
             return {}
 
-    def enrich_company(self, company_data: Dict) -> Dict:
+    async def enrich_company(self, company_data: Dict) -> Dict:
         """Enrich a single company's data"""
-        print(f"\n  Analyzing: {company_data.get('company_name')}")
+        name = company_data.get('company_name')
+        usage = new_usage()
 
         # Check if we already have rich investor info from scraped news articles
         scraped = company_data.get('scraped_content', {})
         investor_info_content = scraped.get('investor_info_content', [])
         has_rich_investor_info = len(investor_info_content) > 0
 
+        # Rule-based pass over the scraped main/about text; confident values replace searches,
+        # except on the held-out sample, where they are only compared with the LLM's answer
+        local = extract_local(scraped, name or '') if ENABLE_LOCAL_EXTRACTION else {}
+        holdout = bool(local) and in_holdout(company_data.get('url', ''), LOCAL_HOLDOUT_RATE)
+        trusted = set() if holdout else {field for field, found in local.items()
+                                         if found['confidence'] >= LOCAL_MIN_CONFIDENCE}
+
         # Determine what fields need external searches
         missing_fields = []
+        searches_avoided = 0
 
         # Only search for funding if we don't have investor info content
-        if not has_rich_investor_info:
-            missing_fields.append('funding')
+        if has_rich_investor_info:
+            print(f"    [{name}] ✓ Using scraped investor info content (skipping funding search)")
+        elif 'funding' in trusted:
+            searches_avoided += 1
         else:
-            print(f"    ✓ Using scraped investor info content (skipping funding search)")
+            missing_fields.append('funding')
+
+        # Location and founders might not be in investor articles
+        for field in ('location', 'founders'):
+            if field in trusted:
+                searches_avoided += 1
+            else:
+                missing_fields.append(field)
 
-        # Always check for location and founders (might not be in investor articles)
-        missing_fields.extend(['location', 'founders'])
+        for field in sorted(trusted):
+            print(f"    [{name}] ✓ {field.title()} found on site: {local[field]['value'][:60]} "
+                  f"(confidence {local[field]['confidence']:.2f})")
 
         # Check if social links need enhancement
         social_links = company_data.get('social_links', '')
@@ -195,18 +339,31 @@ Be specific with funding details - include round type, amount, and investors.
         # Search for missing data (only if we have fields that need searching)
         search_results = {'search_results': ''}
         if missing_fields:
-            print(f"    Searching for: {', '.join(missing_fields)}")
-            search_results = self.search_for_missing_data(
-                company_data.get('company_name'),
+            print(f"    [{name}] Searching for: {', '.join(missing_fields)}")
+            search_results = await self.search_for_missing_data(
+                name,
                 company_data.get('url'),
-                missing_fields
+                missing_fields,
+                usage
             )
         else:
-            print(f"    ✓ All data available from scraped content, skipping searches")
+            print(f"    [{name}] ✓ All data available from scraped content, skipping searches")
 
         # Extract structured data from search results
-        print(f"    🤖 Extracting structured data...")
-        enriched_data = self.extract_structured_data(company_data, search_results['search_results'])
+        print(f"    [{name}] 🤖 Extracting structured data...")
+        enriched_data = await self.extract_structured_data(company_data, search_results.get('search_results', ''), usage)
+
+        # Trusted local values stand in for whatever the extraction could not find
+        for field in trusted:
+            found = local[field]
+            if field == 'funding':
+                for key, value in (('funding_info', found['value']), ('total_funding', found['total_funding']),
+                                   ('latest_funding_date', found['latest_funding_date']),
+                                   ('key_investors', found['key_investors'])):
+                    if value and not _is_found(enriched_data.get(key)):
+                        enriched_data[key] = value
+            elif not _is_found(enriched_data.get(field)):
+                enriched_data[field] = found['value']
 
         # Build enriched company data
         enriched_company = company_data.copy()
@@ -233,8 +390,23 @@ Be specific with funding details - include round type, amount, and investors.
                 social_parts.append(f"crunchbase: {enriched_data['crunchbase']}")
 
         enriched_company['social_links'] = ', '.join(social_parts)
-
-        print(f"    ✓ Enriched successfully")
+        enriched_company['api_usage'] = usage
+        if local:
+            enriched_company['local_extraction'] = {field: {'value': found['value'], 'confidence': found['confidence']}
+                                                    for field, found in local.items()}
+            enriched_company['local_searches_avoided'] = searches_avoided
+        if holdout:
+            # Only values confident enough to have replaced a search are scored
+            llm_values = {'location': enriched_data.get('location'), 'founders': enriched_data.get('founders'),
+                          'funding': f"{enriched_data.get('funding_info', '')} {enriched_data.get('total_funding', '')}"}
+            enriched_company['local_agreement'] = {
+                field: agrees(field, found['value'], llm_values[field])
+                for field, found in local.items() if found['confidence'] >= LOCAL_MIN_CONFIDENCE
+            }
+
+        print(f"    [{name}] ✓ Enriched successfully ({usage['perplexity_calls']} Perplexity calls, "
+              f"{usage['perplexity_tokens']:,} tokens; {usage['openai_calls']} OpenAI calls, "
+              f"{usage['openai_tokens']:,} tokens)")
 
         return enriched_company
 
@@ -274,6 +446,23 @@ def filter_colorado_companies(companies: List[Dict]) -> List[Dict]:
     return colorado_companies
 
 
+def save_results(companies: List[Dict], output_json: str):
+    """Write stage_3.json and stage_3_progress.csv"""
+    with open(output_json, 'w', encoding='utf-8') as f:
+        json.dump(companies, f, indent=2, ensure_ascii=False)
+
+    csv_file = '../outputs/stage_3_progress.csv'
+    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        fieldnames = [
+            'company_name', 'url', 'description', 'founders',
+            'funding_info', 'latest_funding_date', 'total_funding', 'key_investors',
+            'location', 'headquarters', 'social_links', 'success'
+        ]
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(companies)
+
+
 def main():
     """Run data enrichment on Stage 2 results"""
     print("=" * 60)
@@ -297,29 +486,32 @@ def main():
     try:
         with open(csv_file, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
-            companies_csv = list(reader)
+            # Retried/refreshed companies have several rows; the last one is current
+            companies_csv = list({row.get('url', ''): row for row in reader}.values())
     except FileNotFoundError:
         print(f"Error: {csv_file} not found. Run stage_2.py first.")
         return
 
-    # Load Stage 2 JSON for full scraped content
-    json_file = '../outputs/stage_2.json'
+    # Load Stage 2 results (JSONL store, or a legacy stage_2.json) for full scraped content
     scraped_content = {}
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            scraped_data = json.load(f)
-            # Index by URL for easy lookup
-            for item in scraped_data:
-                url = item.get('url', '')
-                scraped_content[url] = {
-                    'main_content': item.get('main_content', ''),
-                    'about_content': item.get('about_content', ''),
-                    'investor_page_content': item.get('investor_page_content', []),
-                    'investor_info_content': item.get('investor_info_content', [])
-                }
-        print(f"✓ Loaded full content from {json_file}")
+        # Index by URL for easy lookup
+        for item in load_stage_2_records():
+            url = item.get('url', '')
+            scraped_content[url] = {
+                'main_content': item.get('main_content', ''),
+                'about_content': item.get('about_content', ''),
+                'investor_page_content': item.get('investor_page_content', []),
+                'investor_info_content': item.get('investor_info_content', []),
+                'pdf_content': item.get('pdf_content', []),
+                'about_page_url': item.get('about_page_url', ''),
+                'fetch_plan': item.get('fetch_plan', []),
+                'site_tag': item.get('site_tag'),
+                'merged_into': item.get('merged_into')
+            }
+        print(f"✓ Loaded full content from {STAGE_2_JSONL}")
     except FileNotFoundError:
-        print(f"⚠️  Warning: {json_file} not found. Will work with limited data.")
+        print(f"⚠️  Warning: Stage 2 results not found. Will work with limited data.")
 
     # Merge CSV data with scraped content and filter out already enriched
     companies = []
@@ -339,43 +531,81 @@ def main():
         print("⚠️  No new companies to enrich! All have already been processed.")
         return enriched_companies
 
-    enricher = DataEnricher()
-    new_enriched = []
+    # One slot per company, filled in input order so saved files keep the Stage 2 order
+    results = [None] * len(companies)
+    to_enrich = []
+    tagged_skipped = 0
 
     for i, company in enumerate(companies, 1):
+        site_tag = company.get('scraped_content', {}).get('site_tag')
+        if site_tag:
+            # Parked/challenge/cookie-wall/dead sites: nothing worth searching for
+            print(f"\n[{i}/{len(companies)}] Skipping {company.get('company_name')} ({TAG_LABELS[site_tag]})")
+            company['site_tag'] = site_tag
+            results[i - 1] = company
+            tagged_skipped += 1
+            continue
+
+        merged_into = company.get('scraped_content', {}).get('merged_into')
+        if merged_into:
+            print(f"\n[{i}/{len(companies)}] Skipping {company.get('company_name')} (same site as {merged_into})")
+            company['merged_into'] = merged_into
+            results[i - 1] = company
+            continue
+
         if company.get('success') != 'Yes':
             print(f"\n[{i}/{len(companies)}] Skipping {company.get('company_name')} (scraping failed)")
-            new_enriched.append(company)
+            results[i - 1] = company
             continue
 
-        print(f"\n[{i}/{len(companies)}] Enriching: {company.get('company_name')}")
+        to_enrich.append(i - 1)
+
+    yield_pages = 0
+    yield_hits = 0
+    failed = 0
+
+    async def enrich_all():
+        nonlocal yield_pages, yield_hits, failed
+        enricher = DataEnricher()
+        slots = asyncio.Semaphore(STAGE_3_CONCURRENCY)
 
-        enriched = enricher.enrich_company(company)
-        new_enriched.append(enriched)
+        async def enrich_one(company: Dict) -> Dict:
+            async with slots:
+                return await enricher.enrich_company(company)
 
-        # Merge with existing enriched data
-        all_enriched = enriched_companies + new_enriched
+        print(f"\n🤖 Enriching {len(to_enrich)} companies, up to {STAGE_3_CONCURRENCY} at a time "
+              f"(Perplexity {PERPLEXITY_RPM}/min, OpenAI {OPENAI_RPM}/min)")
+        tasks = [asyncio.create_task(enrich_one(companies[index])) for index in to_enrich]
+
+        # Collect in input order: later companies keep running while an earlier one finishes
+        for done, (index, task) in enumerate(zip(to_enrich, tasks), 1):
+            company = companies[index]
+            try:
+                enriched = await task
+            except Exception as e:
+                # Left out of stage_3.json so the next run retries it
+                print(f"  ⚠️  {company.get('company_name')}: enrichment failed ({e})")
+                failed += 1
+                continue
+            results[index] = enriched
 
-        # Save progress to BOTH CSV and JSON after each company
-        csv_file = '../outputs/stage_3_progress.csv'
-        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-            fieldnames = [
-                'company_name', 'url', 'description', 'founders',
-                'funding_info', 'latest_funding_date', 'total_funding', 'key_investors',
-                'location', 'headquarters', 'social_links', 'success'
-            ]
-            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-            writer.writeheader()
-            writer.writerows(all_enriched)
+            # Record which fetched subpages held the extracted fields (trains Stage 2's link scorer)
+            if company.get('scraped_content'):
+                pages = attribute_pages(enriched, company['scraped_content'])
+                if pages:
+                    append_yield_log(pages, company.get('url', ''))
+                    yield_pages += len(pages)
+                    yield_hits += sum(1 for page in pages if page['fields'])
 
-        # Also save JSON for backup/Phase 4
-        json_file = '../outputs/stage_3.json'
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(all_enriched, f, indent=2, ensure_ascii=False)
+            # Save progress to BOTH CSV and JSON after each company
+            save_results(enriched_companies + [r for r in results if r is not None], output_json)
+            print(f"  💾 Progress saved ({done}/{len(to_enrich)} companies enriched: {company.get('company_name')})")
 
-        print(f"  💾 Progress saved ({i}/{len(companies)} new companies)")
+        return enricher
 
-        time.sleep(1)  # Rate limiting
+    enricher = asyncio.run(enrich_all()) if to_enrich else None
+    new_enriched = [r for r in results if r is not None]
+    all_enriched = enriched_companies + new_enriched
 
     print(f"\n✓ Enrichment complete!")
     print(f"✓ Total enriched: {len(all_enriched)} companies ({len(enriched_companies)} existing + {len(new_enriched)} new)")
@@ -385,19 +615,7 @@ def main():
     print(f"✓ After Colorado filter: {len(all_enriched)} companies")
 
     # Save final filtered results
-    with open(output_json, 'w', encoding='utf-8') as f:
-        json.dump(all_enriched, f, indent=2, ensure_ascii=False)
-
-    csv_file = '../outputs/stage_3_progress.csv'
-    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-        fieldnames = [
-            'company_name', 'url', 'description', 'founders',
-            'funding_info', 'latest_funding_date', 'total_funding', 'key_investors',
-            'location', 'headquarters', 'social_links', 'success'
-        ]
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-        writer.writeheader()
-        writer.writerows(all_enriched)
+    save_results(all_enriched, output_json)
 
     print(f"✓ Results saved to {output_json}")
 
@@ -405,6 +623,54 @@ def main():
     complete_count = sum(1 for c in all_enriched
                         if c.get('funding_info') and c.get('funding_info') != 'Not found')
     print(f"\n  - Companies with funding info: {complete_count}/{len(all_enriched)}")
+    if yield_pages:
+        print(f"  - Subpages that contributed founders/funding/location: {yield_hits}/{yield_pages} "
+              f"(logged to {LINK_YIELD_FILE})")
+    if enricher:
+        perplexity, openai = enricher.perplexity_limiter.stats(), enricher.openai_limiter.stats()
+        print(f"  - API calls: {perplexity['calls']} Perplexity, {openai['calls']} OpenAI "
+              f"(rate limiter waits: {perplexity['waited']:.0f}s / {openai['waited']:.0f}s)")
+        usages = [c['api_usage'] for c in new_enriched if c.get('api_usage')]
+        if usages:
+            mode = 'consolidated' if PERPLEXITY_CONSOLIDATED else 'per-field'
+            totals = {key: sum(u[key] for u in usages) for key in new_usage()}
+            print(f"  - Per company ({mode} search, {len(usages)} companies): "
+                  f"{totals['perplexity_calls'] / len(usages):.1f} Perplexity calls / "
+                  f"{totals['perplexity_tokens'] / len(usages):,.0f} tokens, "
+                  f"{totals['openai_calls'] / len(usages):.1f} OpenAI calls / "
+                  f"{totals['openai_tokens'] / len(usages):,.0f} tokens")
+    local_found = [c for c in new_enriched if c.get('local_extraction')]
+    if local_found:
+        avoided = sum(c.get('local_searches_avoided', 0) for c in local_found)
+        by_field = {field: sum(1 for c in local_found
+                               if c['local_extraction'].get(field, {}).get('confidence', 0) >= LOCAL_MIN_CONFIDENCE)
+                    for field in ('location', 'founders', 'funding')}
+        print(f"  - Local pre-extraction: {len(local_found)} companies with on-site values, "
+              f"{avoided} field searches avoided (confident: " +
+              ', '.join(f"{field} {count}" for field, count in by_field.items()) + ")")
+    holdout = [c['local_agreement'] for c in new_enriched if 'local_agreement' in c]
+    if holdout:
+        scores = []
+        for field in ('location', 'founders', 'funding'):
+            compared = [a[field] for a in holdout if a.get(field) is not None]
+            if compared:
+                scores.append(f"{field} {sum(compared)}/{len(compared)}")
+        print(f"  - Held-out agreement with LLM ({len(holdout)} companies): {', '.join(scores) or 'nothing to compare'}")
+    if failed:
+        print(f"  - Enrichment failed for {failed} companies (retried on the next run)")
+    if tagged_skipped:
+        # Calls avoided at this run's measured mean per enriched company, or the nominal count if none
+        usages = [c['api_usage'] for c in new_enriched if c.get('api_usage')]
+        if usages:
+            perplexity_each = sum(u['perplexity_calls'] for u in usages) / len(usages)
+            openai_each = sum(u['openai_calls'] for u in usages) / len(usages)
+            basis = f"at this run's mean of {perplexity_each:.1f} + {openai_each:.1f} per company"
+        else:
+            perplexity_each, openai_each = PERPLEXITY_CALLS_PER_COMPANY, OPENAI_CALLS_PER_COMPANY
+            basis = "estimated, nothing enriched this run to measure"
+        print(f"  - Tagged sites skipped: {tagged_skipped} "
+              f"(~{tagged_skipped * perplexity_each:.0f} Perplexity and "
+              f"{tagged_skipped * openai_each:.0f} OpenAI calls avoided, {basis})")
 
     return all_enriched
 
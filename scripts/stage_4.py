@@ -177,8 +177,9 @@ def process_all_companies(input_file: str, output_file: str, test_mode: bool = F
 
     print(f"Found {len(companies)} companies")
 
-    # Filter to successful scrapes only
-    companies = [c for c in companies if c.get('success') == 'Yes']
+    # Filter to successful scrapes only (parked/challenge/cookie-wall/dead sites are tagged in Stage 2,
+    # skipped by Stage 3 and counted in its summary; the site_tag check only guards older Stage 3 files)
+    companies = [c for c in companies if c.get('success') == 'Yes' and not c.get('site_tag')]
     print(f"Filtered to {len(companies)} successful companies")
 
     # Test mode: only process first 5
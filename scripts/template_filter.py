@@ -0,0 +1,77 @@
+"""
+Template Filter: per-site boilerplate removal for Stage 2 page text
+Lines repeated on most pages of one company's site (menus, cookie banners, footers) are dropped
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+
+# Rough OpenAI tokenizer ratio for English text, used for savings estimates
+CHARS_PER_TOKEN = 4
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _normalize(line: str) -> str:
+    return _WHITESPACE.sub(' ', line).strip().lower()
+
+
+def find_template_lines(texts: List[str], threshold: float = 0.6, min_pages: int = 3) -> set:
+    """
+    Return the normalized lines that appear on at least `threshold` of the pages.
+    Each page counts a line once; with fewer than min_pages pages nothing is a template.
+    """
+    pages = [text for text in texts if text]
+    if len(pages) < min_pages:
+        return set()
+
+    counts = Counter()
+    for text in pages:
+        counts.update({_normalize(line) for line in text.split('\n')} - {''})
+
+    needed = max(2, math.ceil(threshold * len(pages)))
+    return {line for line, count in counts.items() if count >= needed}
+
+
+def strip_template_lines(text: str, template: set) -> str:
+    """Drop template lines from one page's text, keeping the remaining lines in order"""
+    if not text or not template:
+        return text
+    return '\n'.join(line for line in text.split('\n') if _normalize(line) not in template)
+
+
+def strip_site_template(result: Dict, threshold: float = 0.6, min_pages: int = 3) -> Dict:
+    """
+    Remove lines shared by most of a company's own pages (home, about, team/investor)
+    from their text in place. News articles live on other sites and are left alone.
+    Returns {'pages', 'template_lines', 'chars_removed', 'tokens_saved'}.
+    """
+    # (url, holder, key) per text field; a page kept as both about and team is counted once
+    slots = []
+    if result.get('main_content'):
+        slots.append((result.get('url'), result, 'main_content'))
+    if result.get('about_content'):
+        slots.append((result.get('about_page_url'), result, 'about_content'))
+    for page in result.get('investor_page_content', []):
+        if page.get('content'):
+            slots.append((page.get('url'), page, 'content'))
+
+    texts = {}
+    for url, holder, key in slots:
+        texts.setdefault(url, holder[key])
+    template = find_template_lines(list(texts.values()), threshold, min_pages)
+
+    chars_removed = 0
+    if template:
+        for _, holder, key in slots:
+            stripped = strip_template_lines(holder[key], template)
+            chars_removed += len(holder[key]) - len(stripped)
+            holder[key] = stripped
+
+    return {
+        'pages': len(texts),
+        'template_lines': len(template),
+        'chars_removed': chars_removed,
+        'tokens_saved': chars_removed // CHARS_PER_TOKEN,
+    }
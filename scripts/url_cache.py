@@ -0,0 +1,116 @@
+"""
+URL Cache: extracted pages shared across companies, in memory for the run and on disk between runs
+Press articles and investor portfolio pages cited by many companies are fetched and parsed once
+"""
+import os
+import json
+import time
+import threading
+from typing import Dict, Optional, Tuple
+
+from page_parser import canonicalize_url
+
+URL_CACHE_FILE = '../outputs/stage_2_url_cache.jsonl'
+
+
+class UrlCache:
+    """
+    Page.extract() output by canonical URL: {key: {'fetched_at', 'fields', 'data'}}.
+    Entries older than ttl_days are ignored (ttl_days=0: nothing is kept between runs).
+    Failed fetches are remembered for the run only.
+    """
+
+    def __init__(self, path: str = URL_CACHE_FILE, ttl_days: float = 7):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self._entries = {}
+        self._failed = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _fresh(self, entry: Dict) -> bool:
+        return time.time() - entry['fetched_at'] < self.ttl_seconds
+
+    def _load(self):
+        if not self.ttl_seconds or not os.path.exists(self.path):
+            return
+        lines = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if self._fresh(entry):
+                        self._entries[entry['key']] = entry
+        except OSError as e:
+            print(f"  Warning: Could not read URL cache {self.path}: {e}")
+            return
+
+        # Mostly expired or superseded lines: rewrite the file with the live entries only
+        if lines > 2 * len(self._entries) + 100:
+            self._rewrite()
+
+    def _rewrite(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                for entry in self._entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"  Warning: Could not compact URL cache: {e}")
+
+    def _lookup(self, url: str, fields: Tuple[str, ...]) -> Tuple[str, Optional[Dict]]:
+        key = canonicalize_url(url)
+        entry = self._entries.get(key)
+        if entry and set(fields) <= set(entry['fields']) and (not self.ttl_seconds or self._fresh(entry)):
+            return key, entry
+        return key, None
+
+    def contains(self, url: str, fields: Tuple[str, ...]) -> bool:
+        """True if get() would answer without a request (a cached page or a failure this run)"""
+        with self._lock:
+            key, entry = self._lookup(url, fields)
+            return entry is not None or key in self._failed
+
+    def get(self, url: str, fields: Tuple[str, ...]) -> Tuple[bool, Optional[Dict]]:
+        """
+        (hit, data): data is the cached extract() output carrying at least `fields`,
+        or None on a hit for a URL that already failed this run.
+        """
+        with self._lock:
+            key, entry = self._lookup(url, fields)
+            if entry is not None or key in self._failed:
+                self.hits += 1
+                return True, {**entry['data'], 'url': url} if entry else None
+            self.misses += 1
+            return False, None
+
+    def put(self, url: str, data: Dict, fields: Tuple[str, ...]):
+        """Remember a parsed page (kept in memory; written to disk when entries outlive the run)"""
+        entry = {'key': canonicalize_url(url), 'fetched_at': time.time(), 'fields': list(fields), 'data': data}
+        with self._lock:
+            self._entries[entry['key']] = entry
+            if not self.ttl_seconds:
+                return
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            except OSError as e:
+                print(f"  Warning: Could not write URL cache: {e}")
+
+    def put_failure(self, url: str):
+        with self._lock:
+            self._failed.add(canonicalize_url(url))
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'lookups': lookups,
+            'hits': self.hits,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+        }